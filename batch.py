@@ -0,0 +1,199 @@
+# batch.py
+# 여러 학생(프로필)의 시간표를 한 번에 생성합니다. (상담용 일괄 처리)
+#
+# 사용 예:
+#   python batch.py --profiles profiles.json --output results.jsonl --workers 4 --top 20
+#
+# profiles.json은 headless.py의 inputs.json 형식 딕셔너리의 리스트입니다. (각 항목에 "name"을 둘 수 있음)
+# selected_ids는 프로필마다 반드시 있어야 합니다.
+#
+# - 카탈로그 전체의 분반 비트마스크와 분반 쌍의 충돌 여부는 작업 프로세스마다 한 번만 계산하여 모든 프로필이 공유합니다.
+# - 선택한 분반과 제약 조건이 같은 프로필들은 한 작업으로 묶어, 충돌 없는 조합 목록(feasible_set.FeasibleSet)을
+#   한 번만 만들고 프로필마다 점수만 다시 계산합니다.
+# - 작업들은 프로세스 풀로 나누어 실행하므로 처리량이 코어 수에 비례합니다.
+import argparse
+import copy
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import Config
+from constraints import HardConstraints
+from feasible_set import FeasibleSetCache
+from intervals import MeetingTimeline
+from scheduler import Scheduler
+
+
+class CatalogTables:
+    """
+    카탈로그 전체에 대해 한 번만 계산하는 표.
+    - timeline: 카탈로그 전체 강의 시간의 시간축 / masks: 강의 ID -> (week_mask, day_masks)
+      (Scheduler의 timeline / mask_cache로 공유)
+    - conflicts: 강의 ID -> 시간이 겹치는 강의 ID 집합
+    """
+    def __init__(self, lectures):
+        self.lectures = {lec.id: lec for lec in lectures}
+        self.timeline = MeetingTimeline(lectures)
+        scheduler = Scheduler([], {}, {}, [], timeline=self.timeline)
+        for lec in lectures:
+            scheduler._lecture_masks(lec)
+        self.masks = scheduler._mask_cache
+
+        # week mask를 64비트 단위로 나눈 배열로 모든 쌍의 충돌을 한 번에 계산합니다.
+        ids = [lec.id for lec in lectures]
+        words = np.array(self.timeline.words([self.masks[i][0] for i in ids]), dtype=np.uint64).reshape(len(ids), -1)
+        self.conflicts = {}
+        for row, lecture_id in enumerate(ids):
+            overlapping = np.any((words & words[row]) != 0, axis=1)
+            overlapping[row] = False
+            self.conflicts[lecture_id] = {ids[j] for j in np.flatnonzero(overlapping)}
+
+    def forced_conflicts(self, scheduler):
+        """어느 분반을 골라도 서로 겹치는 (필수) 과목 쌍의 이름 목록. 하나라도 있으면 시간표가 없습니다."""
+        pairs = []
+        clusters = scheduler.lecture_clusters
+        for a in range(len(clusters)):
+            for b in range(a + 1, len(clusters)):
+                if scheduler.optional_flags[a] or scheduler.optional_flags[b]:
+                    continue
+                if all(other.id in self.conflicts[lec.id] for lec in clusters[a] for other in clusters[b]):
+                    pairs.append((clusters[a][0].name, clusters[b][0].name))
+        return pairs
+
+
+def _profile_weights(inputs):
+    from model import default_loss_weights
+    weights = default_loss_weights()
+    for index, weight in enumerate(inputs.get("weights", [])):
+        weights[index] = dict(weight)
+    return weights
+
+
+def _selection_key(inputs):
+    """충돌 없는 조합 목록이 같은 프로필을 묶는 키 (선택한 분반 + 제약 조건)"""
+    return json.dumps([sorted(inputs["selected_ids"]), inputs.get("constraints", {})], sort_keys=True)
+
+
+# --- 작업 프로세스 ---
+
+_tables = None
+
+
+def _init_worker(lectures):
+    """작업 프로세스마다 한 번: 카탈로그 표를 만듭니다."""
+    global _tables
+    _tables = CatalogTables(lectures)
+
+
+def _profile_scheduler(inputs):
+    selected_ids = set(inputs["selected_ids"])
+    selected = [lec for lec in _tables.lectures.values() if lec.id in selected_ids]
+    # 선호도는 강의 객체에 저장되므로 프로필마다 다시 설정합니다. (작업 프로세스 안에서는 프로필을 하나씩 처리)
+    preferences = {int(lecture_id): value for lecture_id, value in inputs.get("preferences", {}).items()}
+    for lec in selected:
+        lec.preference = preferences.get(lec.id, 0)
+    good_slots = {day: set(slots) for day, slots in inputs.get("good_slots", {}).items()}
+    bad_slots = {day: set(slots) for day, slots in inputs.get("bad_slots", {}).items()}
+    constraints = HardConstraints.from_dict(inputs["constraints"]) if "constraints" in inputs else None
+    return Scheduler(selected, good_slots, bad_slots, _profile_weights(inputs),
+                     constraints=constraints, mask_cache=_tables.masks, timeline=_tables.timeline)
+
+
+def _solve_group(task):
+    """선택이 같은 프로필 묶음을 처리합니다. task: (결과 수, [(프로필 번호, inputs), ...])"""
+    result_count, profiles = task
+    feasible_cache = FeasibleSetCache(max_entries=1)
+    outputs = []
+    for index, inputs in profiles:
+        start_time = time.time()
+        scheduler = _profile_scheduler(inputs)
+        conflicts = _tables.forced_conflicts(scheduler)
+        shared = False
+        if conflicts:
+            results = []
+        else:
+            shared = feasible_cache.get(scheduler.feasible_key()) is not None
+            results, _ = scheduler.run_cached(feasible_cache)
+        outputs.append({
+            "index": index,
+            "name": inputs.get("name"),
+            "count": len(results),
+            "elapsed_time": time.time() - start_time,
+            "shared_feasible_set": shared,
+            "infeasible_reason": scheduler.infeasible_reason,
+            "conflicting_courses": conflicts,
+            "results": [{"lecture_ids": [lec.id for lec in tt.lectures], "score": tt.score,
+                         "properties": list(tt.properties)} for tt in results[:result_count]],
+        })
+    return outputs
+
+
+# --- 일괄 실행 ---
+
+def run_batch(profiles, lectures, workers=None, result_count=None, chunk_size=None):
+    """
+    프로필 목록(headless inputs 형식 딕셔너리)의 시간표를 생성하여 프로필 순서대로 결과 딕셔너리 목록을 반환합니다.
+    workers가 1이면 현재 프로세스에서 실행합니다. (None이면 CPU 수)
+    """
+    result_count = result_count if result_count is not None else Config.BATCH_RESULT_COUNT
+    chunk_size = chunk_size or Config.BATCH_CHUNK_SIZE
+    groups = {}
+    for index, inputs in enumerate(profiles):
+        groups.setdefault(_selection_key(inputs), []).append((index, inputs))
+    # 같은 선택이 아주 많으면 여러 작업으로 나누어 프로세스들이 나눠 처리하게 합니다.
+    tasks = [(result_count, group[i:i + chunk_size]) for group in groups.values()
+             for i in range(0, len(group), chunk_size)]
+    tasks.sort(key=lambda task: -len(task[1]))
+
+    outputs = []
+    if workers == 1:
+        _init_worker(copy.deepcopy(lectures)) # 프로필별 선호도를 설정해도 호출한 쪽의 강의 객체는 바뀌지 않도록
+        for task in tasks:
+            outputs.extend(_solve_group(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lectures,)) as pool:
+            for group_outputs in pool.map(_solve_group, tasks):
+                outputs.extend(group_outputs)
+    outputs.sort(key=lambda output: output["index"])
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AGS 시간표 생성기 (여러 프로필 일괄 처리)")
+    parser.add_argument("--profiles", required=True, help="headless inputs 형식 딕셔너리 리스트를 담은 JSON 파일")
+    parser.add_argument("--output", help="프로필별 결과를 기록할 JSON Lines 파일 (없으면 요약만 출력)")
+    parser.add_argument("--workers", type=int, help="작업 프로세스 수 (기본: CPU 수, 1이면 현재 프로세스)")
+    parser.add_argument("--top", type=int, default=Config.BATCH_RESULT_COUNT, help="프로필마다 저장할 상위 시간표 개수")
+    args = parser.parse_args(argv)
+
+    from model import Model
+    with open(args.profiles, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+    missing = [index for index, inputs in enumerate(profiles) if "selected_ids" not in inputs]
+    if missing:
+        print(f"[ERROR] selected_ids가 없는 프로필: {missing}")
+        return 1
+
+    start_time = time.time()
+    outputs = run_batch(profiles, Model().all_lectures, args.workers, args.top)
+    elapsed_time = time.time() - start_time
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for output in outputs:
+                f.write(json.dumps(output, ensure_ascii=False) + "\n")
+    shared = sum(1 for output in outputs if output["shared_feasible_set"])
+    print(f"프로필 {len(outputs)}개 처리 ({elapsed_time:.2f}초, 프로필당 {elapsed_time / max(1, len(outputs)):.3f}초), "
+          f"조합 목록 재사용 {shared}개")
+    for output in outputs:
+        label = output["name"] or f"#{output['index']}"
+        best = f"best={output['results'][0]['score']:.2f}" if output["results"] else "시간표 없음"
+        print(f"  {label}: {output['count']}개, {best}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# components.py
+# 수업 요일이 겹치지 않는 과목 묶음(component)으로 분반 조합 공간을 나누어 탐색합니다.
+#
+# 두 과목의 분반들이 같은 요일에 수업하는 일이 없으면 두 과목 사이에는 충돌이 생길 수 없고, 요일별 속성
+# (선호/비선호 시간과 겹치는 슬롯 수, 공강 시간, 추가 속성)도 서로의 요일 값에 영향을 주지 않습니다.
+# 그래서 수업 요일을 공유하는 과목끼리 묶으면 묶음마다 따로 충돌 없는 부분 조합을 찾을 수 있고, 전체 결과는
+# 묶음별 결과의 곱집합입니다. 검사하는 조합 수가 묶음별 조합 수의 곱에서 합으로 줄어듭니다.
+# - 전체 목록이 필요하면 (run, FeasibleSet) 묶음별 결과를 곱해 조합 순서대로 다시 나열합니다. (factorized_choices)
+# - 속성 값은 묶음별 요일 값의 합(RSS이면 제곱합)을 더해 구합니다. Loss가 묶음별 기여의 합이면 (RSS를 켠 속성이
+#   없으면) 곱집합을 나열하지 않고 점수 순으로 필요한 만큼만 만들어 냅니다. (FactorizedResults)
+# 선택 과목("빼기"와 과목 하나 이상 조건)과 학점 범위는 묶음 사이를 이어 주므로 있으면 나누지 않습니다.
+import heapq
+import math
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from config import Config
+from property_kernels import first_slot, last_slot, popcount_array
+
+
+def day_components(scheduler):
+    """수업 요일을 공유하는 과목끼리 묶은 과목 번호 목록들. 묶음 안은 오름차순, 묶음은 첫 과목 순서입니다."""
+    clusters = scheduler.lecture_clusters
+    parent = list(range(len(clusters)))
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    owner = {} # 요일 -> 그 요일에 수업하는 첫 과목
+    for k, cluster in enumerate(clusters):
+        for lec in cluster:
+            for slot in lec.time_slots:
+                other = owner.setdefault(slot['day'], k)
+                parent[find(other)] = find(k)
+    groups = {}
+    for k in range(len(clusters)):
+        groups.setdefault(find(k), []).append(k)
+    return sorted(groups.values())
+
+
+def factorizable_components(scheduler):
+    """
+    묶음으로 나누어 탐색할 수 있으면 day_components()를, 아니면 None을 반환합니다.
+    묶음이 둘 이상이고 선택 과목과 학점 범위가 없으며, 묶음마다 조합 공간이 Config.MIXED_RADIX_MAX_COMBINATIONS 이하여야 합니다.
+    """
+    if not Config.FACTORIZED_SEARCH or len(scheduler.lecture_clusters) < 2 or any(scheduler.optional_flags):
+        return None
+    if scheduler.constraints.min_credits is not None or scheduler.constraints.max_credits is not None:
+        return None
+    components = day_components(scheduler)
+    if len(components) < 2:
+        return None
+    for courses in components:
+        if math.prod(len(scheduler.lecture_clusters[k]) for k in courses) > Config.MIXED_RADIX_MAX_COMBINATIONS:
+            return None
+    return components
+
+
+def additive_loss(scheduler):
+    """Loss가 묶음별 기여의 합인지 (RSS를 켠 기본 속성/추가 속성이 없는지)"""
+    return not any(weight['rss'] for weight in scheduler.weights[:3]) and \
+        not any(weight['rss'] for _, weight in scheduler._active_kernels)
+
+
+def component_choices(scheduler, components, profile=None):
+    """묶음별 충돌 없는 부분 조합의 choices 배열 (묶음의 과목 순서, 조합 순서) 목록"""
+    from product_space import ProductSpace
+    space = ProductSpace(scheduler)
+    return [space.subspace(courses).feasible_choices(profile=profile) for courses in components]
+
+
+def factorized_choices(scheduler, components, profile=None, parts=None):
+    """
+    충돌 없는 모든 조합의 choices 배열을 조합 순서대로 반환합니다. (ProductSpace.feasible_choices와 같은 결과)
+    묶음별 부분 조합을 따로 찾은 뒤 곱집합을 만들어 전체 과목 순서로 다시 정렬합니다.
+    parts(component_choices의 결과)를 넘기면 부분 조합을 다시 찾지 않습니다.
+    """
+    if parts is None:
+        parts = component_choices(scheduler, components, profile)
+    n_courses = len(scheduler.lecture_clusters)
+    total = math.prod(len(part) for part in parts)
+    choices = np.empty((total, n_courses), dtype=np.int32)
+    if not total:
+        return choices
+    # 앞 묶음의 부분 조합이 가장 느리게 바뀌도록 np.repeat / np.tile로 곱집합을 채웁니다.
+    repeat, tile = total, 1
+    for courses, part in zip(components, parts):
+        repeat //= len(part)
+        choices[:, courses] = np.tile(np.repeat(part, repeat, axis=0), (tile, 1))
+        tile *= len(part)
+    # np.lexsort는 마지막 키가 가장 우선이므로 과목 순서를 뒤집어 넘깁니다.
+    return choices[np.lexsort(choices.T[::-1])]
+
+
+class ComponentTable:
+    """
+    묶음 하나의 충돌 없는 부분 조합들. Loss 기여가 작은 순서(같으면 조합 순서)로 정렬해 둡니다.
+    - choices: (부분 조합 수, 묶음의 과목 수) 분반 위치
+    - partials: 속성별 부분 조합 값 목록. 기본 네 속성 뒤에 활성화된 추가 속성 순서이며,
+      요일별 값의 합(RSS를 켠 속성은 제곱합)이므로 묶음끼리 더할 수 있습니다.
+    - losses: Loss 기여 (RSS를 켠 속성이 없을 때만 의미가 있음)
+    - offsets: 전체 조합 번호(과목 순서의 혼합 기수)에 더해지는 값. 점수가 같을 때 순서를 정합니다.
+    """
+    def __init__(self, scheduler, courses, choices):
+        self.courses = courses
+        sections = scheduler._section_table()
+        n = len(choices)
+        occupancy = np.zeros((n, len(scheduler.days)), dtype=np.uint64)
+        prefer = np.zeros(n, dtype=np.int64)
+        for j, k in enumerate(courses):
+            occupancy |= np.array([day_masks for _, _, day_masks in sections[k]], dtype=np.uint64)[choices[:, j]]
+            prefer += np.array([lec.preference for lec, _, _ in sections[k]], dtype=np.int64)[choices[:, j]]
+        first, last = first_slot(occupancy), last_slot(occupancy)
+        dailies = [
+            popcount_array(occupancy & np.array(scheduler.good_masks, dtype=np.uint64)),
+            popcount_array(occupancy & np.array(scheduler.bad_masks, dtype=np.uint64)),
+            np.where(last >= 0, last - first + 1 - popcount_array(occupancy), 0),
+        ]
+        rss = [weight['rss'] for weight in scheduler.weights[:3]]
+        partials = [(daily * daily).sum(axis=1) if enabled else daily.sum(axis=1) for daily, enabled in zip(dailies, rss)]
+        partials.append(prefer)
+        for kernel, weight in scheduler._active_kernels:
+            daily = kernel.daily(occupancy)
+            partials.append((daily * daily).sum(axis=1) if weight['rss'] else daily.sum(axis=1))
+
+        # Scheduler._loss_from_properties는 +=로 더하므로 실수 배열로 넘깁니다.
+        losses = scheduler._loss_from_properties([values.astype(np.float64) for values in partials[:4]])
+        for (_, weight), values in zip(scheduler._active_kernels, partials[4:]):
+            losses = losses + values * weight['weight']
+        losses = np.asarray(losses, dtype=np.float64)
+        # 부분 조합은 조합 순서로 들어오므로 안정 정렬이면 Loss가 같을 때 조합 순서가 유지됩니다.
+        order = np.argsort(losses, kind='stable')
+        self.choices = choices[order].tolist()
+        self.partials = [values[order].tolist() for values in partials]
+        self.losses = losses[order].tolist()
+        strides = [math.prod(len(scheduler.lecture_clusters[k]) for k in range(course + 1, len(sections)))
+                   for course in courses]
+        self.offsets = [sum(i * stride for i, stride in zip(row, strides)) for row in self.choices]
+
+    def __len__(self):
+        return len(self.choices)
+
+
+def component_tables(scheduler, components, profile=None, parts=None):
+    """묶음별 ComponentTable 목록 (components 순서). parts는 factorized_choices와 같습니다."""
+    if parts is None:
+        parts = component_choices(scheduler, components, profile)
+    return [ComponentTable(scheduler, courses, part) for courses, part in zip(components, parts)]
+
+
+class FactorizedResults:
+    """
+    묶음별 결과(ComponentTable)의 곱집합을 점수 순으로 필요한 만큼만 만들어 내는 결과 목록.
+    StoredResults처럼 len()과 인덱스로 접근할 수 있으며, 순서는 run()과 같은 (점수, 조합 순서)입니다.
+
+    상태는 묶음별 위치의 튜플이고, 힙에서 가장 좋은 상태를 꺼낼 때마다 마지막으로 0이 아닌 위치부터 뒤쪽 묶음의
+    위치를 하나씩 늘린 상태를 넣습니다. 상태마다 부모가 하나뿐이고 자식의 (점수, 조합 번호)가 부모보다 작지 않으므로
+    중복 없이 정확한 순서로 나옵니다. 꺼낸 상태는 번호 순으로 기억하고, Timetable은 최근 것만 보관합니다.
+    Z-Score는 묶음별 평균/분산의 합으로, 같은 점수 개수는 묶음별 점수 분포를 곱해 (convolution) 계산합니다.
+    """
+    def __init__(self, scheduler, tables):
+        self.scheduler = scheduler
+        self.tables = tables
+        self._count = math.prod(len(table) for table in tables)
+        self._rss = [weight['rss'] for weight in scheduler.weights[:3]] + [False] + \
+            [weight['rss'] for _, weight in scheduler._active_kernels]
+        self._states = []
+        self._heap = []
+        self._timetables = OrderedDict()
+        if self._count:
+            self._push((0,) * len(tables))
+        self.mean = sum(float(np.mean(table.losses)) for table in tables) if self._count else 0.0
+        self.std = math.sqrt(sum(float(np.var(table.losses)) for table in tables)) if self._count else 0.0
+        self._score_counts = self._convolve_scores()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("result index out of range")
+        timetable = self._timetables.get(index)
+        if timetable is not None:
+            self._timetables.move_to_end(index)
+            return timetable
+        while len(self._states) <= index:
+            self._advance()
+        timetable = self._timetable(self._states[index])
+        self._timetables[index] = timetable
+        if len(self._timetables) > Config.FACTORIZED_CACHED_RESULTS:
+            self._timetables.popitem(last=False)
+        return timetable
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def _push(self, state):
+        loss = sum(table.losses[p] for table, p in zip(self.tables, state))
+        offset = sum(table.offsets[p] for table, p in zip(self.tables, state))
+        heapq.heappush(self._heap, (loss, offset, state))
+
+    def _advance(self):
+        _, _, state = heapq.heappop(self._heap)
+        self._states.append(state)
+        last = max((c for c, p in enumerate(state) if p), default=0)
+        for c in range(last, len(state)):
+            if state[c] + 1 < len(self.tables[c]):
+                self._push(state[:c] + (state[c] + 1,) + state[c + 1:])
+
+    def _timetable(self, state):
+        """상태 하나의 Timetable. 속성은 묶음별 값을 더해(RSS는 제곱합의 제곱근) Scheduler와 같은 식으로 점수를 계산합니다."""
+        from model import Timetable
+        scheduler = self.scheduler
+        row = [0] * len(scheduler.lecture_clusters)
+        for table, p in zip(self.tables, state):
+            for k, i in zip(table.courses, table.choices[p]):
+                row[k] = i
+        values = []
+        for j, rss in enumerate(self._rss):
+            total = sum(table.partials[j][p] for table, p in zip(self.tables, state))
+            values.append(math.sqrt(total) if rss else total)
+        properties = tuple(values[:4])
+        loss = scheduler._loss_from_properties(properties)
+        if scheduler._active_kernels:
+            extra = 0
+            for (_, weight), value in zip(scheduler._active_kernels, values[4:]):
+                extra = extra + value * weight['weight']
+            loss = float(loss + extra)
+        timetable = Timetable([cluster[i] for cluster, i in zip(scheduler.lecture_clusters, row)], loss, properties)
+        timetable.z_score = (loss - self.mean) / self.std if self.std != 0 else 0.0
+        if self._score_counts is not None:
+            timetable.same_score_count = self._score_counts.get(round(loss, 9), 0)
+        return timetable
+
+    def _convolve_scores(self):
+        """전체 점수별 시간표 수. 서로 다른 점수가 Config.FACTORIZED_SCORE_COUNT_LIMIT개를 넘으면 None (표시하지 않음)"""
+        counts = Counter({0.0: 1})
+        for table in self.tables:
+            component = Counter(round(loss, 9) for loss in table.losses)
+            if len(counts) * len(component) > Config.FACTORIZED_SCORE_COUNT_LIMIT:
+                return None
+            combined = Counter()
+            for a, n in counts.items():
+                for b, m in component.items():
+                    combined[round(a + b, 9)] += n * m
+            counts = combined
+        return counts
@@ -30,7 +30,7 @@ class Config:
     # 페이지 설명
     PAGE_DESCRIPTIONS = {
         1: "I.G.W.T. .",
-        2: "선택한 강의의 선호도를 조정하세요. +/- 버튼으로 선호도를 변경할 수 있습니다.",
+        2: "선택한 강의의 선호도를 조정하세요. +/- 버튼으로 선호도를 변경할 수 있습니다. Rule 칸을 누르면 필수/제외 분반으로, Optional 칸을 누르면 빼도 되는 과목으로 지정됩니다.",
         3: "선호하는 시간대를 선택하세요. 선택한 시간대에 강의가 배치될 확률이 높아집니다.",
         4: "피하고 싶은 시간대를 선택하세요. 선택한 시간대는 가능한 한 피해서 시간표를 생성합니다.",
         5: "각 조건의 중요도를 설정하세요. 값이 높을수록 해당 조건이 시간표 생성에 더 큰 영향을 미칩니다.",
@@ -39,7 +39,9 @@ class Config:
     
     # 테이블 헤더
     PAGE1_HEADERS = ["Name", "Prof", "Section", "Time"]
-    PAGE2_HEADERS = ["Name", "Prof", "Section", "Preference", "+", "-"]
+    PAGE2_HEADERS = ["Name", "Prof", "Section", "Preference", "+", "-", "Rule", "Optional"]
+    LECTURE_RULE_LABELS = {None: "", "required": "필수", "forbidden": "제외"}
+    OPTIONAL_COURSE_LABEL = "선택"
     TIMETABLE_HEADERS = ["Time", "Mon", "Tue", "Wed", "Thu", "Fri"]
     
     # 페이지 5 속성
@@ -49,9 +51,108 @@ class Config:
         "Break time",
         "Prefer lectures"
     ]
+    # 추가 속성(property_kernels.py)의 기준 슬롯 (슬롯 0 = 9:00, 30분 단위)
+    LUNCH_SLOTS = (6, 7)     # 점심시간 12:00~13:00
+    MORNING_START_SLOT = 2   # 10:00보다 이른 수업을 "이른 시작"으로 봅니다.
+    EVENING_END_SLOT = 18    # 18:00보다 늦게 끝나는 수업을 "늦은 종료"로 봅니다.
 
     # 캐시 파일 설정
     SELECTED_LECTURES_CACHE_FILE = "selected_lectures_cache.json"
+    CATALOG_MANIFEST_FILE = "lectures_manifest.json"   # 증분 빌드용 매니페스트 (카탈로그 버전, 행 키 -> ID)
+    CATALOG_DELTA_FILE = "lectures_delta.json"         # 마지막 증분 빌드의 변경분 (실행 중인 앱이 적용)
+
+    # 생성 결과 캐시 설정 (입력이 같으면 시간표를 다시 계산하지 않습니다)
+    RESULT_CACHE_ENABLED = True
+    RESULT_CACHE_DIR = "generated_results_cache"
+    RESULT_CACHE_MAX_ENTRIES = 32
+    RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+    # 탐색 공간 추정 설정 (생성 전에 엔진을 고르고 경고를 표시합니다)
+    ESTIMATE_EXACT_NODE_BUDGET = 200_000    # 충돌 없는 시간표 수를 정확히 셀 때 기억할 최대 상태 수 (넘으면 표본 추정)
+    ESTIMATE_SAMPLES = 2000                 # 표본 추정에 사용할 무작위 경로 수
+    ESTIMATE_SECONDS_PER_COMBINATION = 1.2e-6  # run(): 분반 조합 하나를 만들고 충돌 검사하는 시간
+    ESTIMATE_SECONDS_PER_TIMETABLE = 8e-6      # run(): 충돌 없는 시간표 하나를 점수화하는 시간
+    ESTIMATE_SECONDS_PER_DFS_LEAF = 8e-6       # 깊이 우선 탐색에서 시간표 하나를 찾는 데 드는 시간
+    ESTIMATE_WARN_SECONDS = 5.0             # 예상 시간이 이보다 길면 경고합니다.
+    EXACT_ENGINE_MAX_SECONDS = 10.0         # 정확한 탐색의 예상 시간이 이보다 길면 근사 탐색으로 전환합니다.
+
+    PARETO_SKYLINE_BATCH = 1024             # Pareto 탐색에서 찾은 시간표를 이만큼 모아 skyline으로 front를 다시 계산합니다.
+    POPULATION_SAMPLES = 4000               # 근사 탐색/Pareto 결과의 Z-Score 추정에 사용할 표본 시간표 수
+
+    # 근사 탐색(local search) 설정
+    LOCAL_SEARCH_TIME_BUDGET = 3.0          # 근사 탐색 시간 예산 (초)
+    LOCAL_SEARCH_MAX_ITERATIONS = 2_000_000 # 근사 탐색 최대 반복 횟수
+    LOCAL_SEARCH_RESULT_COUNT = 500         # 근사 탐색이 반환하는 서로 다른 시간표 수
+    LOCAL_SEARCH_TABU_SIZE = 8              # 최근에 떠난 분반을 다시 고르지 않는 기간 (옮길 수 있는 과목 수 × 이 값만큼의 반복)
+    LOCAL_SEARCH_MAX_REPAIRS = 2            # 한 번의 이동에서 충돌을 피하려고 함께 옮기는 과목 수
+    LOCAL_SEARCH_START_TEMPERATURE = 5.0
+    LOCAL_SEARCH_END_TEMPERATURE = 0.05
+    LOCAL_SEARCH_RESTART_AFTER = 20_000     # 이만큼 개선이 없으면 최선 해에서 다시 시작합니다.
+
+    # SQLite 결과 저장소 설정 (결과가 아주 많으면 메모리 대신 파일에 저장하고 페이지 단위로 읽습니다)
+    RESULT_STORE_FILE = "generated_results.sqlite3"
+    RESULT_STORE_SPILL_THRESHOLD = 300_000  # 충돌 없는 시간표가 이보다 많을 것으로 예상되면 저장소를 사용합니다.
+    RESULT_STORE_BATCH_SIZE = 5000          # executemany 한 번에 기록하는 행 수
+    RESULT_STORE_PAGE_SIZE = 200            # 한 번에 읽어 오는 결과 수
+    RESULT_STORE_CACHED_PAGES = 8           # 메모리에 유지하는 최근 페이지 수
+    RESULT_STORE_MAX_RUNS = 4               # 저장해 두는 실행 수 (넘으면 오래된 실행부터 삭제)
+
+    # 충돌 없는 조합 목록 캐시 (선호 시간/선호도/가중치만 바꾸면 점수만 다시 계산합니다)
+    FEASIBLE_SET_CACHE_SIZE = 4             # 메모리에 기억하는 선택(분반 목록) 수
+    MIXED_RADIX_MAX_COMBINATIONS = 20_000_000  # 분반 조합이 이 이하이면 조합 번호를 NumPy로 한꺼번에 검사 (넘으면 깊이 우선 탐색)
+    MIXED_RADIX_CHUNK_SIZE = 1 << 20        # 한 번에 검사하는 조합 번호 수
+    FACTORIZED_SEARCH = True                # 수업 요일이 겹치지 않는 과목 묶음으로 나누어 탐색 (components.py)
+    FACTORIZED_CACHED_RESULTS = 2000        # 묶음별 결과를 점수 순으로 합친 결과 목록에서 메모리에 유지하는 Timetable 수
+    FACTORIZED_SCORE_COUNT_LIMIT = 1_000_000  # 같은 점수 개수를 계산할 때 기억하는 서로 다른 점수 수 (넘으면 표시하지 않음)
+
+    # 결과 그룹 설정 (같은 시간에 열리는 다른 분반만 다른 결과는 P6에서 하나로 묶어 보여줍니다)
+    GROUP_SAME_OCCUPANCY = True             # 요일별 점유와 점수가 같은 결과를 그룹 하나로 표시
+    GROUP_MAX_LISTED_ALTERNATIVES = 200     # 그룹을 펼쳤을 때 나열하는 분반 대안 수
+
+    # P6 한눈에 보기 설정 (상위 결과를 작은 시간표 그림으로 모아 봅니다)
+    THUMBNAIL_COUNT = 100                   # 썸네일로 보여주는 상위 항목 수
+    THUMBNAIL_SIZE = (150, 190)             # 썸네일 하나의 크기 (px)
+    THUMBNAIL_COLUMNS = 5                   # 한 줄에 놓는 썸네일 수
+    THUMBNAIL_CACHE_SIZE = 500              # 그려 둔 썸네일 이미지를 보관하는 최대 수
+    THUMBNAIL_POLL_MS = 30                  # 백그라운드에서 그린 썸네일을 화면에 붙이는 간격 (ms)
+
+    # 가중치 민감도 분석 설정 (P5 슬라이더로 고를 수 있는 모든 가중치 조합을 분석합니다)
+    SENSITIVITY_MAX_WEIGHT = 10             # P5 슬라이더 최댓값 (정수 0 ~ 이 값)
+    SENSITIVITY_TOP_K = 5                   # "k등 안에 들 수 있는 시간표"의 k
+    SENSITIVITY_MAX_LISTED = 8              # 요약에 나열하는 1등 후보 수
+
+    # 여러 프로필 일괄 처리 설정 (batch.py)
+    BATCH_RESULT_COUNT = 20                 # 프로필마다 저장하는 상위 시간표 수
+    BATCH_CHUNK_SIZE = 64                   # 선택이 같은 프로필을 한 작업에서 처리하는 최대 수
+
+    # 여러 호스트 분산 탐색 설정 (distributed.py)
+    DISTRIBUTED_PORT = 50000                # 코디네이터가 작업 큐를 여는 포트
+    DISTRIBUTED_HOST = "127.0.0.1"          # 코디네이터가 작업 큐를 여는 주소 (다른 호스트의 작업자를 받으려면 인증 키와 함께 지정)
+    DISTRIBUTED_AUTHKEY_ENV = "AGS_DISTRIBUTED_AUTHKEY"  # 인증 키를 읽는 환경 변수 (기본 키는 없음)
+    DISTRIBUTED_TARGET_JOBS = 256           # 앞쪽 과목의 분반 배정(prefix)으로 나누는 작업 수의 목표 (이상)
+    DISTRIBUTED_RESULT_COUNT = 1000         # 작업마다 돌려받고 합쳐서 남기는 상위 시간표 수
+    DISTRIBUTED_JOB_TIMEOUT = 300.0         # 작업을 시작한 작업자에게서 이 시간(초) 동안 시작/alive 메시지가 없으면 다시 큐에 넣습니다.
+    DISTRIBUTED_HEARTBEAT_SECONDS = 10.0    # 작업자가 작업을 처리하는 동안 살아 있다고 알리는 간격 (초)
+    DISTRIBUTED_MAX_ATTEMPTS = 3            # 작업 하나를 시도하는 최대 횟수
+    DISTRIBUTED_POLL_SECONDS = 0.5          # 큐를 기다리는 간격 (초)
+    DISTRIBUTED_CONNECT_TIMEOUT = 30.0      # 작업자가 코디네이터 연결을 다시 시도하는 최대 시간 (초)
+
+    # 프로파일링 설정
+    SCHEDULER_DEBUG_OUTPUT = False   # True이면 시간표마다 Loss 막대 그래프를 터미널에 출력합니다.
+    PROFILE_LOG_FILE = None          # 파일 경로를 지정하면 실행마다 JSON 레코드 한 줄을 추가합니다.
+    PROFILE_CAPTURE_MODE = None      # None, "cprofile", "tracemalloc"
+    STARTUP_REPORT = False           # True이면 시작 단계별 소요 시간을 콘솔에 출력합니다. (PROFILE_LOG_FILE에도 기록)
+    STARTUP_POLL_MS = 50             # 백그라운드 강의 목록 로드가 끝났는지 확인하는 간격 (ms)
+    UI_MONITOR_ENABLED = False       # True이면 Tk 콜백 소요 시간과 after() 지연을 기록하고 종료할 때 요약합니다. (ui_monitor.py)
+    UI_MONITOR_FRAME_MS = 16         # 콜백이 이보다 오래 걸리면 화면 멈춤(stall)으로 셉니다. (ms)
+    UI_MONITOR_PROBE_MS = 100        # 이벤트 루프 지연을 재는 탐침 콜백의 간격 (ms)
+    UI_MONITOR_BUCKETS_MS = (16, 33, 50, 100, 250, 500, 1000, 2000)  # 히스토그램 구간 경계 (ms)
+    UI_MONITOR_WINDOW = 1000         # 핸들러마다 히스토그램에 쓰는 최근 기록 수
+    UI_MONITOR_REPORT_TOP = 15       # 종료할 때 출력하는 핸들러 수 (멈춘 시간 합계 순)
+
+    # 30분 슬롯 격자 (P3/P4 선호/비선호 시간과 속성 계산에 사용. 충돌 검사는 분 단위 강의 시간으로 합니다)
+    GRID_START_MINUTES = 540   # 슬롯 0의 시작 시각 (자정부터의 분, 540 = 9:00)
+    GRID_SLOT_MINUTES = 30     # 슬롯 하나의 길이 (분)
 
     # 시간 슬롯 인덱스 조정 (bias)
     TIME_SLOT_START_BIAS = -1  # 시작 인덱스에 더할 값 (예: 1을 더하면 9:00 -> 9:30)
@@ -0,0 +1,85 @@
+# constraints.py
+# 시간표 탐색 중에 반드시 지켜야 하는 하드 제약 조건을 정의합니다.
+# (Loss에 더해지는 선호/기피 시간과 달리, 위반하는 시간표는 아예 생성되지 않습니다.)
+from config import Config
+
+
+def credit_for_name(name):
+    """과목명의 학점을 반환합니다. Config.CREDIT_EXCEPTIONS_BY_NAME 규칙을 사용합니다."""
+    return Config.CREDIT_EXCEPTIONS_BY_NAME.get(name, Config.DEFAULT_CREDIT)
+
+
+class HardConstraints:
+    """
+    선언적 하드 제약 조건.
+    - required_ids: 반드시 들어야 하는 분반(강의 ID). 같은 과목의 다른 분반은 제외됩니다.
+    - forbidden_ids: 제외할 분반(강의 ID)
+    - free_days: 수업이 없어야 하는 요일 (예: {"Fri"})
+    - earliest_slot / latest_slot: 허용되는 가장 이른 시작 / 가장 늦은 종료 슬롯 인덱스 (0 = 9:00, 포함)
+    - min_credits / max_credits: 총 학점 범위 (목표 학점은 min = max)
+    - optional_names: 빼도 되는 과목명. 이 과목들은 학점 범위 안에서 포함 여부까지 함께 탐색됩니다.
+      (필수 분반이 지정된 과목은 항상 포함됩니다)
+    값이 None(또는 빈 집합)인 조건은 적용되지 않습니다.
+    """
+    def __init__(self, required_ids=None, forbidden_ids=None, free_days=None,
+                 earliest_slot=None, latest_slot=None, min_credits=None, max_credits=None,
+                 optional_names=None):
+        self.required_ids = set(required_ids or ())
+        self.forbidden_ids = set(forbidden_ids or ())
+        self.free_days = set(free_days or ())
+        self.earliest_slot = earliest_slot
+        self.latest_slot = latest_slot
+        self.min_credits = min_credits
+        self.max_credits = max_credits
+        self.optional_names = set(optional_names or ())
+
+    def is_empty(self):
+        return not (self.required_ids or self.forbidden_ids or self.free_days or self.optional_names
+                    or self.earliest_slot is not None or self.latest_slot is not None
+                    or self.min_credits is not None or self.max_credits is not None)
+
+    def allows_lecture(self, lecture):
+        """분반 하나가 요일/시간/금지 조건을 만족하는지 확인합니다."""
+        if lecture.id in self.forbidden_ids:
+            return False
+        for slot in lecture.time_slots:
+            if slot['day'] in self.free_days:
+                return False
+            if self.earliest_slot is not None and slot['start_index'] < self.earliest_slot:
+                return False
+            if self.latest_slot is not None and slot['end_index'] > self.latest_slot:
+                return False
+        return True
+
+    def allows_credits(self, credits):
+        if self.min_credits is not None and credits < self.min_credits:
+            return False
+        if self.max_credits is not None and credits > self.max_credits:
+            return False
+        return True
+
+    def is_optional(self, cluster):
+        """과목(클러스터)을 빼도 되는지 확인합니다."""
+        return cluster[0].name in self.optional_names and not any(lec.id in self.required_ids for lec in cluster)
+
+    def filter_cluster(self, cluster):
+        """과목(클러스터) 하나의 분반 중 제약 조건을 만족하는 분반만 남깁니다."""
+        required = [lec for lec in cluster if lec.id in self.required_ids]
+        candidates = required if required else cluster
+        return [lec for lec in candidates if self.allows_lecture(lec)]
+
+    def to_dict(self):
+        return {
+            "required_ids": sorted(self.required_ids),
+            "forbidden_ids": sorted(self.forbidden_ids),
+            "free_days": sorted(self.free_days),
+            "earliest_slot": self.earliest_slot,
+            "latest_slot": self.latest_slot,
+            "min_credits": self.min_credits,
+            "max_credits": self.max_credits,
+            "optional_names": sorted(self.optional_names),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: data.get(key) for key in cls().to_dict()})
@@ -1,12 +1,28 @@
 # controller.py
 # View와 Model 사이의 상호작용을 제어합니다.
 from scheduler import Scheduler
+from profiler import RunProfile, jsonl_hook
+from result_cache import ResultCache, result_cache_key
+from result_store import ResultStore, StoredResults
+from components import FactorizedResults, additive_loss, component_choices, factorizable_components
+from result_groups import group_timetables
+from estimator import estimate_search
+from feasible_set import FeasibleSetCache
+from property_kernels import PROPERTY_KERNELS, kernel_values, occupancy_array
+from sampler import sample_population_stats
+from sensitivity import analyze_weight_sensitivity
+from collections import Counter
+import math
+import time
 import numpy as np
 
 class Controller:
     def __init__(self, model, view):
         self.model = model
         self.view = view
+        self.result_cache = ResultCache()
+        self.result_store = ResultStore()
+        self.feasible_cache = FeasibleSetCache()
         # === 수정된 부분: drag_info 속성 제거 ===
 
     def start(self):
@@ -21,67 +37,305 @@ class Controller:
 
     def next_page(self):
         self.model.next_page() # Increment page first
+        self._refresh_catalog_if_needed()
         self.view.show_page(self.model.current_page)
         if self.model.current_page == 7: # If we just moved to page 7 (from page 6)
             self.view.root.after(100, self._run_scheduler_and_display)
 
     def prev_page(self):
         self.model.prev_page()
+        self._refresh_catalog_if_needed()
         self.view.show_page(self.model.current_page)
+
+    def _refresh_catalog_if_needed(self):
+        """강의 목록 페이지(2)로 들어갈 때, 새로 빌드된 카탈로그 delta가 있으면 적용합니다."""
+        if self.model.current_page == 2 and self.model.apply_pending_catalog_delta():
+            self.calculate_and_update_credits()
         
     def _run_scheduler_and_display(self):
-        scheduler = Scheduler(
+        config = self.view.config
+        profile_hook = jsonl_hook(config.PROFILE_LOG_FILE) if config.PROFILE_LOG_FILE else None
+        selected_lectures = self.model.get_selected_lectures()
+
+        cache_key = None
+        cached = None
+        scheduler = None
+        run_extra = {"mode": self.model.result_mode, "constraints": self.model.hard_constraints.to_dict()}
+        if config.RESULT_CACHE_ENABLED:
+            cache_key = result_cache_key(selected_lectures, self.model.good_slots, self.model.bad_slots,
+                                         self.model.loss_weights, self.model.catalog_version, extra=run_extra)
+            profile = RunProfile()
+            with profile.phase("result"):
+                lectures_by_id = {lec.id: lec for lec in selected_lectures}
+                cached = self.result_cache.load(cache_key, lectures_by_id)
+                if cached is None and self.result_store.has_run(cache_key):
+                    # 결과가 너무 많아 SQLite 저장소에 기록해 둔 이전 실행
+                    stored = self.result_store.results(cache_key, lectures_by_id)
+                    cached = stored, stored.elapsed_time, stored.engine
+
+        if cached is not None:
+            # 입력이 같은 이전 실행 결과를 그대로 사용합니다. (표시 시간은 캐시를 읽은 시간)
+            self.model.generated_timetables, _, engine = cached
+            self.model.infeasible_reason = None
+            profile.count("cache_hits")
+            if engine:
+                profile.extra["engine"] = engine
+            profile.elapsed_time = elapsed_time = profile.phase_times["result"]
+            if profile_hook is not None:
+                profile_hook(profile.to_dict())
+        else:
+            scheduler = self._create_scheduler(RunProfile(capture=config.PROFILE_CAPTURE_MODE), profile_hook)
+            # 선택한 강의를 제외한 입력이 직전 실행과 같으면 분반 추가/제거만 반영하여 결과를 갱신합니다.
+            signature = result_cache_key([], self.model.good_slots, self.model.bad_slots, self.model.loss_weights,
+                                         self.model.catalog_version, extra=run_extra)
+            state = self.model.solve_state
+            incremental = None
+            if self.model.result_mode == "ranked" and state is not None and state.signature == signature:
+                incremental = scheduler.run_incremental(state)
+            self.model.solve_state = None
+
+            if self.model.result_mode == "pareto":
+                self.model.generated_timetables, elapsed_time = scheduler.run_pareto()
+            elif incremental is not None:
+                self.model.generated_timetables, elapsed_time = incremental
+            elif self.feasible_cache.get(scheduler.feasible_key()) is not None:
+                # 선택한 분반이 같으면 충돌 검사 없이 저장해 둔 조합으로 점수만 다시 계산합니다.
+                self.model.generated_timetables, elapsed_time = scheduler.run_cached(self.feasible_cache)
+            else:
+                factorized = self._run_factorized(scheduler)
+                if factorized is not None:
+                    self.model.generated_timetables, elapsed_time = factorized
+                else:
+                    estimate = estimate_search(scheduler)
+                    scheduler.profile.extra["estimate"] = estimate.to_dict()
+                    if estimate.recommended_engine == "local_search":
+                        # 정확한 탐색이 너무 오래 걸릴 것 같으면 정해진 시간 안에 근사 탐색으로 좋은 시간표들을 찾습니다.
+                        print(f"[WARNING] {estimate.summary_text()}")
+                        self.model.generated_timetables, elapsed_time = scheduler.run_local_search()
+                    elif estimate.feasible_count > config.RESULT_STORE_SPILL_THRESHOLD:
+                        # 결과가 너무 많으면 메모리 대신 SQLite 저장소에 기록하고 보는 페이지만 읽어 옵니다.
+                        run_id = cache_key or "latest"
+                        _, elapsed_time = scheduler.run_to_store(self.result_store, run_id)
+                        self.model.generated_timetables = self.result_store.results(
+                            run_id, {lec.id: lec for lec in selected_lectures})
+                    else:
+                        self.model.generated_timetables, elapsed_time = scheduler.run_cached(self.feasible_cache)
+            if self.model.result_mode == "ranked" and isinstance(self.model.generated_timetables, list) and \
+                    scheduler.profile.extra.get("engine") != "local_search":
+                self.model.solve_state = scheduler.solve_state(signature, self.model.generated_timetables)
+            self.model.infeasible_reason = scheduler.infeasible_reason
+            profile = scheduler.profile
+            if cache_key is not None and self.model.generated_timetables and \
+                    not isinstance(self.model.generated_timetables, (StoredResults, FactorizedResults)):
+                self.result_cache.store(cache_key, self.model.generated_timetables, elapsed_time,
+                                        profile.extra.get("engine"))
+        self.model.last_run_profile = profile
+        
+        if isinstance(self.model.generated_timetables, (StoredResults, FactorizedResults)):
+            pass # 저장소에 기록된 결과와 묶음별 결과를 합친 결과는 읽을 때 통계가 채워집니다.
+        elif self.model.generated_timetables:
+            if self.model.result_mode == "ranked" and profile.extra.get("engine") != "local_search":
+                self._assign_exact_statistics(self.model.generated_timetables)
+            else:
+                # 결과가 모집단 전체가 아니면(근사 탐색, Pareto front) 표본으로 모집단 통계를 추정합니다.
+                self._assign_sampled_statistics(self.model.generated_timetables, profile)
+
+        self.model.build_result_index(self._group_results(scheduler, profile))
+        self.view.update_result_filter_options(*self.get_result_filter_options())
+        self.display_current_timetable(elapsed_time=elapsed_time)
+        self.view.update_overview()
+
+    def _run_factorized(self, scheduler):
+        """
+        수업 요일이 겹치지 않는 과목 묶음으로 나뉘면(components.py) 묶음별 조합 수의 합만큼만 검사하므로 추정 없이 정확히 풉니다.
+        결과가 RESULT_STORE_SPILL_THRESHOLD보다 많으면 곱집합을 나열하지 않는 FactorizedResults로, 아니면 run_cached()로
+        (결과, 소요 시간)을 반환합니다. 나눌 수 없거나, 결과가 많은데 Loss가 묶음별 기여의 합이 아니면 None을 반환합니다.
+        """
+        components = factorizable_components(scheduler)
+        if components is None:
+            return None
+        # 결과 수를 알려면 묶음별 부분 조합을 찾아야 하므로, 찾은 부분 조합을 엔진에 넘겨 다시 찾지 않게 합니다.
+        start_time = time.time()
+        with scheduler.profile.phase("enumeration"):
+            parts = component_choices(scheduler, components, scheduler.profile)
+        count = math.prod(len(part) for part in parts)
+        if count <= self.view.config.RESULT_STORE_SPILL_THRESHOLD:
+            results, _ = scheduler.run_cached(self.feasible_cache, parts)
+        elif additive_loss(scheduler):
+            results, _ = scheduler.run_factorized(components, parts)
+        else:
+            return None
+        return results, time.time() - start_time
+
+    def _group_results(self, scheduler, profile):
+        """요일별 점유와 점수가 같은 결과 묶음. run_cached()는 점수를 계산하면서 함께 만들고, 다른 경로의 결과는 여기서 만듭니다."""
+        timetables = self.model.generated_timetables
+        if not self.view.config.GROUP_SAME_OCCUPANCY or not timetables or \
+                isinstance(timetables, (StoredResults, FactorizedResults)):
+            return None
+        if scheduler is not None and scheduler.result_groups is not None:
+            return scheduler.result_groups
+        with profile.phase("grouping"):
+            result_groups = group_timetables(timetables, self._create_scheduler())
+        profile.extra["result_groups"] = len(result_groups)
+        return result_groups
+
+    @staticmethod
+    def _assign_exact_statistics(timetables):
+        """충돌 없는 시간표 전체가 결과에 있을 때의 Z-Score와 같은 점수 개수"""
+        scores = [tt.score for tt in timetables]
+        mean_score = np.mean(scores)
+        std_dev_score = np.std(scores)
+
+        score_counts = Counter(scores)
+
+        for tt in timetables:
+            tt.z_score = (tt.score - mean_score) / std_dev_score if std_dev_score != 0 else 0.0
+            tt.same_score_count = score_counts[tt.score]
+
+    def _assign_sampled_statistics(self, timetables, profile):
+        """충돌 없는 시간표를 표본 추출하여 Z-Score와 같은 점수 개수를 95% 신뢰 구간과 함께 추정합니다."""
+        with profile.phase("scoring"):
+            stats = sample_population_stats(self._create_scheduler())
+        if stats is None:
+            return
+        profile.extra["population"] = stats.to_dict()
+        for tt in timetables:
+            tt.z_score, tt.z_score_margin = stats.z_score(tt.score)
+            estimate, tt.same_score_interval = stats.same_score_count(tt.score)
+            tt.same_score_count = round(estimate)
+
+    def _create_scheduler(self, profile=None, profile_hook=None):
+        return Scheduler(
             self.model.get_selected_lectures(),
             self.model.good_slots,
             self.model.bad_slots,
-            self.model.loss_weights
+            self.model.loss_weights,
+            profile=profile,
+            profile_hook=profile_hook,
+            constraints=self.model.hard_constraints
         )
-        self.model.generated_timetables, elapsed_time = scheduler.run()
-        
-        if self.model.generated_timetables:
-            scores = [tt.score for tt in self.model.generated_timetables]
-            mean_score = np.mean(scores)
-            std_dev_score = np.std(scores)
-            
-            score_counts = {score: scores.count(score) for score in scores}
-
-            for tt in self.model.generated_timetables:
-                tt.z_score = (tt.score - mean_score) / std_dev_score if std_dev_score != 0 else 0.0
-                tt.same_score_count = score_counts[tt.score]
-
-        self.model.current_timetable_index = 0
-        self.display_current_timetable(elapsed_time=elapsed_time)
+
+    def on_estimate_request(self):
+        """P5: 현재 선택과 제약 조건으로 탐색 공간을 추정하고 요약 문자열과 경고 여부를 반환합니다."""
+        scheduler = self._create_scheduler()
+        if scheduler.infeasible_reason:
+            return f"생성 가능한 시간표가 없습니다. ({scheduler.infeasible_reason})", True
+        estimate = estimate_search(scheduler)
+        return estimate.summary_text(), estimate.is_slow or estimate.recommended_engine != "exact"
+
+    def on_sensitivity_request(self):
+        """P6: 가중치를 바꾸면 어떤 시간표가 1등이 될 수 있는지 분석하고 요약 문자열과 경고 여부를 반환합니다."""
+        timetables = self.model.generated_timetables
+        if not timetables:
+            return "분석할 시간표가 없습니다.", True
+        engine = self.model.last_run_profile.extra.get("engine") if self.model.last_run_profile else None
+        if self.model.result_mode != "ranked" or engine == "local_search" or \
+                isinstance(timetables, (StoredResults, FactorizedResults)):
+            # 순위를 바꿀 수 있는 시간표가 모두 결과에 있어야 분석 결과가 정확합니다.
+            return "가중치 민감도 분석은 메모리에 모든 결과가 있는 일반 순위 결과에서만 사용할 수 있습니다.", True
+        report = analyze_weight_sensitivity(timetables, self.model.loss_weights)
+        self.model.last_run_profile.extra["sensitivity"] = report.to_dict()
+        return report.summary_text(self.view.config.PAGE5_ATTRIBUTES), report.winner_share < 0.5
 
     def display_current_timetable(self, elapsed_time=None):
-        
-        if self.model.generated_timetables:
-            timetable = self.model.generated_timetables[self.model.current_timetable_index]
-            total = len(self.model.generated_timetables)
+        timetables = self.model.get_visible_timetables()
+        if timetables:
+            timetable = self.model.get_current_timetable()
+            if timetable.extra_properties is None:
+                scheduler = self._create_scheduler()
+                occupancy = occupancy_array([scheduler._day_masks_of(timetable.lectures)])
+                timetable.extra_properties = [(kernel.name, float(values[0]))
+                                              for kernel, _, values in kernel_values(occupancy, self.model.loss_weights)]
+            total = self.model.get_visible_count()
             index = self.model.current_timetable_index + 1
-            self.view.display_timetable(timetable, index, total, elapsed_time)
+            result_mode = self.model.result_mode
+            if self.model.last_run_profile is not None and self.model.last_run_profile.extra.get("engine") == "local_search":
+                result_mode = "local_search"
+            filtered_from = None
+            if self.model.visible_timetables is not None:
+                filtered_from = len(self.model.result_groups or self.model.generated_timetables)
+            alternatives = None
+            if self.model.visible_groups is not None:
+                alternatives = (self.model.current_alternative_index, len(self.model.get_current_alternatives()))
+            self.view.display_timetable(timetable, index, total, elapsed_time, result_mode, filtered_from, alternatives)
+        elif self.model.generated_timetables:
+            self.view.display_no_result("필터 조건에 맞는 결과가 없습니다")
         else:
-            self.view.display_no_result()
+            self.view.display_no_result(self.model.infeasible_reason)
+        if elapsed_time is not None:
+            self.view.display_run_profile(self.model.last_run_profile)
 
     def show_prev_timetable(self):
-        if self.model.generated_timetables and self.model.current_timetable_index > 0:
-            self.model.current_timetable_index -= 1
+        if self.model.get_visible_timetables() and self.model.current_timetable_index > 0:
+            self.model.set_current_timetable_index(self.model.current_timetable_index - 1)
             self.display_current_timetable()
 
     def show_next_timetable(self):
-        if self.model.generated_timetables and self.model.current_timetable_index < len(self.model.generated_timetables) - 1:
-            self.model.current_timetable_index += 1
+        if self.model.get_visible_timetables() and self.model.current_timetable_index < self.model.get_visible_count() - 1:
+            self.model.set_current_timetable_index(self.model.current_timetable_index + 1)
             self.display_current_timetable()
 
     def show_prev_timetable_fast(self):
-        if self.model.generated_timetables:
-            self.model.current_timetable_index = max(0, self.model.current_timetable_index - 10)
+        if self.model.get_visible_timetables():
+            self.model.set_current_timetable_index(max(0, self.model.current_timetable_index - 10))
             self.display_current_timetable()
 
     def show_next_timetable_fast(self):
-        if self.model.generated_timetables:
-            self.model.current_timetable_index = min(len(self.model.generated_timetables) - 1, self.model.current_timetable_index + 10)
+        if self.model.get_visible_timetables():
+            self.model.set_current_timetable_index(min(self.model.get_visible_count() - 1, self.model.current_timetable_index + 10))
+            self.display_current_timetable()
+
+    def get_alternative_labels(self):
+        """
+        P6: 현재 그룹의 분반 대안 목록 문자열. 그룹의 모든 결과에 공통인 분반은 빼고 다른 분반만 "과목 (분반) 교수"로 나열하며,
+        Config.GROUP_MAX_LISTED_ALTERNATIVES개까지만 반환합니다.
+        """
+        timetables = self.model.get_visible_timetables()
+        alternatives = [timetables[position].lectures for position in
+                        self.model.get_current_alternatives()[:self.view.config.GROUP_MAX_LISTED_ALTERNATIVES]]
+        common_ids = set.intersection(*({lec.id for lec in lectures} for lectures in alternatives))
+        return [f"{number}. " + ", ".join(f"{lec.name} ({lec.section}) {lec.prof}"
+                                          for lec in lectures if lec.id not in common_ids)
+                for number, lectures in enumerate(alternatives, start=1)]
+
+    def on_alternative_select(self, index):
+        """P6: 현재 그룹에서 index번째 분반 대안을 표시합니다."""
+        if 0 <= index < len(self.model.get_current_alternatives()):
+            self.model.current_alternative_index = index
             self.display_current_timetable()
 
+    def get_overview_items(self, count):
+        """P6 한눈에 보기: 앞에서부터 count개 항목의 [(항목 번호, Timetable), ...]. 그룹으로 묶었으면 그룹의 대표 결과"""
+        timetables = self.model.get_visible_timetables()
+        if not timetables:
+            return []
+        items = []
+        for index in range(min(count, self.model.get_visible_count())):
+            position = self.model.visible_groups.members(index)[0] if self.model.visible_groups is not None else index
+            items.append((index, timetables[position]))
+        return items
+
+    def on_overview_select(self, index):
+        """P6 한눈에 보기에서 누른 항목을 표시합니다."""
+        if 0 <= index < self.model.get_visible_count():
+            self.model.set_current_timetable_index(index)
+            self.display_current_timetable()
+
+    def get_result_filter_options(self):
+        """P6 필터 선택지: ([(분반 표시 이름, 강의 ID), ...], [교수, ...])"""
+        index = self.model.result_index
+        if index is None:
+            return [], []
+        lectures = sorted(index.lectures.values(), key=lambda lec: (lec.name, str(lec.section)))
+        return [(f"{lec.name} ({lec.section}) {lec.prof}", lec.id) for lec in lectures], index.professors()
+
+    def on_result_filter_change(self, name, values):
+        """P6 필터 변경: include_ids / exclude_profs / free_days 조건을 역색인으로 바로 적용합니다."""
+        self.model.set_result_filter(name, values)
+        self.display_current_timetable()
+        self.view.update_overview()
+
     def on_p1_lecture_select(self, event, tree):
         # === 수정된 부분: 강의 ID 기반으로 선택 로직 통일 ===
         # identify_region으로 클릭된 영역이 유효한지 확인
@@ -156,6 +410,15 @@ class Controller:
             new_pref = min(1, current_pref + 1)
         elif column_id == '#6': # '-' 컬럼
             new_pref = max(-1, current_pref - 1)
+        elif column_id == '#7': # 'Rule' 컬럼: 없음 -> 필수 -> 제외
+            new_rule = self.model.cycle_lecture_rule(lecture_id)
+            self.view.update_p2_lecture_rule_display(tree, lecture_id, new_rule)
+            return
+        elif column_id == '#8': # 'Optional' 컬럼: 과목 전체를 선택 과목으로 지정/해제
+            name = next(lec.name for lec in self.model.get_selected_lectures() if lec.id == lecture_id)
+            is_optional = self.model.toggle_course_optional(name)
+            self.view.update_p2_course_optional_display(tree, name, is_optional)
+            return
         else:
             return
 
@@ -190,6 +453,10 @@ class Controller:
     # on_timeslot_drag, on_timeslot_release 제거
     # =======================================
 
+    def get_weight_attributes(self):
+        """P5 슬라이더 항목: 기본 속성 뒤에 추가 속성(property_kernels)"""
+        return self.view.config.PAGE5_ATTRIBUTES + [kernel.name for kernel in PROPERTY_KERNELS]
+
     def get_weight(self, index):
         return self.model.loss_weights[index]['weight']
 
@@ -203,3 +470,49 @@ class Controller:
 
     def on_rss_toggle(self, index):
         self.model.toggle_rss(index)
+
+    def get_lecture_rule(self, lecture_id):
+        return self.model.get_lecture_rule(lecture_id)
+
+    def is_course_optional(self, name):
+        return self.model.is_course_optional(name)
+
+    def get_hard_constraints(self):
+        return self.model.hard_constraints
+
+    def on_free_day_toggle(self, day):
+        self.model.toggle_free_day(day)
+
+    def on_time_limit_change(self, name, text):
+        """
+        'HH:MM' 문자열을 슬롯 인덱스로 변환하여 시간 제한을 설정합니다.
+        earliest_slot은 해당 시각에 시작하는 슬롯, latest_slot은 해당 시각에 끝나는 슬롯입니다.
+        형식이 맞지 않거나 9:00~24:00 밖의 시각이면 경고를 출력하고 기존 값을 유지합니다.
+        """
+        value = None
+        if text and ':' in text:
+            try:
+                hours, minutes = map(int, text.split(':'))
+            except ValueError:
+                print(f"[WARNING] 시간은 HH:MM 형식으로 입력해야 합니다: '{text}'")
+                return
+            slot = ((hours - 9) * 60 + minutes) // 30
+            value = slot if name == 'earliest_slot' else slot - 1
+            if not 0 <= minutes < 60 or not 0 <= value < 30:
+                print(f"[WARNING] 시간 제한은 09:00~24:00 사이의 시각이어야 합니다: '{text}'")
+                return
+        self.model.set_constraint_value(name, value)
+
+    def on_credit_limit_change(self, name, text):
+        """학점 제한 입력값을 정수로 설정합니다. 비어 있거나 숫자가 아니면 제한을 해제합니다."""
+        try:
+            value = int(text)
+        except (TypeError, ValueError):
+            value = None
+        self.model.set_constraint_value(name, value)
+
+    def is_pareto_mode(self):
+        return self.model.result_mode == "pareto"
+
+    def on_pareto_toggle(self):
+        self.model.toggle_pareto_mode()
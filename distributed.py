@@ -0,0 +1,436 @@
+# distributed.py
+# 한 번의 시간표 탐색을 여러 호스트(작업자)가 나누어 실행합니다. (아주 큰 일괄 작업용)
+#
+# 사용 예:
+#   (코디네이터)  AGS_DISTRIBUTED_AUTHKEY=... python distributed.py coordinator --inputs inputs.json --host 0.0.0.0 \
+#                     --port 50000 --top 100 --output top.json
+#   (각 호스트)   AGS_DISTRIBUTED_AUTHKEY=... python distributed.py worker --connect coordinator-host:50000
+#   (한 컴퓨터)   python distributed.py coordinator --inputs inputs.json --local-workers 4
+#
+# manager 연결은 pickle로 객체를 주고받으므로 인증 키를 아는 쪽은 상대편(코디네이터/작업자)에서 코드를 실행할 수 있습니다.
+# 그래서 기본 인증 키는 두지 않고 코디네이터는 기본으로 루프백(127.0.0.1)에만 큐를 엽니다. 다른 호스트의 작업자를 받으려면
+# --authkey나 환경 변수 AGS_DISTRIBUTED_AUTHKEY로 키를 정해야 하며, 키 없이 루프백이 아닌 주소를 쓰면 실행하지 않습니다.
+# 키 없이 루프백에서 실행하면 이번 실행에서만 쓰는 임의 키를 만들어 로컬 작업자(--local-workers)에게만 넘깁니다.
+#
+# - 코디네이터는 앞쪽 과목들의 분반 배정(prefix) 하나를 작업 하나로 하여 탐색 공간을 나누고,
+#   multiprocessing.managers로 작업 큐와 결과 큐를 엽니다. 작업자는 어느 호스트에서든 큐에 접속해
+#   작업을 하나씩 가져가 나머지 과목을 깊이 우선 탐색(Scheduler._dfs)하고, 상위 K개 시간표와 카운터를 돌려줍니다.
+# - 작업 번호는 prefix의 조합 번호이고 작업 안의 결과는 탐색 순서대로 번호를 붙이므로, (점수, 작업 번호, 순서)로
+#   합친 상위 K개는 Scheduler.run() 결과의 앞 K개와 순서까지 같습니다.
+# - 작업자는 작업을 처리하는 동안 Config.DISTRIBUTED_HEARTBEAT_SECONDS마다 "alive" 메시지를 보내고, 코디네이터는
+#   받을 때마다 그 작업의 제한 시각을 늘립니다. 그래서 오래 걸리는 작업도 작업자가 살아 있으면 다시 큐에 넣지 않습니다.
+#   Config.DISTRIBUTED_JOB_TIMEOUT 동안 소식이 없거나(연결 끊김, 프로세스 종료) 오류를 보고하면 그 작업을 다시 큐에
+#   넣습니다. 큐가 비었는데 시작 보고가 없는 작업(꺼내 간 직후 끊긴 경우)도 마찬가지입니다.
+#   같은 작업의 결과가 두 번 오면 먼저 온 것만 사용합니다.
+# - 강의 목록은 코디네이터가 선택한 강의만 보내므로 작업자 호스트에 lectures.json이 없어도 됩니다. (코드는 같아야 함)
+import argparse
+import heapq
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from config import Config
+from constraints import HardConstraints
+from profiler import RunProfile
+from scheduler import Scheduler
+
+
+# --- 작업 큐 서버 (코디네이터가 띄우는 manager 프로세스 안의 객체) ---
+
+class _Board:
+    """현재 실행의 문제(선택한 강의, 입력)를 작업자에게 알려 주는 게시판"""
+    def __init__(self):
+        self._problem = None
+
+    def set(self, problem):
+        self._problem = problem
+
+    def get(self):
+        return self._problem
+
+
+_jobs = queue.Queue()
+_results = queue.Queue()
+_board = _Board()
+
+
+def _get_jobs():
+    return _jobs
+
+
+def _get_results():
+    return _results
+
+
+def _get_board():
+    return _board
+
+
+class QueueManager(BaseManager):
+    pass
+
+
+QueueManager.register('get_jobs', callable=_get_jobs)
+QueueManager.register('get_results', callable=_get_results)
+QueueManager.register('get_board', callable=_get_board)
+
+
+def is_loopback(host):
+    """host가 이 컴퓨터 안에서만 접속할 수 있는 주소인지 (빈 문자열은 모든 인터페이스)"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def resolve_authkey(authkey, host, generate=False):
+    """
+    manager 연결에 쓸 인증 키(bytes). 인자, 환경 변수 Config.DISTRIBUTED_AUTHKEY_ENV 순서로 찾습니다.
+    둘 다 없으면 generate(코디네이터)이고 host가 루프백일 때만 임의 키를 만들고, 아니면 ValueError를 발생시킵니다.
+    """
+    authkey = authkey or os.environ.get(Config.DISTRIBUTED_AUTHKEY_ENV)
+    if authkey:
+        return authkey.encode('utf-8') if isinstance(authkey, str) else authkey
+    if generate and is_loopback(host):
+        return secrets.token_bytes(32)
+    raise ValueError(f"인증 키가 필요합니다. --authkey 또는 환경 변수 {Config.DISTRIBUTED_AUTHKEY_ENV}로 지정하세요. "
+                     f"(주소: {host or '모든 인터페이스'})")
+
+
+def parse_address(text):
+    """"host:port" 문자열을 (host, port)로 바꿉니다."""
+    host, _, port = text.rpartition(':')
+    return host or "127.0.0.1", int(port)
+
+
+# --- 탐색 공간 나누기 ---
+
+def prefix_jobs(scheduler, target_jobs=None):
+    """
+    앞쪽 과목들의 분반 배정(prefix) 목록을 조합 순서대로 반환합니다.
+    prefix 수가 target_jobs 이상이 되는 가장 짧은 길이를 고르며, 선택 과목의 마지막 자리 값은 "빼기"입니다.
+    """
+    target_jobs = target_jobs or Config.DISTRIBUTED_TARGET_JOBS
+    radices = [len(cluster) + (1 if optional else 0)
+               for cluster, optional in zip(scheduler.lecture_clusters, scheduler.optional_flags)]
+    depth, count = 0, 1
+    while depth < len(radices) and count < target_jobs:
+        count *= radices[depth]
+        depth += 1
+    return list(itertools.product(*(range(radix) for radix in radices[:depth])))
+
+
+def solve_prefix(scheduler, prefix, result_count):
+    """
+    prefix를 고정한 부분 공간을 탐색하여 (상위 결과, 카운터)를 반환합니다.
+    상위 결과는 (점수, 탐색 순서, 강의 ID 목록, 속성)을 (점수, 순서) 오름차순으로 result_count개까지 담은 리스트입니다.
+    """
+    scheduler.profile = RunProfile()
+    best = [] # (-점수, -순서, ...) 최대 힙: 지금까지의 상위 result_count개 중 가장 나쁜 것이 맨 앞
+    sequence = itertools.count()
+
+    def on_leaf(lectures, day_masks, prefer_prop):
+        properties = scheduler._properties_from_masks(day_masks, prefer_prop)
+        score = scheduler._calculate_loss(lectures, properties)
+        order = next(sequence)
+        if len(best) < result_count:
+            heapq.heappush(best, (-score, -order, [lec.id for lec in lectures], properties))
+        elif (score, order) < (-best[0][0], -best[0][1]):
+            heapq.heapreplace(best, (-score, -order, [lec.id for lec in lectures], properties))
+
+    scheduler._dfs(on_leaf, prefix=prefix)
+    results = sorted((-score, -order, ids, properties) for score, order, ids, properties in best)
+    return results, dict(scheduler.profile.counters)
+
+
+# --- 작업자 ---
+
+def _connect(address, authkey, timeout=None):
+    """코디네이터에 접속합니다. 코디네이터가 아직 뜨지 않았으면 timeout까지 다시 시도합니다."""
+    timeout = timeout if timeout is not None else Config.DISTRIBUTED_CONNECT_TIMEOUT
+    deadline = time.time() + timeout
+    while True:
+        manager = QueueManager(address=address, authkey=authkey)
+        try:
+            manager.connect()
+            return manager
+        except (ConnectionError, OSError):
+            if time.time() >= deadline:
+                raise
+            time.sleep(1.0)
+
+
+def _problem_scheduler(problem):
+    scheduler = Scheduler(problem["lectures"], problem["good_slots"], problem["bad_slots"], problem["weights"],
+                          constraints=HardConstraints.from_dict(problem["constraints"]))
+    clusters = [[lec.id for lec in cluster] for cluster in scheduler.lecture_clusters]
+    if clusters != problem["clusters"]:
+        raise RuntimeError("작업자의 과목 묶음이 코디네이터와 다릅니다. (두 호스트의 코드 버전을 확인하세요)")
+    return scheduler
+
+
+def _heartbeat(results, message, stop):
+    """(작업자의 보조 스레드) stop이 설정될 때까지 Config.DISTRIBUTED_HEARTBEAT_SECONDS마다 message를 보냅니다."""
+    while not stop.wait(Config.DISTRIBUTED_HEARTBEAT_SECONDS):
+        try:
+            results.put(message)
+        except (EOFError, ConnectionError, OSError):
+            return # 연결이 끊기면 작업 스레드가 알아차립니다.
+
+
+def run_worker(address, authkey=None, name=None):
+    """
+    작업 큐가 빌 때(종료 신호)까지 작업을 가져와 처리합니다. 처리한 작업 수를 반환합니다.
+    authkey는 코디네이터와 같은 키이며, 없으면 환경 변수에서 찾고 그래도 없으면 ValueError를 발생시킵니다.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    manager = _connect(address, resolve_authkey(authkey, address[0]))
+    jobs, results, board = manager.get_jobs(), manager.get_results(), manager.get_board()
+    schedulers = {} # run_id -> Scheduler
+    processed = 0
+    while True:
+        try:
+            job = jobs.get(timeout=Config.DISTRIBUTED_POLL_SECONDS)
+        except queue.Empty:
+            continue
+        except (EOFError, ConnectionError, OSError):
+            print(f"[WARNING] 코디네이터와 연결이 끊겼습니다. ({name}, 처리한 작업 {processed}개)")
+            return processed
+        if job is None:
+            jobs.put(None) # 다른 작업자도 종료 신호를 받도록 되돌려 놓습니다.
+            return processed
+
+        run_id, index, attempt, prefix, result_count = job
+        message = {"run_id": run_id, "job": index, "attempt": attempt, "worker": name}
+        results.put(dict(message, type="start"))
+        start_time = time.time()
+        stop = threading.Event()
+        threading.Thread(target=_heartbeat, args=(results, dict(message, type="alive"), stop), daemon=True).start()
+        try:
+            if run_id not in schedulers:
+                problem = board.get()
+                if problem is None or problem["run_id"] != run_id:
+                    raise RuntimeError(f"실행 {run_id}의 문제 정보를 찾을 수 없습니다.")
+                schedulers = {run_id: _problem_scheduler(problem)}
+            top, counters = solve_prefix(schedulers[run_id], prefix, result_count)
+            results.put(dict(message, type="done", results=top, counters=counters, elapsed=time.time() - start_time))
+            processed += 1
+        except (EOFError, ConnectionError, OSError):
+            print(f"[WARNING] 코디네이터와 연결이 끊겼습니다. ({name}, 처리한 작업 {processed}개)")
+            return processed
+        except Exception as e:
+            results.put(dict(message, type="error", error=repr(e)))
+        finally:
+            stop.set()
+
+
+# --- 코디네이터 ---
+
+def run_distributed(scheduler, result_count=None, address=None, authkey=None, local_workers=0, target_jobs=None):
+    """
+    scheduler의 탐색을 작업자들에게 나누어 실행하고 run()과 같은 형식의 (상위 result_count개 결과, 소요 시간)을 반환합니다.
+    address: 작업 큐를 열 (host, port). 기본은 (Config.DISTRIBUTED_HOST, Config.DISTRIBUTED_PORT)
+    authkey: 작업자와 공유하는 인증 키 (resolve_authkey). 루프백이 아닌 주소에서 키가 없으면 ValueError를 발생시킵니다.
+    local_workers: 이 컴퓨터에서 함께 띄울 작업자 프로세스 수 (다른 호스트의 작업자 대신 시험할 때도 사용)
+    작업이 Config.DISTRIBUTED_MAX_ATTEMPTS번 모두 실패하면 RuntimeError를 발생시킵니다.
+    """
+    from model import Timetable
+    result_count = result_count or Config.DISTRIBUTED_RESULT_COUNT
+    address = address or (Config.DISTRIBUTED_HOST, Config.DISTRIBUTED_PORT)
+    authkey = resolve_authkey(authkey, address[0], generate=True)
+    start_time = time.time()
+    profile = scheduler.profile
+    if not scheduler.lecture_clusters:
+        return [], 0
+
+    run_id = f"{socket.gethostname()}:{os.getpid()}:{start_time}"
+    prefixes = prefix_jobs(scheduler, target_jobs)
+    manager = QueueManager(address=address, authkey=authkey)
+    manager.start()
+    workers = []
+    try:
+        jobs, results, board = manager.get_jobs(), manager.get_results(), manager.get_board()
+        board.set({
+            "run_id": run_id,
+            "lectures": scheduler.selected_lectures,
+            "good_slots": scheduler.good_slots,
+            "bad_slots": scheduler.bad_slots,
+            "weights": scheduler.weights,
+            "constraints": scheduler.constraints.to_dict(),
+            "clusters": [[lec.id for lec in cluster] for cluster in scheduler.lecture_clusters],
+        })
+        for index, prefix in enumerate(prefixes):
+            jobs.put((run_id, index, 1, prefix, result_count))
+
+        worker_address = ("127.0.0.1", manager.address[1])
+        for i in range(local_workers):
+            process = multiprocessing.Process(target=run_worker, args=(worker_address, authkey, f"local-{i}"), daemon=True)
+            process.start()
+            workers.append(process)
+        print(f"작업 {len(prefixes)}개를 {manager.address[0] or '*'}:{manager.address[1]}에서 기다립니다. "
+              f"(로컬 작업자 {local_workers}개)")
+
+        with profile.phase("enumeration"):
+            merged, stats = _collect(jobs, results, run_id, prefixes, result_count, profile)
+        jobs.put(None) # 작업자 종료 신호
+        for process in workers:
+            process.join(timeout=Config.DISTRIBUTED_POLL_SECONDS * 4)
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        manager.shutdown()
+
+    lectures_by_id = {lec.id: lec for lec in scheduler.selected_lectures}
+    with profile.phase("result"):
+        timetables = [Timetable([lectures_by_id[i] for i in ids], score, properties)
+                      for score, _, _, ids, properties in merged]
+    profile.extra["engine"] = "distributed"
+    profile.extra["distributed"] = stats
+    profile.elapsed_time = elapsed_time = time.time() - start_time
+    if scheduler.profile_hook is not None:
+        scheduler.profile_hook(profile.to_dict())
+    return timetables, elapsed_time
+
+
+def _collect(jobs, results, run_id, prefixes, result_count, profile):
+    """
+    결과 큐에서 작업 결과를 모아 (점수, 작업 번호, 순서, 강의 ID 목록, 속성) 상위 result_count개와 통계를 반환합니다.
+    시작 또는 "alive" 메시지를 받은 뒤 제한 시간이 지나도록 소식이 없는 작업과 오류가 난 작업은 다시 큐에 넣습니다.
+    """
+    remaining = set(range(len(prefixes)))
+    attempts = {index: 1 for index in remaining}
+    leases = {} # 작업 번호 -> 제한 시각 (가장 최근 시도의 마지막 시작/alive 메시지 기준)
+    queued_at = {index: time.time() for index in remaining}
+    merged = []
+    stats = {"jobs": len(prefixes), "requeued": 0, "errors": 0, "duplicates": 0, "workers": set(), "job_time": 0.0}
+
+    def requeue(index, reason):
+        if attempts[index] >= Config.DISTRIBUTED_MAX_ATTEMPTS:
+            raise RuntimeError(f"작업 {index}이(가) {attempts[index]}번 모두 실패했습니다: {reason}")
+        attempts[index] += 1
+        stats["requeued"] += 1
+        leases.pop(index, None)
+        queued_at[index] = time.time()
+        print(f"[WARNING] 작업 {index}을(를) 다시 큐에 넣습니다. ({reason})")
+        jobs.put((run_id, index, attempts[index], prefixes[index], result_count))
+
+    while remaining:
+        try:
+            message = results.get(timeout=Config.DISTRIBUTED_POLL_SECONDS)
+        except queue.Empty:
+            message = None
+        if message is not None and message["run_id"] == run_id:
+            index = message["job"]
+            stats["workers"].add(message["worker"])
+            if index not in remaining:
+                stats["duplicates"] += message["type"] == "done"
+            elif message["type"] == "start" or \
+                    (message["type"] == "alive" and message["attempt"] == attempts[index]):
+                leases[index] = time.time() + Config.DISTRIBUTED_JOB_TIMEOUT
+            elif message["type"] == "error":
+                stats["errors"] += 1
+                if message["attempt"] == attempts[index]:
+                    requeue(index, f"{message['worker']}: {message['error']}")
+            elif message["type"] == "done":
+                remaining.discard(index)
+                leases.pop(index, None)
+                stats["job_time"] += message["elapsed"]
+                for name, value in message["counters"].items():
+                    profile.count(name, value)
+                merged = heapq.nsmallest(result_count, merged + [
+                    (score, index, order, ids, properties) for score, order, ids, properties in message["results"]],
+                    key=lambda item: item[:3])
+        now = time.time()
+        for index, deadline in list(leases.items()):
+            if now > deadline:
+                requeue(index, "제한 시간 초과")
+        if message is None and jobs.empty():
+            for index in remaining - leases.keys():
+                if now - queued_at[index] > Config.DISTRIBUTED_JOB_TIMEOUT:
+                    requeue(index, "작업자가 가져간 뒤 시작하지 못함")
+    stats["workers"] = len(stats["workers"])
+    return merged, stats
+
+
+# --- 명령줄 ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AGS 시간표 생성기 (여러 호스트 분산 탐색)")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator = subparsers.add_parser("coordinator", help="탐색 공간을 작업으로 나누어 큐를 열고 결과를 합칩니다")
+    coordinator.add_argument("--inputs", help="headless inputs 형식의 JSON 파일")
+    coordinator.add_argument("--host", default=Config.DISTRIBUTED_HOST,
+                             help="작업 큐를 열 주소 (기본: 루프백, 다른 호스트의 작업자를 받으려면 인증 키 필요)")
+    coordinator.add_argument("--port", type=int, default=Config.DISTRIBUTED_PORT, help="작업 큐 포트 (0이면 빈 포트)")
+    coordinator.add_argument("--authkey", help=f"작업자와 공유하는 인증 키 (기본: 환경 변수 {Config.DISTRIBUTED_AUTHKEY_ENV})")
+    coordinator.add_argument("--top", type=int, default=Config.DISTRIBUTED_RESULT_COUNT, help="남길 상위 시간표 개수")
+    coordinator.add_argument("--jobs", type=int, default=Config.DISTRIBUTED_TARGET_JOBS, help="나눌 작업 수의 목표")
+    coordinator.add_argument("--local-workers", type=int, default=0, help="이 컴퓨터에서 함께 띄울 작업자 수")
+    coordinator.add_argument("--output", help="상위 시간표를 기록할 JSON 파일")
+    worker = subparsers.add_parser("worker", help="코디네이터에 접속하여 작업을 처리합니다")
+    worker.add_argument("--connect", required=True, help="코디네이터 주소 host:port")
+    worker.add_argument("--authkey", help=f"코디네이터와 공유하는 인증 키 (기본: 환경 변수 {Config.DISTRIBUTED_AUTHKEY_ENV})")
+    args = parser.parse_args(argv)
+
+    if args.role == "worker":
+        try:
+            processed = run_worker(parse_address(args.connect), args.authkey)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return 1
+        except (ConnectionError, OSError) as e:
+            print(f"[ERROR] 코디네이터({args.connect})에 접속하지 못했습니다: {e}")
+            return 1
+        print(f"작업 {processed}개 처리")
+        return 0
+
+    from headless import apply_inputs
+    from model import Model
+    model = Model()
+    if args.inputs:
+        with open(args.inputs, 'r', encoding='utf-8') as f:
+            apply_inputs(model, json.load(f))
+    scheduler = Scheduler(model.get_selected_lectures(), model.good_slots, model.bad_slots, model.loss_weights,
+                          constraints=model.hard_constraints)
+    if scheduler.infeasible_reason:
+        print(f"생성 가능한 시간표가 없습니다. ({scheduler.infeasible_reason})")
+        return 0
+    try:
+        resolve_authkey(args.authkey, args.host, generate=True)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    try:
+        results, elapsed_time = run_distributed(scheduler, args.top, (args.host, args.port), args.authkey,
+                                                args.local_workers, args.jobs)
+    except RuntimeError as e:
+        print(f"[ERROR] 분산 탐색 실패: {e}")
+        return 1
+
+    stats = scheduler.profile.extra.get("distributed", {})
+    print(f"상위 {len(results)}개 ({elapsed_time:.2f}초, 작업 {stats.get('jobs', 0)}개, 작업자 {stats.get('workers', 0)}명, "
+          f"재시도 {stats.get('requeued', 0)}번)")
+    for rank, tt in enumerate(results[:5], start=1):
+        names = ", ".join(f"{lec.name}({lec.section})" for lec in tt.lectures)
+        print(f"#{rank} score={tt.score:.2f}  {names}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([{"lecture_ids": [lec.id for lec in tt.lectures], "score": tt.score,
+                        "properties": list(tt.properties)} for tt in results], f, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# estimator.py
+# 시간표를 생성하기 전에 탐색 공간의 크기와 충돌 없는 시간표 수를 추정하고,
+# 엔진별 예상 실행 시간으로 사용할 엔진을 고릅니다.
+import math
+import random
+import time
+
+from config import Config
+from constraints import credit_for_name
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class SearchEstimate:
+    """
+    탐색 공간 추정 결과.
+    - product_size: 분반 조합의 전체 개수 (충돌 무시)
+    - feasible_count: 충돌 없는(학점 범위도 만족하는) 시간표 수. exact가 False이면 표본 추정값
+    - feasible_stderr: 표본 추정의 표준 오차 (정확히 센 경우 0)
+    - engine_seconds: 엔진별 예상 실행 시간 {"exact": 초, "pareto": 초, "local_search": 초}
+    - recommended_engine: 정확한 탐색이 예산 안에 끝날 것 같으면 "exact", 아니면 "local_search"
+    """
+    def __init__(self, product_size, feasible_count, exact, feasible_stderr, engine_seconds, recommended_engine,
+                 elapsed_time=0.0):
+        self.product_size = product_size
+        self.feasible_count = feasible_count
+        self.exact = exact
+        self.feasible_stderr = feasible_stderr
+        self.engine_seconds = engine_seconds
+        self.recommended_engine = recommended_engine
+        self.elapsed_time = elapsed_time
+
+    @property
+    def is_slow(self):
+        """추천 엔진으로도 ESTIMATE_WARN_SECONDS보다 오래 걸릴 것으로 예상되면 True."""
+        return self.engine_seconds[self.recommended_engine] > Config.ESTIMATE_WARN_SECONDS
+
+    def to_dict(self):
+        return {
+            "product_size": self.product_size,
+            "feasible_count": self.feasible_count,
+            "exact": self.exact,
+            "feasible_stderr": self.feasible_stderr,
+            "engine_seconds": dict(self.engine_seconds),
+            "recommended_engine": self.recommended_engine,
+            "elapsed_time": self.elapsed_time,
+        }
+
+    def summary_text(self):
+        """P5에 표시할 요약 문자열을 생성합니다."""
+        if self.exact:
+            feasible = f"{self.feasible_count:,}개"
+        else:
+            feasible = f"약 {self.feasible_count:,.0f}개 (±{self.feasible_stderr:,.0f})"
+        seconds = " / ".join(f"{engine} {value:.1f}초" for engine, value in self.engine_seconds.items())
+        text = f"분반 조합 {self.product_size:,}개, 충돌 없는 시간표 {feasible}\n예상 시간: {seconds}"
+        if self.recommended_engine == "local_search":
+            text += "\n조합이 너무 많아 근사 탐색으로 시간표를 찾습니다. (최적이 아닐 수 있음)"
+        elif self.is_slow:
+            text += "\n경고: 시간표 생성에 시간이 오래 걸릴 수 있습니다."
+        return text
+
+
+def _search_tables(scheduler):
+    """클러스터별 (분반 week mask 리스트, 선택 과목 여부, 학점)과 남은 과목의 최소/최대 학점을 준비합니다."""
+    masks = [[week_mask for _, week_mask, _ in options] for options in scheduler._section_table()]
+    optional = scheduler.optional_flags
+    credits = [credit_for_name(cluster[0].name) for cluster in scheduler.lecture_clusters]
+    n = len(masks)
+    min_rest = [0] * (n + 1)
+    max_rest = [0] * (n + 1)
+    for k in range(n - 1, -1, -1):
+        min_rest[k] = min_rest[k + 1] + (0 if optional[k] else credits[k])
+        max_rest[k] = max_rest[k + 1] + credits[k]
+    return masks, optional, credits, min_rest, max_rest
+
+
+class FeasibleCounter:
+    """
+    충돌 없는 시간표 수를 시간표를 만들지 않고 정확히 셉니다.
+    남은 과목들이 쓸 수 있는 슬롯만 상태로 남기면 (k, 점유, 학점)이 같은 부분 해가 많아지므로,
+    상태별 개수를 memo에 기억해 두고 재사용합니다. (sampler.py가 균등 표본 추출에 같은 memo를 사용합니다)
+    기억한 상태 수가 node_budget을 넘으면 count()는 None을 반환합니다.
+    """
+    def __init__(self, scheduler, node_budget=None):
+        self.node_budget = node_budget if node_budget is not None else Config.ESTIMATE_EXACT_NODE_BUDGET
+        self.masks, self.optional, self.credits, self.min_rest, self.max_rest = _search_tables(scheduler)
+        self.n = len(self.masks)
+        self.min_credits = scheduler.constraints.min_credits
+        self.max_credits = scheduler.constraints.max_credits
+        # 과목 k 이후의 분반들이 차지할 수 있는 모든 슬롯
+        self.future = [0] * (self.n + 1)
+        for k in range(self.n - 1, -1, -1):
+            for week_mask in self.masks[k]:
+                self.future[k] |= week_mask
+            self.future[k] |= self.future[k + 1]
+        self.memo = {}
+
+    def count(self):
+        if not self.masks:
+            return 0
+        try:
+            return self.count_from(0, 0, 0)
+        except _BudgetExceeded:
+            return None
+
+    def count_from(self, k, occupied, credit_sum):
+        """과목 k부터 배치하여 완성할 수 있는 시간표 수"""
+        if (self.max_credits is not None and credit_sum + self.min_rest[k] > self.max_credits) or \
+                (self.min_credits is not None and credit_sum + self.max_rest[k] < self.min_credits):
+            return 0
+        if k == self.n:
+            return 1 if credit_sum > 0 else 0
+        occupied &= self.future[k]
+        key = (k, occupied, credit_sum)
+        if key in self.memo:
+            return self.memo[key]
+        if len(self.memo) >= self.node_budget:
+            raise _BudgetExceeded()
+        total = 0
+        for week_mask in self.masks[k]:
+            if not occupied & week_mask:
+                total += self.count_from(k + 1, occupied | week_mask, credit_sum + self.credits[k])
+        if self.optional[k]:
+            total += self.count_from(k + 1, occupied, credit_sum)
+        self.memo[key] = total
+        return total
+
+
+    def _fits(self, k, credit_sum):
+        """과목 k부터 채울 수 있는 학점으로 학점 범위를 만족할 수 있는지 확인합니다."""
+        return not ((self.max_credits is not None and credit_sum + self.min_rest[k] > self.max_credits) or
+                    (self.min_credits is not None and credit_sum + self.max_rest[k] < self.min_credits))
+
+    def random_path(self, rng):
+        """
+        과목마다 지금까지와 충돌하지 않는 선택지 중 하나를 균등하게 골라 시간표 하나를 만듭니다. (Knuth의 무작위 경로)
+        (과목별 분반 인덱스 리스트 (-1 = 뺌), 가중치)를 반환합니다. 가중치는 그 경로가 뽑힐 확률의 역수이며,
+        막다른 경로이면 0입니다. 가중치의 평균은 충돌 없는 시간표 수의 불편 추정값입니다.
+        """
+        weight = 1
+        occupied = 0
+        credit_sum = 0
+        choices = []
+        for k in range(self.n):
+            options = [index for index, week_mask in enumerate(self.masks[k])
+                       if not occupied & week_mask and self._fits(k + 1, credit_sum + self.credits[k])]
+            if self.optional[k] and self._fits(k + 1, credit_sum):
+                options.append(-1)
+            if not options:
+                return choices, 0
+            weight *= len(options)
+            index = rng.choice(options)
+            choices.append(index)
+            if index != -1:
+                occupied |= self.masks[k][index]
+                credit_sum += self.credits[k]
+        return choices, (weight if credit_sum > 0 else 0)
+
+    def uniform_path(self, rng):
+        """
+        count()가 성공한 뒤에 사용할 수 있습니다. 각 선택지를 그 아래에서 완성할 수 있는 시간표 수에 비례하는
+        확률로 고르면, 충돌 없는 시간표 전체에서 정확히 균등하게 하나를 뽑게 됩니다.
+        과목별 분반 인덱스 리스트 (-1 = 뺌)를 반환합니다.
+        """
+        occupied = 0
+        credit_sum = 0
+        choices = []
+        for k in range(self.n):
+            options = []
+            for index, week_mask in enumerate(self.masks[k]):
+                if not occupied & week_mask:
+                    options.append((index, week_mask, self.credits[k]))
+            if self.optional[k]:
+                options.append((-1, 0, 0))
+            weights = [self.count_from(k + 1, occupied | week_mask, credit_sum + credit)
+                       for _, week_mask, credit in options]
+            index, week_mask, credit = rng.choices(options, weights)[0]
+            choices.append(index)
+            occupied |= week_mask
+            credit_sum += credit
+        return choices
+
+
+def count_feasible(scheduler, node_budget=None):
+    """충돌 없는 시간표 수를 정확히 셉니다. 상태 수가 node_budget을 넘으면 None을 반환합니다."""
+    return FeasibleCounter(scheduler, node_budget).count()
+
+
+def sample_feasible(scheduler, samples=None, seed=None):
+    """
+    충돌 없는 시간표 수를 무작위 경로(FeasibleCounter.random_path)의 가중치 평균으로 추정합니다.
+    (추정값, 표준 오차)를 반환합니다.
+    """
+    samples = samples if samples is not None else Config.ESTIMATE_SAMPLES
+    rng = random.Random(seed)
+    counter = FeasibleCounter(scheduler)
+    if not counter.masks:
+        return 0.0, 0.0
+    values = [counter.random_path(rng)[1] for _ in range(samples)]
+    mean = sum(values) / len(values)
+    variance = sum((v - mean) ** 2 for v in values) / max(1, len(values) - 1)
+    return mean, math.sqrt(variance / len(values))
+
+
+def predict_engine_seconds(scheduler, product_size, feasible_count):
+    """엔진별 예상 실행 시간(초)을 Config의 단위 비용으로 계산합니다."""
+    if any(scheduler.optional_flags):
+        # 선택 과목이 있으면 run()도 깊이 우선 탐색을 사용합니다.
+        exact = feasible_count * Config.ESTIMATE_SECONDS_PER_DFS_LEAF
+    else:
+        exact = (product_size * Config.ESTIMATE_SECONDS_PER_COMBINATION +
+                 feasible_count * Config.ESTIMATE_SECONDS_PER_TIMETABLE)
+    return {
+        "exact": exact,
+        "pareto": feasible_count * Config.ESTIMATE_SECONDS_PER_DFS_LEAF, # 가지치기 전 기준 (상한)
+        "local_search": Config.LOCAL_SEARCH_TIME_BUDGET,
+    }
+
+
+def estimate_search(scheduler, node_budget=None, samples=None, seed=None):
+    """Scheduler의 탐색 공간을 추정하고 추천 엔진을 포함한 SearchEstimate를 반환합니다."""
+    start_time = time.time()
+    product_size = scheduler.search_space_size()
+    feasible_count = count_feasible(scheduler, node_budget)
+    exact = feasible_count is not None
+    stderr = 0.0
+    if not exact:
+        feasible_count, stderr = sample_feasible(scheduler, samples, seed)
+
+    engine_seconds = predict_engine_seconds(scheduler, product_size, feasible_count)
+    if engine_seconds["exact"] > Config.EXACT_ENGINE_MAX_SECONDS:
+        recommended = "local_search"
+    else:
+        recommended = "exact"
+    return SearchEstimate(product_size, feasible_count, exact, stderr, engine_seconds, recommended,
+                          time.time() - start_time)
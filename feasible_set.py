@@ -0,0 +1,232 @@
+# feasible_set.py
+# 충돌 없는 시간표 전체(feasible set)를 점수와 무관한 형태로 저장해 두고, 점수만 벡터 연산으로 다시 계산합니다.
+#
+# 어떤 분반 조합이 충돌하지 않는지는 선택한 분반(과 제약 조건)에만 달려 있고,
+# 선호/비선호 시간, 강의 선호도, 가중치는 점수에만 영향을 줍니다. 그래서 2~4페이지에서 입력을 조금 바꾸고
+# 돌아오면 조합을 다시 만들고 충돌 검사를 하지 않고, 저장해 둔 조합으로 점수만 다시 계산합니다.
+#
+# 한 시간표 안의 분반들은 서로 겹치지 않으므로, 요일별 슬롯 수(선호/비선호 시간과 겹치는 수, 수업 슬롯 수)는
+# 분반별 값을 더하기만 하면 됩니다. 공강 시간은 분반별 첫/마지막 슬롯의 최솟값/최댓값으로 구합니다.
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from config import Config
+from intervals import slot_minutes
+from property_kernels import extra_loss
+from result_groups import ResultGroups, occupancy_group_ids
+from scheduler import popcount
+
+
+def _first_last(mask):
+    """비트마스크의 (첫 슬롯, 마지막 슬롯). 비어 있으면 (큰 값, -1)"""
+    if not mask:
+        return 1 << 30, -1
+    return (mask & -mask).bit_length() - 1, mask.bit_length() - 1
+
+
+def feasible_set_key(scheduler):
+    """충돌 없는 조합을 결정하는 입력(과목별 분반과 시간, 선택 과목, 학점 범위)의 키"""
+    canonical = {
+        "clusters": [[[lec.id, [[slot['day'], slot['start_index'], slot['end_index'], *slot_minutes(slot)]
+                               for slot in lec.time_slots]]
+                      for lec in cluster] for cluster in scheduler.lecture_clusters],
+        "optional": list(scheduler.optional_flags),
+        "credits": [scheduler.constraints.min_credits, scheduler.constraints.max_credits],
+    }
+    encoded = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class FeasibleSet:
+    """
+    충돌 없는 시간표 전체.
+    - choices: (시간표 수, 과목 수) 배열. 과목별로 고른 분반의 위치이며, 뺀 선택 과목은 -1입니다.
+      분반별 배열의 마지막에 0인 행을 하나 더 두어 -1이 "아무것도 더하지 않음"이 되도록 합니다.
+    - break_daily: (시간표 수, 요일 수) 배열. 요일별 공강 슬롯 수 (선택한 분반에만 달려 있음)
+    시간표 순서는 run()이 정렬하기 전의 순서(분반 조합 순서)와 같습니다.
+    """
+    def __init__(self, key, day_masks, choices, break_daily):
+        self.key = key
+        self.day_masks = day_masks # [과목][분반] -> 요일별 슬롯 비트마스크
+        self.choices = choices
+        self.break_daily = break_daily
+        self._overlap_cache = OrderedDict()
+        self._occupancy = None
+
+    def __len__(self):
+        return len(self.choices)
+
+    def overlap_counts(self, masks):
+        """
+        과목별 (분반 수 + 1, 요일 수) 배열: 분반이 요일마다 masks와 겹치는 슬롯 수. (마지막 행은 0)
+        선호/비선호 시간이 바뀌지 않으면 다시 계산하지 않도록 최근 몇 개를 기억합니다.
+        """
+        key = tuple(masks)
+        counts = self._overlap_cache.get(key)
+        if counts is None:
+            counts = [np.array([[popcount(m & g) for m, g in zip(section, masks)] for section in cluster] +
+                               [[0] * len(masks)], dtype=np.int64) for cluster in self.day_masks]
+            self._overlap_cache[key] = counts
+            if len(self._overlap_cache) > 4:
+                self._overlap_cache.popitem(last=False)
+        else:
+            self._overlap_cache.move_to_end(key)
+        return counts
+
+    def _daily_sum(self, per_section):
+        """과목별 분반 값 배열을 고른 분반대로 더해 (시간표 수, ...) 배열을 만듭니다. (과목 순서대로 더함)"""
+        total = 0
+        for k, values in enumerate(per_section):
+            total = total + values[self.choices[:, k]]
+        return total
+
+    @property
+    def occupancy(self):
+        """(시간표 수, 요일 수) uint64 배열: 요일별 점유 비트마스크 (추가 속성 계산에 사용, 처음 사용할 때 만듦)"""
+        if self._occupancy is None:
+            per_section = [np.array(cluster + [[0] * len(cluster[0])], dtype=np.uint64) for cluster in self.day_masks]
+            occupancy = np.zeros((len(self.choices), len(per_section[0][0]) if per_section else 0), dtype=np.uint64)
+            for k, values in enumerate(per_section):
+                occupancy |= values[self.choices[:, k]]
+            self._occupancy = occupancy
+        return self._occupancy
+
+    def properties(self, scheduler):
+        """모든 시간표의 (fit_good, fit_bad, break_time, prefer) 배열을 scheduler의 현재 입력으로 계산합니다."""
+        good_daily = self._daily_sum(self.overlap_counts(scheduler.good_masks))
+        bad_daily = self._daily_sum(self.overlap_counts(scheduler.bad_masks))
+        preferences = [np.array([lec.preference for lec in cluster] + [0], dtype=np.int64)
+                       for cluster in scheduler.lecture_clusters]
+        return (
+            _aggregate(good_daily, scheduler.weights[0]['rss']),
+            _aggregate(bad_daily, scheduler.weights[1]['rss']),
+            _aggregate(self.break_daily, scheduler.weights[2]['rss']),
+            self._daily_sum(preferences),
+        )
+
+    def rank(self, scheduler):
+        """
+        scheduler의 현재 입력으로 모든 시간표의 점수를 계산하고 점수 순(안정 정렬)으로 정렬한 Timetable 목록을 반환합니다.
+        Config.GROUP_SAME_OCCUPANCY이면 같은 순서의 ResultGroups를 scheduler.result_groups에 저장합니다.
+        """
+        from model import Timetable
+        properties = self.properties(scheduler)
+        scores = _loss(properties, scheduler.weights)
+        extra = extra_loss(self.occupancy, scheduler.weights) if scheduler._active_kernels else None
+        if extra is not None:
+            scores = scores + extra
+        order = np.argsort(scores, kind='stable')
+        if Config.GROUP_SAME_OCCUPANCY:
+            # 정렬한 순서 그대로 요일별 점유 + 점수가 같은 결과를 묶어 둡니다. (P6에서 그룹 단위로 표시)
+            scheduler.result_groups = ResultGroups(occupancy_group_ids(self.occupancy[order], scores[order]))
+        columns = [values[order].tolist() for values in properties]
+        lectures = scheduler.lecture_clusters
+        results = []
+        for row, score, props in zip(self.choices[order].tolist(), scores[order].tolist(), zip(*columns)):
+            results.append(Timetable([lectures[k][i] for k, i in enumerate(row) if i != -1], score, props))
+        return results
+
+
+def _loss(properties, weights):
+    """Scheduler._loss_from_properties와 같은 순서로 Loss 배열을 계산합니다. (정수 배열이 바뀌지 않도록 새 배열을 만듦)"""
+    fit_good, fit_bad, break_time, prefer = properties
+    loss = 0
+    loss = loss + fit_good * weights[0]['weight'] * -1
+    loss = loss + fit_bad * weights[1]['weight']
+    loss = loss + break_time * weights[2]['weight']
+    loss = loss + prefer * weights[3]['weight'] * -1
+    return loss
+
+
+def _aggregate(daily, rss_enabled):
+    """Scheduler._aggregate의 배열 버전 (행마다 요일별 값을 합산)"""
+    if rss_enabled:
+        return np.sqrt((daily * daily).sum(axis=1))
+    return daily.sum(axis=1)
+
+
+def build_feasible_set(scheduler, parts=None):
+    """
+    충돌 없는 시간표를 모두 찾아 FeasibleSet을 만듭니다.
+    수업 요일이 겹치지 않는 과목 묶음으로 나뉘면 묶음별로 찾은 부분 조합(이미 찾았으면 parts)을 곱하고 (components.py),
+    그렇지 않고 조합 공간이 Config.MIXED_RADIX_MAX_COMBINATIONS 이하이면 조합 번호를 NumPy로 한꺼번에 검사하며
+    (product_space.ProductSpace), 더 크면 충돌하는 가지를 일찍 잘라내는 scheduler의 깊이 우선 탐색을 사용합니다.
+    """
+    from components import factorizable_components, factorized_choices
+    sections = scheduler._section_table()
+    components = factorizable_components(scheduler)
+    if components is not None:
+        scheduler.profile.extra["enumeration_engine"] = "factorized"
+        scheduler.profile.extra["components"] = [len(courses) for courses in components]
+        choices = factorized_choices(scheduler, components, profile=scheduler.profile, parts=parts)
+    elif scheduler.search_space_size() <= Config.MIXED_RADIX_MAX_COMBINATIONS:
+        from product_space import ProductSpace
+        scheduler.profile.extra["enumeration_engine"] = "mixed_radix"
+        choices = ProductSpace(scheduler).feasible_choices(profile=scheduler.profile)
+    else:
+        scheduler.profile.extra["enumeration_engine"] = "dfs"
+        choices = _dfs_choices(scheduler, sections)
+    return _feasible_set_from_choices(scheduler, sections, choices)
+
+
+def _dfs_choices(scheduler, sections):
+    """scheduler의 깊이 우선 탐색으로 찾은 시간표들의 choices 배열"""
+    positions = {}
+    for k, options in enumerate(sections):
+        for i, (lec, _, _) in enumerate(options):
+            positions[lec.id] = (k, i)
+    rows = []
+
+    def on_leaf(lectures, day_masks, prefer_prop):
+        row = [-1] * len(sections)
+        for lec in lectures:
+            k, i = positions[lec.id]
+            row[k] = i
+        rows.append(row)
+
+    scheduler._dfs(on_leaf)
+    return np.array(rows, dtype=np.int32).reshape(len(rows), len(sections))
+
+
+def _feasible_set_from_choices(scheduler, sections, choices):
+    """choices 배열(조합 순서)로 요일별 공강 시간을 계산하여 FeasibleSet을 만듭니다."""
+    n_days = len(scheduler.days)
+    # 공강 시간 = 마지막 슬롯 - 첫 슬롯 + 1 - 수업 슬롯 수 (수업이 없는 요일은 0)
+    first, last, occupied = [], [], []
+    for options in sections:
+        bounds = [[_first_last(m) for m in day_masks] for _, _, day_masks in options] + [[_first_last(0)] * n_days]
+        first.append(np.array([[b[0] for b in row] for row in bounds], dtype=np.int64))
+        last.append(np.array([[b[1] for b in row] for row in bounds], dtype=np.int64))
+        occupied.append(np.array([[popcount(m) for m in day_masks] for _, _, day_masks in options] + [[0] * n_days],
+                                 dtype=np.int64))
+    if len(choices):
+        first_slot = np.min([values[choices[:, k]] for k, values in enumerate(first)], axis=0)
+        last_slot = np.max([values[choices[:, k]] for k, values in enumerate(last)], axis=0)
+        busy = sum(values[choices[:, k]] for k, values in enumerate(occupied))
+        break_daily = np.where(last_slot >= 0, last_slot - first_slot + 1 - busy, 0)
+    else:
+        break_daily = np.zeros((0, n_days), dtype=np.int64)
+    day_masks = [[day_masks for _, _, day_masks in options] for options in sections]
+    return FeasibleSet(feasible_set_key(scheduler), day_masks, choices, break_daily)
+
+
+class FeasibleSetCache:
+    """선택한 분반별 FeasibleSet을 최근에 사용한 순서로 max_entries개까지 메모리에 기억합니다."""
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else Config.FEASIBLE_SET_CACHE_SIZE
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        feasible = self._entries.get(key)
+        if feasible is not None:
+            self._entries.move_to_end(key)
+        return feasible
+
+    def put(self, feasible):
+        self._entries[feasible.key] = feasible
+        self._entries.move_to_end(feasible.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
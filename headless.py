@@ -0,0 +1,103 @@
+# headless.py
+# GUI 없이 시간표 생성을 실행합니다. (프로파일링/배치 작업용)
+#
+# 사용 예:
+#   python headless.py --inputs inputs.json --profile-log runs.jsonl --capture cprofile
+#   python headless.py --inputs inputs.json --engine local --compare-exact
+#
+# inputs.json 형식 (모든 키는 선택 사항):
+#   {"selected_ids": [1, 2, 3], "preferences": {"1": 1},
+#    "good_slots": {"Mon": [0, 1]}, "bad_slots": {"Fri": [0, 1, 2]},
+#    "weights": [{"weight": 5, "rss": false}, ...],
+#    "constraints": {"free_days": ["Fri"], "required_ids": [46], "max_credits": 21,
+#                    "optional_names": ["학술 글쓰기"], "min_credits": 18}}
+# selected_ids가 없으면 selected_lectures_cache.json의 선택을 사용합니다.
+import argparse
+import json
+import sys
+
+from model import Model
+from scheduler import Scheduler
+from profiler import RunProfile, jsonl_hook
+from constraints import HardConstraints
+from estimator import estimate_search
+
+
+def apply_inputs(model, inputs):
+    """inputs 딕셔너리의 선택/선호도/시간대/가중치를 Model에 반영합니다."""
+    if "selected_ids" in inputs:
+        selected_ids = set(inputs["selected_ids"])
+        for lec in model.all_lectures:
+            lec.selected = lec.id in selected_ids
+    for lecture_id, value in inputs.get("preferences", {}).items():
+        model.set_lecture_preference(int(lecture_id), value)
+    for key in ("good_slots", "bad_slots"):
+        target = getattr(model, key)
+        for day, slots in inputs.get(key, {}).items():
+            target[day] = set(slots)
+    if "weights" in inputs:
+        # 주어지지 않은 뒤쪽 가중치(추가 속성)는 기본값을 유지합니다.
+        for index, weight in enumerate(inputs["weights"]):
+            model.loss_weights[index] = dict(weight)
+    if "constraints" in inputs:
+        model.hard_constraints = HardConstraints.from_dict(inputs["constraints"])
+
+
+def run_headless(model, profile_log=None, capture=None, engine="auto"):
+    """
+    Model의 현재 상태로 Scheduler를 실행하고 (결과, RunProfile)을 반환합니다.
+    engine: "exact"(전체 조합), "local"(근사 탐색), "auto"(estimator가 추천하는 엔진)
+    """
+    scheduler = Scheduler(
+        model.get_selected_lectures(),
+        model.good_slots,
+        model.bad_slots,
+        model.loss_weights,
+        profile=RunProfile(capture=capture),
+        profile_hook=jsonl_hook(profile_log) if profile_log else None,
+        constraints=model.hard_constraints
+    )
+    if engine == "auto":
+        estimate = estimate_search(scheduler)
+        scheduler.profile.extra["estimate"] = estimate.to_dict()
+        engine = "local" if estimate.recommended_engine == "local_search" else "exact"
+    if engine == "local":
+        results, _ = scheduler.run_local_search()
+    else:
+        results, _ = scheduler.run()
+    return results, scheduler.profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AGS 시간표 생성기 (headless)")
+    parser.add_argument("--inputs", help="선택/시간대/가중치를 담은 JSON 파일")
+    parser.add_argument("--profile-log", help="실행 기록(JSON Lines)을 추가할 파일")
+    parser.add_argument("--capture", choices=["cprofile", "tracemalloc"], help="추가 프로파일링 캡처 모드")
+    parser.add_argument("--top", type=int, default=5, help="출력할 상위 시간표 개수")
+    parser.add_argument("--engine", choices=["auto", "exact", "local"], default="auto", help="탐색 엔진")
+    parser.add_argument("--compare-exact", action="store_true",
+                        help="근사 탐색 결과를 정확한 결과와 비교한 품질 지표를 출력합니다 (작은 입력용)")
+    args = parser.parse_args(argv)
+
+    model = Model()
+    if args.inputs:
+        with open(args.inputs, 'r', encoding='utf-8') as f:
+            apply_inputs(model, json.load(f))
+
+    results, profile = run_headless(model, args.profile_log, args.capture, args.engine)
+    if not results:
+        print("생성 가능한 시간표가 없습니다." + (f" ({profile.extra['infeasible_reason']})" if 'infeasible_reason' in profile.extra else ""))
+
+    for rank, tt in enumerate(results[:args.top], start=1):
+        names = ", ".join(f"{lec.name}({lec.section})" for lec in tt.lectures)
+        print(f"#{rank} score={tt.score:.2f}  {names}")
+    print(json.dumps(profile.to_dict(), ensure_ascii=False, indent=2))
+    if args.compare_exact and profile.extra.get("engine") == "local_search":
+        from local_search import compare_with_exact
+        exact_results, _ = run_headless(model, engine="exact")
+        print(json.dumps(compare_with_exact(results, exact_results), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
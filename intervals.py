@@ -0,0 +1,71 @@
+# intervals.py
+# 강의 시간을 분 단위 구간으로 다룹니다.
+#
+# 강의 시간 하나(meeting)는 (요일, 시작 분, 종료 분)이며 시작은 포함, 종료는 포함하지 않습니다. (자정부터의 분)
+# 30분 슬롯 인덱스는 P3/P4의 선호/비선호 시간과 속성 계산(점수)에만 쓰고, 충돌 검사는 분 단위 구간으로 합니다.
+#
+# 충돌 검사용 비트마스크는 MeetingTimeline이 만듭니다. 요일마다 모든 강의 시간의 경계(시작/종료 분)를 정렬하여
+# 경계 사이의 구간 하나를 비트 하나로 삼으므로, 강의 시간이 몇 분 단위이든 비트 수는 서로 다른 경계의 수로 정해지고
+# 두 강의의 비트마스크가 겹치는 것은 분 단위 구간이 겹치는 것과 정확히 같습니다.
+import bisect
+from collections import defaultdict
+
+from config import Config
+
+
+def slot_minutes(slot):
+    """
+    time_slots 항목 하나의 (시작 분, 종료 분). 분 단위 시간(start_minute/end_minute)이 없는 이전 형식이면
+    30분 슬롯 인덱스(0 = 9:00)로부터 계산합니다.
+    """
+    if slot.get('start_minute') is not None and slot.get('end_minute') is not None:
+        return slot['start_minute'], slot['end_minute']
+    start = Config.GRID_START_MINUTES + slot['start_index'] * Config.GRID_SLOT_MINUTES
+    end = Config.GRID_START_MINUTES + (slot['end_index'] + 1) * Config.GRID_SLOT_MINUTES
+    return start, end
+
+
+def lecture_meetings(lec):
+    """강의의 (요일, 시작 분, 종료 분) 목록"""
+    meetings = []
+    for slot in lec.time_slots:
+        start, end = slot_minutes(slot)
+        if end > start:
+            meetings.append((slot['day'], start, end))
+    return meetings
+
+
+class MeetingTimeline:
+    """
+    강의 시간 경계로 나눈 시간축. 요일마다 서로 다른 경계 사이의 구간에 비트를 하나씩 붙입니다.
+    mask(meetings)는 구간들이 덮는 비트를 모두 켠 정수이며, 두 mask의 AND가 0이 아니면 분 단위로 겹칩니다.
+    """
+    def __init__(self, lectures):
+        boundaries = defaultdict(set)
+        for lec in lectures:
+            for day, start, end in lecture_meetings(lec):
+                boundaries[day].update((start, end))
+        self.boundaries = {}
+        self.offsets = {}
+        bits = 0
+        for day in sorted(boundaries, key=str):
+            self.boundaries[day] = sorted(boundaries[day])
+            self.offsets[day] = bits
+            bits += len(self.boundaries[day]) - 1
+        self.bits = bits
+
+    def mask(self, meetings):
+        mask = 0
+        for day, start, end in meetings:
+            bounds = self.boundaries[day]
+            first = bisect.bisect_left(bounds, start)
+            last = bisect.bisect_left(bounds, end)
+            if first == len(bounds) or bounds[first] != start or last == len(bounds) or bounds[last] != end:
+                raise ValueError(f"시간축에 없는 강의 시간입니다: {day} {start}~{end}")
+            mask |= ((1 << (last - first)) - 1) << (self.offsets[day] + first)
+        return mask
+
+    def words(self, masks):
+        """mask 목록을 64비트 단위로 나눈 [[word, ...], ...] (NumPy uint64 배열로 AND 검사할 때 사용)"""
+        n_words = max(1, (self.bits + 63) // 64)
+        return [[(mask >> (64 * w)) & ((1 << 64) - 1) for w in range(n_words)] for mask in masks]
@@ -0,0 +1,440 @@
+# local_search.py
+# 탐색 공간이 너무 커서 전체 조합을 만들 수 없을 때 사용하는 근사(anytime) 탐색 엔진입니다.
+#
+# 탐욕적으로 만든 충돌 없는 시간표에서 시작하여, 과목 하나의 분반을 바꾸는 이동을
+# 담금질(simulated annealing)과 짧은 tabu 목록으로 반복합니다. 새 분반이 다른 과목과 겹치면
+# 겹치는 과목도 함께 옮기는 이동을 시도하고, 이동 후 학점 합이 학점 범위를 벗어나면 다른 선택 과목 하나를
+# 빼거나 넣어 범위 안으로 되돌립니다. (선택 과목을 서로 바꾸는 이동)
+# 분반을 바꾸면 그 분반이 있는 요일만 달라지므로, 충돌 검사와 Loss 계산은 바뀐 요일만 다시 합니다.
+# 시간(또는 반복 횟수) 예산이 끝나면 지금까지 찾은 서로 다른 시간표 중 Loss가 낮은 것들을 반환합니다.
+import heapq
+import math
+import random
+import time
+
+from config import Config
+from constraints import credit_for_name
+from scheduler import popcount
+
+SKIP = -1 # 선택 과목을 빼는 선택지
+
+
+class LocalSearch:
+    """
+    Scheduler 하나의 클러스터/비트마스크/Loss 계산을 그대로 사용하는 근사 탐색기.
+    run()은 Scheduler.run()과 같은 (results, elapsed_time)을 반환하며, 결과의 점수와 속성은
+    정확한 탐색과 같은 방식으로 다시 계산되므로 두 엔진의 결과를 그대로 비교할 수 있습니다.
+    """
+    def __init__(self, scheduler, time_budget=None, max_iterations=None, result_count=None, seed=None):
+        self.scheduler = scheduler
+        self.time_budget = time_budget if time_budget is not None else Config.LOCAL_SEARCH_TIME_BUDGET
+        self.max_iterations = max_iterations if max_iterations is not None else Config.LOCAL_SEARCH_MAX_ITERATIONS
+        self.result_count = result_count if result_count is not None else Config.LOCAL_SEARCH_RESULT_COUNT
+        self.rng = random.Random(seed)
+
+        self.sections = scheduler._section_table()
+        self.optional = scheduler.optional_flags
+        self.credits = [credit_for_name(cluster[0].name) for cluster in scheduler.lecture_clusters]
+        self.n_days = len(scheduler.days)
+        # 분반마다 수업이 있는 요일 인덱스 (바뀐 요일만 다시 계산하기 위해)
+        self.touched_days = [[tuple(d for d in range(self.n_days) if day_masks[d]) for _, _, day_masks in options]
+                             for options in self.sections]
+
+    # --- 상태 평가 ---
+
+    def _daily_terms(self, d, mask):
+        """요일 하나의 (fit_good, fit_bad, break_time) 값을 계산합니다."""
+        s = self.scheduler
+        brk = mask.bit_length() - (mask & -mask).bit_length() + 1 - popcount(mask) if mask else 0
+        return popcount(mask & s.good_masks[d]), popcount(mask & s.bad_masks[d]), brk
+
+    def _loss(self, daily, prefer_prop, day_masks):
+        s = self.scheduler
+        properties = tuple(s._aggregate([terms[i] for terms in daily], s.weights[i]['rss']) for i in range(3))
+        loss = s._loss_from_properties(properties + (prefer_prop,))
+        if s._active_kernels:
+            loss = float(loss + s._extra_loss(day_masks))
+        return loss
+
+    def _option(self, k, choice):
+        """(lecture, week_mask, day_masks, touched_days) 또는 선택 과목을 뺀 경우 None"""
+        if choice == SKIP:
+            return None
+        lec, week_mask, day_masks = self.sections[k][choice]
+        return lec, week_mask, day_masks, self.touched_days[k][choice]
+
+    def _credits_allowed(self, credit_sum):
+        return self.scheduler.constraints.allows_credits(credit_sum)
+
+    # --- 초기해 ---
+
+    def _greedy_start(self, node_budget=20000):
+        """
+        후보 분반이 적은 과목부터 배치하면서, 각 단계에서 Loss 증가가 가장 작은 분반을 먼저 시도하는
+        백트래킹으로 충돌 없는 첫 시간표를 찾습니다. 찾지 못하면 None을 반환합니다.
+        """
+        n = len(self.sections)
+        order = sorted(range(n), key=lambda k: len(self.sections[k]))
+        max_credits = self.scheduler.constraints.max_credits
+        choice = [SKIP] * n
+        nodes = [0]
+
+        def options_for(k, day_masks, prefer_prop):
+            scored = []
+            for index, (lec, week_mask, lec_day_masks) in enumerate(self.sections[k]):
+                merged = [day_masks[d] | lec_day_masks[d] for d in range(self.n_days)]
+                daily = [self._daily_terms(d, merged[d]) for d in range(self.n_days)]
+                scored.append((self._loss(daily, prefer_prop + lec.preference, merged), index))
+            scored.sort()
+            indices = [index for _, index in scored]
+            return indices + [SKIP] if self.optional[k] else indices
+
+        def search(position, occupied, day_masks, prefer_prop, credit_sum):
+            nodes[0] += 1
+            if nodes[0] > node_budget:
+                return False
+            if max_credits is not None and credit_sum > max_credits:
+                return False
+            if position == n:
+                return credit_sum > 0 and self._credits_allowed(credit_sum)
+            k = order[position]
+            for index in options_for(k, day_masks, prefer_prop):
+                choice[k] = index
+                if index == SKIP:
+                    if search(position + 1, occupied, day_masks, prefer_prop, credit_sum):
+                        return True
+                    continue
+                lec, week_mask, lec_day_masks = self.sections[k][index]
+                if occupied & week_mask:
+                    continue
+                if search(position + 1, occupied | week_mask,
+                          [day_masks[d] | lec_day_masks[d] for d in range(self.n_days)],
+                          prefer_prop + lec.preference, credit_sum + self.credits[k]):
+                    return True
+            choice[k] = SKIP
+            return False
+
+        if search(0, 0, [0] * self.n_days, 0, 0):
+            return choice
+        return None
+
+    # --- 탐색 ---
+
+    def run(self):
+        s = self.scheduler
+        profile = s.profile
+        start_time = time.time()
+        profile.start_capture()
+        profile.extra["engine"] = "local_search"
+
+        try:
+            if not s.lecture_clusters:
+                return [], 0
+            with profile.phase("enumeration"):
+                top = self._search(start_time)
+
+            from model import Timetable
+            with profile.phase("result"):
+                results = []
+                for key in top:
+                    lectures = [self.sections[k][index][0] for k, index in enumerate(key) if index != SKIP]
+                    properties = s._calculate_properties(lectures)
+                    results.append(Timetable(lectures, s._calculate_loss(lectures, properties), properties))
+
+            with profile.phase("sorting"):
+                results.sort(key=lambda x: x.score)
+
+            return results, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if s.profile_hook is not None:
+                s.profile_hook(profile.to_dict())
+
+    def _search(self, start_time):
+        """담금질 + tabu 탐색을 수행하고 찾은 상위 시간표들의 분반 선택(튜플) 목록을 반환합니다."""
+        s = self.scheduler
+        profile = s.profile
+        choice = self._greedy_start()
+        if choice is None:
+            s.infeasible_reason = s.infeasible_reason or "제한된 탐색 안에서 충돌 없는 시간표를 찾지 못했습니다."
+            profile.extra["infeasible_reason"] = s.infeasible_reason
+            return []
+
+        state = _SearchState(self, choice)
+        loss = state.loss()
+
+        # 상위 result_count개의 서로 다른 시간표 (최대 힙으로 가장 나쁜 항목을 관리)
+        top = {}
+        worst = []
+
+        def record(key, value):
+            if key in top:
+                return
+            if len(top) < self.result_count:
+                top[key] = value
+                heapq.heappush(worst, (-value, key))
+            elif value < -worst[0][0]:
+                _, dropped = heapq.heapreplace(worst, (-value, key))
+                del top[dropped]
+                top[key] = value
+
+        record(tuple(state.choice), loss)
+        best_loss = loss
+        best_choice = list(state.choice)
+
+        n = len(self.sections)
+        movable = [k for k in range(n) if self._option_count(k) > 1]
+        if not movable:
+            return list(top)
+
+        # 최근에 떠난 (과목, 선택지) -> 다시 고를 수 있게 되는 반복 번호.
+        # 받아들인 이동 수가 아니라 반복 횟수로 풀어야, 이동이 거의 받아들여지지 않는 좁은 공간에서
+        # tabu 목록이 영원히 남아 탐색이 멈추지 않습니다.
+        tabu = {}
+        tenure = Config.LOCAL_SEARCH_TABU_SIZE * len(movable)
+        t_start = Config.LOCAL_SEARCH_START_TEMPERATURE
+        t_end = Config.LOCAL_SEARCH_END_TEMPERATURE
+        iterations = 0
+        accepted = 0
+        collisions = 0
+        since_improvement = 0
+        deadline = start_time + self.time_budget
+
+        while iterations < self.max_iterations:
+            if iterations % 256 == 0:
+                now = time.time()
+                if now >= deadline:
+                    break
+                fraction = (now - start_time) / self.time_budget if self.time_budget > 0 else 1.0
+                temperature = t_start * (t_end / t_start) ** min(1.0, fraction)
+            iterations += 1
+
+            k = self.rng.choice(movable)
+            new_index = self._random_other_option(k, state.choice[k])
+            moves = self._plan_move(state, k, new_index)
+            if moves is None:
+                collisions += 1
+                continue
+            new_credit_sum = state.credit_sum
+            for j, index in moves:
+                new_credit_sum += (self.credits[j] if index != SKIP else 0) - \
+                                  (self.credits[j] if state.choice[j] != SKIP else 0)
+            if new_credit_sum == 0 or not self._credits_allowed(new_credit_sum):
+                moves = self._repair_credits(state, moves, new_credit_sum)
+                if moves is None:
+                    continue
+
+            undo = state.apply(moves)
+            new_loss = state.loss()
+            delta = new_loss - loss
+
+            is_tabu = tabu.get((k, new_index), 0) > iterations
+            if (delta <= 0 and not is_tabu) or new_loss < best_loss or \
+                    (not is_tabu and self.rng.random() < math.exp(-delta / temperature)):
+                for j, index, _ in undo[0]:
+                    tabu[(j, index)] = iterations + tenure
+                loss = new_loss
+                accepted += 1
+                record(tuple(state.choice), loss)
+                if loss < best_loss:
+                    best_loss = loss
+                    best_choice = list(state.choice)
+                    since_improvement = 0
+                else:
+                    since_improvement += 1
+            else:
+                state.restore(undo)
+                since_improvement += 1
+
+            # 오랫동안 개선이 없으면 지금까지의 최선 해에서 다시 시작합니다.
+            if since_improvement >= Config.LOCAL_SEARCH_RESTART_AFTER:
+                state = _SearchState(self, best_choice)
+                loss = best_loss
+                tabu.clear()
+                since_improvement = 0
+
+        profile.count("combinations_visited", iterations)
+        profile.count("collisions", collisions)
+        profile.extra["iterations"] = iterations
+        profile.extra["accepted_moves"] = accepted
+        return list(top)
+
+    def _option_count(self, k):
+        return len(self.sections[k]) + (1 if self.optional[k] else 0)
+
+    def _random_other_option(self, k, current_index):
+        """과목 k에서 현재와 다른 선택지(분반 인덱스 또는 SKIP)를 무작위로 고릅니다."""
+        n_options = len(self.sections[k])
+        current_position = n_options if current_index == SKIP else current_index
+        position = self.rng.randrange(self._option_count(k) - 1)
+        if position >= current_position:
+            position += 1
+        return SKIP if position == n_options else position
+
+    def _plan_move(self, state, k, new_index):
+        """
+        과목 k를 new_index로 바꾸는 이동을 [(과목, 선택지), ...]로 만듭니다.
+        새 분반이 다른 과목과 겹치면, 겹치는 과목(최대 LOCAL_SEARCH_MAX_REPAIRS개)을 충돌하지 않는
+        다른 분반으로 함께 옮깁니다. (분반 하나만 바꾸면 거의 항상 충돌하는 빡빡한 입력에서도 움직일 수 있도록)
+        가능한 이동이 없으면 None을 반환합니다.
+        """
+        new = self._option(k, new_index)
+        new_mask = new[1] if new else 0
+        rest = state.occupied & ~state.masks[k]
+        if not rest & new_mask:
+            return [(k, new_index)]
+
+        conflicts = [j for j in range(len(self.sections)) if j != k and state.masks[j] & new_mask]
+        if len(conflicts) > Config.LOCAL_SEARCH_MAX_REPAIRS:
+            return None
+        occupied = new_mask
+        for j in range(len(self.sections)):
+            if j != k and j not in conflicts:
+                occupied |= state.masks[j]
+        moves = [(k, new_index)]
+        for j in conflicts:
+            fitting = [index for index, (_, week_mask, _) in enumerate(self.sections[j])
+                       if index != state.choice[j] and not occupied & week_mask]
+            if self.optional[j]:
+                fitting.append(SKIP)
+            if not fitting:
+                return None
+            index = self.rng.choice(fitting)
+            moves.append((j, index))
+            if index != SKIP:
+                occupied |= self.sections[j][index][1]
+        return moves
+
+
+    def _repair_credits(self, state, moves, credit_sum):
+        """
+        이동 후 학점 합 credit_sum이 학점 범위를 벗어나면, 이동하지 않는 다른 선택 과목 하나를 빼거나(많을 때)
+        충돌하지 않는 분반으로 넣어(적을 때) 범위 안으로 되돌린 이동을 반환합니다. 되돌릴 수 없으면 None.
+        선택 과목 하나를 다른 선택 과목으로 바꾸는 이동은 과목 하나씩 바꾸면 중간 상태가 항상 학점 범위를 벗어나므로,
+        이렇게 두 과목을 함께 옮겨야 탐색할 수 있습니다.
+        """
+        constraints = self.scheduler.constraints
+        moved = dict(moves)
+        too_many = constraints.max_credits is not None and credit_sum > constraints.max_credits
+        candidates = [j for j in range(len(self.sections)) if self.optional[j] and j not in moved and
+                      (state.choice[j] != SKIP) == too_many]
+        self.rng.shuffle(candidates)
+        if too_many:
+            for j in candidates:
+                new_sum = credit_sum - self.credits[j]
+                if new_sum > 0 and self._credits_allowed(new_sum):
+                    return moves + [(j, SKIP)]
+            return None
+        occupied = 0
+        for j in range(len(self.sections)):
+            if j in moved:
+                option = self._option(j, moved[j])
+                occupied |= option[1] if option else 0
+            else:
+                occupied |= state.masks[j]
+        for j in candidates:
+            if not self._credits_allowed(credit_sum + self.credits[j]):
+                continue
+            fitting = [index for index, (_, week_mask, _) in enumerate(self.sections[j]) if not occupied & week_mask]
+            if fitting:
+                return moves + [(j, self.rng.choice(fitting))]
+        return None
+
+
+class _SearchState:
+    """근사 탐색의 현재 시간표. 분반 하나를 바꿀 때 바뀐 요일만 다시 계산합니다."""
+    def __init__(self, search, choice):
+        self.search = search
+        self.choice = list(choice)
+        self.masks = [0] * len(choice)
+        self.day_masks = [0] * search.n_days
+        self.occupied = 0
+        self.prefer_prop = 0
+        self.credit_sum = 0
+        for k, index in enumerate(self.choice):
+            option = search._option(k, index)
+            if option is None:
+                continue
+            lec, week_mask, lec_day_masks, touched = option
+            self.masks[k] = week_mask
+            self.occupied |= week_mask
+            self.prefer_prop += lec.preference
+            self.credit_sum += search.credits[k]
+            for d in touched:
+                self.day_masks[d] |= lec_day_masks[d]
+        self.daily = [search._daily_terms(d, self.day_masks[d]) for d in range(search.n_days)]
+
+    def loss(self):
+        return self.search._loss(self.daily, self.prefer_prop, self.day_masks)
+
+    def apply(self, moves):
+        """
+        [(과목, 선택지), ...]를 한 번에 적용하고 되돌리기 위한 기록을 반환합니다.
+        이동하는 과목의 기존 분반을 모두 지운 뒤 새 분반을 더하므로, 서로 자리를 바꾸는 이동도 정확히 반영됩니다.
+        """
+        search = self.search
+        changes = [(k, search._option(k, self.choice[k]), search._option(k, index), index) for k, index in moves]
+        touched = set()
+        for _, old, new, _ in changes:
+            touched.update(old[3] if old else ())
+            touched.update(new[3] if new else ())
+        undo = ([(k, self.choice[k], self.masks[k]) for k, _ in moves], self.occupied, self.prefer_prop,
+                self.credit_sum, [(d, self.day_masks[d], self.daily[d]) for d in touched])
+
+        for k, old, _, _ in changes:
+            if old is None:
+                continue
+            self.occupied &= ~old[1]
+            self.prefer_prop -= old[0].preference
+            self.credit_sum -= search.credits[k]
+            for d in old[3]:
+                self.day_masks[d] &= ~old[2][d]
+        for k, _, new, index in changes:
+            self.choice[k] = index
+            self.masks[k] = new[1] if new else 0
+            if new is None:
+                continue
+            self.occupied |= new[1]
+            self.prefer_prop += new[0].preference
+            self.credit_sum += search.credits[k]
+            for d in new[3]:
+                self.day_masks[d] |= new[2][d]
+        for d in touched:
+            self.daily[d] = search._daily_terms(d, self.day_masks[d])
+        return undo
+
+    def restore(self, undo):
+        choices, self.occupied, self.prefer_prop, self.credit_sum, saved = undo
+        for k, index, mask in choices:
+            self.choice[k] = index
+            self.masks[k] = mask
+        for d, day_mask, terms in saved:
+            self.day_masks[d] = day_mask
+            self.daily[d] = terms
+
+
+def compare_with_exact(approx_results, exact_results, top_k=10):
+    """
+    근사 결과의 품질을 정확한 결과(Scheduler.run)와 비교합니다. (작은 입력에서 검증용)
+    - best_gap: 근사 최선 Loss - 정확한 최선 Loss (0이면 최적해를 찾음)
+    - top_k_recall: 정확한 상위 top_k 시간표 중 근사 결과에 포함된 비율
+    - best_rank: 근사 최선 시간표가 정확한 순위에서 몇 번째인지 (1부터)
+    """
+    if not exact_results or not approx_results:
+        return {"best_gap": None, "top_k_recall": 0.0, "best_rank": None}
+
+    def key(tt):
+        return tuple(sorted(lec.id for lec in tt.lectures))
+
+    exact_keys = [key(tt) for tt in exact_results]
+    approx_keys = {key(tt) for tt in approx_results}
+    top = exact_keys[:top_k]
+    best_key = key(approx_results[0])
+    best_rank = next((rank for rank, tt in enumerate(exact_results, start=1)
+                      if tt.score >= approx_results[0].score - 1e-9), None)
+    return {
+        "best_gap": approx_results[0].score - exact_results[0].score,
+        "top_k_recall": sum(1 for k in top if k in approx_keys) / len(top),
+        "best_rank": best_rank if best_key in exact_keys else None,
+    }
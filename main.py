@@ -1,44 +1,90 @@
 # main.py
 # 애플리케이션의 시작점입니다.
+#
+# 첫 화면을 빨리 띄우기 위해 numpy를 쓰는 모듈(model, controller)과 강의 목록(lectures.json)은
+# 첫 페이지를 그린 뒤 백그라운드 스레드에서 불러오고, 끝나면 Controller를 만들어 View에 연결합니다.
+import time
+_START_TIME = time.perf_counter()
 
+import threading
 import tkinter as tk
-from model import Model
+from config import Config
+from profiler import StartupProfile, jsonl_hook
 from view import View
-from controller import Controller
 
 class App(tk.Tk):
     """
     애플리케이션의 메인 클래스
     """
-    def __init__(self):
+    def __init__(self, startup):
         super().__init__()
+        self.startup = startup
+        self.ui_monitor = None
+        if Config.UI_MONITOR_ENABLED:
+            # 위젯을 만들기 전에 설치해야 모든 콜백이 기록됩니다.
+            from ui_monitor import UIMonitor
+            self.ui_monitor = UIMonitor.install(self)
+        self.model = None
+        self._loaded = None # 백그라운드 스레드의 결과: (Model, Controller 클래스) 또는 예외
+        startup.mark("imports")
 
-        # 1. Model 생성
-        model = Model()
-
-        # 2. Controller 생성 및 Model 연결
-        # Controller는 View를 필요로 하므로, View 생성 후 연결
-        
-        # 3. View 생성 및 Controller 연결
-        # View는 Controller를 직접 참조하여 이벤트 발생 시 호출
-        controller = Controller(model, None) # 임시로 None 전달
-        view = View(self, controller)
-        
-        # 4. Controller에 View 연결
-        controller.view = view
-        
-        # 5. 첫 페이지 보여주기
-        view.show_page(model.current_page)
-
-        # 6. 윈도우 종료 시 선택된 강의 저장 및 종료
+        # 1. View 생성 및 첫 페이지 보여주기 (Controller는 강의 목록을 불러온 뒤 연결)
+        view = View(self, None)
+        startup.mark("window")
+        view.show_page(0)
+        self.update()
+        startup.mark("first_paint")
+
+        # 2. 강의 목록은 백그라운드에서 불러오고, 끝났는지 주기적으로 확인합니다. (Tk 위젯은 메인 스레드에서만 사용)
+        threading.Thread(target=self._load_catalog, daemon=True).start()
+        self.after(Config.STARTUP_POLL_MS, self._check_catalog_loaded, view)
+
+        # 3. 윈도우 종료 시 선택된 강의 저장 및 종료
         def on_closing():
-            model.save_selected_lectures_to_cache()
+            if self.model is not None:
+                self.model.save_selected_lectures_to_cache()
+            if self.ui_monitor is not None:
+                self.ui_monitor.dump()
             self.destroy()
 
         self.protocol("WM_DELETE_WINDOW", on_closing)
 
+    def _load_catalog(self):
+        """(백그라운드 스레드) Model/Controller 모듈을 가져오고 강의 목록을 불러옵니다."""
+        try:
+            with self.startup.phase("import"):
+                from model import Model
+                from controller import Controller
+            with self.startup.phase("catalog_load"):
+                model = Model()
+            self._loaded = (model, Controller)
+        except Exception as e:
+            self._loaded = e
+
+    def _check_catalog_loaded(self, view):
+        if self._loaded is None:
+            self.after(Config.STARTUP_POLL_MS, self._check_catalog_loaded, view)
+            return
+        if isinstance(self._loaded, Exception):
+            print(f"[ERROR] 강의 목록을 불러오지 못했습니다: {self._loaded}")
+            view.on_catalog_load_failed(self._loaded)
+            return
+
+        # Controller는 SQLite 연결 등을 만들므로 메인 스레드에서 생성합니다.
+        self.model, controller_class = self._loaded
+        controller = controller_class(self.model, view)
+        view.on_catalog_loaded(controller)
+        self.startup.mark("ready")
+        self._report_startup()
+
+    def _report_startup(self):
+        """시작 단계별 소요 시간을 콘솔과 (설정되어 있으면) 프로파일 로그 파일에 기록합니다."""
+        if Config.STARTUP_REPORT:
+            print(f"[STARTUP] {self.startup.summary_text()}")
+        if Config.PROFILE_LOG_FILE:
+            jsonl_hook(Config.PROFILE_LOG_FILE)(self.startup.to_dict())
+
 
 if __name__ == "__main__":
-    app = App()
+    app = App(StartupProfile(_START_TIME))
     app.mainloop()
-
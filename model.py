@@ -3,7 +3,13 @@
 import json
 import os
 import sys
+from components import FactorizedResults
 from config import Config
+from constraints import HardConstraints
+from intervals import slot_minutes
+from property_kernels import PROPERTY_KERNELS
+from result_index import ResultIndex, ResultSubset
+from result_store import StoredResults
 
 def resource_path(relative_path):
     """
@@ -19,16 +25,27 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def default_loss_weights():
+    """P5 가중치의 기본값. 추가 속성(property_kernels.PROPERTY_KERNELS)의 가중치는 0 (Loss에 반영하지 않음)"""
+    weights = [{'weight': 5, 'rss': False} for _ in range(len(Config().PAGE5_ATTRIBUTES))]
+    weights += [{'weight': 0, 'rss': False} for _ in PROPERTY_KERNELS]
+    return weights
+
 class Timetable:
     """
     생성된 시간표 하나를 나타내는 데이터 클래스.
     강의 목록과 해당 시간표의 평가 점수를 저장합니다.
     """
-    def __init__(self, lectures, score):
+    def __init__(self, lectures, score, properties=None):
         self.lectures = lectures
         self.score = score
+        self.properties = properties # (fit_good, fit_bad, break_time, prefer)
         self.z_score = None
         self.same_score_count = None
+        # 표본으로 추정한 경우의 95% 신뢰 구간 (Z-Score 반폭, 같은 점수 개수 (하한, 상한))
+        self.z_score_margin = None
+        self.same_score_interval = None
+        self.extra_properties = None # 가중치가 0이 아닌 추가 속성의 [(이름, 값)] (표시할 때 계산)
 
 class Lecture:
     """강의 정보를 저장하는 데이터 클래스"""
@@ -53,11 +70,16 @@ class Lecture:
             # Map Korean day to English day. If not in map, use original value.
             english_day = DAY_MAP.get(original_day, original_day)
             
-            self.time_slots.append({
+            time_slot = {
                 'day': english_day,
                 'start_index': start_idx,
-                'end_index': end_idx
-            })
+                'end_index': end_idx,
+                'start_minute': slot.get('start_minute'),
+                'end_minute': slot.get('end_minute')
+            }
+            # 분 단위 시간이 없는 이전 형식의 강의 목록이면 30분 슬롯 인덱스로부터 계산합니다.
+            time_slot['start_minute'], time_slot['end_minute'] = slot_minutes(time_slot)
+            self.time_slots.append(time_slot)
         # =======================================================
 
         self.selected = False
@@ -68,12 +90,8 @@ class Lecture:
         parts = []
         for slot in self.time_slots:
             day = slot.get('day', '')
-            # 인덱스를 시간으로 변환 (0 -> 9:00, 1 -> 9:30, ...)
-            start_h = 9 + slot.get('start_index', 0) // 2
-            start_m = "00" if slot.get('start_index', 0) % 2 == 0 else "30"
-            end_h = 9 + (slot.get('end_index', 0) + 1) // 2
-            end_m = "00" if (slot.get('end_index', 0) + 1) % 2 == 0 else "30"
-            parts.append(f"{day} {start_h}:{start_m}~{end_h}:{end_m}")
+            start, end = slot_minutes(slot)
+            parts.append(f"{day} {start // 60}:{start % 60:02d}~{end // 60}:{end % 60:02d}")
         return ", ".join(parts)
     
 
@@ -92,16 +110,29 @@ class Model:
         lectures_file_path = resource_path('lectures.json')
         self.load_lectures_from_json(lectures_file_path)
         # =================================================================
+        self.catalog_version = self._load_catalog_version()
 
         self.load_selected_lectures_from_cache()
 
         self.good_slots = {day: set() for day in ["Mon", "Tue", "Wed", "Thu", "Fri"]}
         self.bad_slots = {day: set() for day in ["Mon", "Tue", "Wed", "Thu", "Fri"]}
 
-        self.loss_weights = [{'weight': 5, 'rss': False} for _ in range(len(Config().PAGE5_ATTRIBUTES))]
+        self.loss_weights = default_loss_weights()
+        self.result_mode = "ranked" # "ranked": 가중치 Loss 순위, "pareto": 지배되지 않는 시간표만
+        self.hard_constraints = HardConstraints()
         
         self.generated_timetables = []
         self.current_timetable_index = 0
+        self.result_index = None # P6 필터용 역색인 (ResultIndex)
+        self.result_filter = {"include_ids": set(), "exclude_profs": set(), "free_days": set()}
+        self.visible_timetables = None # 필터를 통과한 결과 (None이면 전체)
+        # 요일별 점유와 점수가 같은 결과 묶음 (result_groups.ResultGroups, None이면 결과를 하나씩 표시)
+        self.result_groups = None
+        self.visible_groups = None # visible_timetables의 그룹 (결과 번호는 visible_timetables 안의 위치)
+        self.current_alternative_index = 0 # 현재 그룹 안에서 표시 중인 분반 대안
+        self.last_run_profile = None # 마지막 Scheduler.run의 RunProfile
+        self.solve_state = None # 마지막 정확한 탐색의 SolveState (분반 하나를 바꿨을 때 증분 재계산에 사용)
+        self.infeasible_reason = None # 하드 제약 조건 때문에 결과가 없을 때 그 이유
 
     def load_lectures_from_json(self, filepath):
         """주어진 경로의 JSON 파일에서 강의 데이터를 로드합니다."""
@@ -121,6 +152,48 @@ class Model:
             self.all_lectures = []
 
 
+    def _load_catalog_version(self):
+        """증분 빌드 매니페스트에서 현재 카탈로그 버전을 읽습니다. 없으면 0입니다."""
+        try:
+            with open(resource_path(self.config.CATALOG_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f).get('version', 0)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return 0
+
+    def apply_catalog_delta(self, delta):
+        """
+        preprocess_lectures.py의 증분 빌드가 남긴 delta를 전체 재로딩 없이 적용합니다.
+        선택 상태와 선호도는 유지되며, 버전이 맞지 않으면 적용하지 않고 False를 반환합니다.
+        """
+        if delta.get('from_version') != self.catalog_version:
+            return False
+
+        removed_ids = set(delta.get('removed', []))
+        lectures_by_id = {lec.id: lec for lec in self.all_lectures if lec.id not in removed_ids}
+        for item in delta.get('updated', []) + delta.get('added', []):
+            new_lecture = Lecture(item)
+            old_lecture = lectures_by_id.get(new_lecture.id)
+            if old_lecture is not None:
+                new_lecture.selected = old_lecture.selected
+                new_lecture.preference = old_lecture.preference
+            lectures_by_id[new_lecture.id] = new_lecture
+
+        self.all_lectures = list(lectures_by_id.values())
+        self.catalog_version = delta.get('version', self.catalog_version)
+        print(f"카탈로그 버전 {self.catalog_version} 변경분이 적용되었습니다.")
+        return True
+
+    def apply_pending_catalog_delta(self):
+        """디스크에 새 delta 파일이 있으면 적용합니다. 적용했으면 True를 반환합니다."""
+        try:
+            with open(resource_path(self.config.CATALOG_DELTA_FILE), 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return False
+        if delta.get('version') == self.catalog_version:
+            return False
+        return self.apply_catalog_delta(delta)
+
     def save_selected_lectures_to_cache(self):
         """현재 선택된 강의들의 ID를 캐시 파일에 저장합니다."""
         selected_ids = [lec.id for lec in self.all_lectures if lec.selected]
@@ -184,6 +257,112 @@ class Model:
             return self.loss_weights[index]['rss']
         return False
 
+    def get_lecture_rule(self, lecture_id):
+        """분반 규칙을 반환합니다: "required", "forbidden" 또는 None"""
+        if lecture_id in self.hard_constraints.required_ids:
+            return "required"
+        if lecture_id in self.hard_constraints.forbidden_ids:
+            return "forbidden"
+        return None
+
+    def cycle_lecture_rule(self, lecture_id):
+        """분반 규칙을 없음 -> 필수 -> 제외 -> 없음 순서로 바꾸고 새 규칙을 반환합니다."""
+        constraints = self.hard_constraints
+        rule = self.get_lecture_rule(lecture_id)
+        constraints.required_ids.discard(lecture_id)
+        constraints.forbidden_ids.discard(lecture_id)
+        if rule is None:
+            constraints.required_ids.add(lecture_id)
+        elif rule == "required":
+            constraints.forbidden_ids.add(lecture_id)
+        return self.get_lecture_rule(lecture_id)
+
+    def is_course_optional(self, name):
+        return name in self.hard_constraints.optional_names
+
+    def toggle_course_optional(self, name):
+        """과목(과목명 단위)을 선택 과목으로 지정하거나 해제하고 새 상태를 반환합니다."""
+        optional_names = self.hard_constraints.optional_names
+        if name in optional_names:
+            optional_names.discard(name)
+        else:
+            optional_names.add(name)
+        return name in optional_names
+
+    def toggle_free_day(self, day):
+        free_days = self.hard_constraints.free_days
+        if day in free_days:
+            free_days.discard(day)
+        else:
+            free_days.add(day)
+
+    def set_constraint_value(self, name, value):
+        """earliest_slot / latest_slot / min_credits / max_credits 값을 설정합니다. None이면 해제됩니다."""
+        setattr(self.hard_constraints, name, value)
+
+    def toggle_pareto_mode(self):
+        self.result_mode = "ranked" if self.result_mode == "pareto" else "pareto"
+        return self.result_mode == "pareto"
+
+    def build_result_index(self, result_groups=None):
+        """
+        새 결과 목록에 대한 역색인을 만들고 필터를 초기화합니다. result_groups가 있으면 P6에서 그룹 단위로 표시합니다.
+        SQLite 저장소의 결과(StoredResults)와 묶음별 결과를 점수 순으로 합친 결과(FactorizedResults)는
+        필요한 페이지만 읽도록 전체를 나열하지 않으므로 역색인(필터)을 만들지 않습니다.
+        """
+        indexable = self.generated_timetables and \
+            not isinstance(self.generated_timetables, (StoredResults, FactorizedResults))
+        self.result_index = ResultIndex(self.generated_timetables) if indexable else None
+        for condition in self.result_filter.values():
+            condition.clear()
+        self.visible_timetables = None
+        self.result_groups = result_groups
+        self.visible_groups = result_groups
+        self.current_timetable_index = 0
+        self.current_alternative_index = 0
+
+    def set_result_filter(self, name, values):
+        """
+        결과 필터 조건(include_ids / exclude_profs / free_days)을 바꾸고 역색인으로 다시 거릅니다.
+        조건이 모두 비어 있으면 전체 결과를 보여줍니다.
+        """
+        self.result_filter[name] = set(values)
+        if self.result_index is None or not any(self.result_filter.values()):
+            self.visible_timetables = None
+            self.visible_groups = self.result_groups
+        else:
+            positions = self.result_index.filter_positions(**{
+                key: sorted(value, key=str) for key, value in self.result_filter.items()})
+            self.visible_timetables = ResultSubset(self.generated_timetables, positions)
+            self.visible_groups = self.result_groups.restrict(positions) if self.result_groups is not None else None
+        self.current_timetable_index = 0
+        self.current_alternative_index = 0
+
+    def get_visible_timetables(self):
+        """필터를 통과한 결과 목록 (필터가 없으면 전체 결과)"""
+        return self.generated_timetables if self.visible_timetables is None else self.visible_timetables
+
+    def get_visible_count(self):
+        """P6에서 넘겨 볼 수 있는 항목 수 (그룹으로 묶었으면 그룹 수)"""
+        if self.visible_groups is not None:
+            return len(self.visible_groups)
+        return len(self.get_visible_timetables())
+
+    def get_current_alternatives(self):
+        """현재 항목에 속한 결과(visible_timetables 안의 번호) 리스트. 그룹으로 묶지 않았으면 현재 결과 하나"""
+        if self.visible_groups is not None:
+            return self.visible_groups.members(self.current_timetable_index)
+        return [self.current_timetable_index]
+
+    def get_current_timetable(self):
+        """P6에 표시할 Timetable (그룹이면 선택한 분반 대안)"""
+        alternatives = self.get_current_alternatives()
+        return self.get_visible_timetables()[alternatives[self.current_alternative_index]]
+
+    def set_current_timetable_index(self, index):
+        self.current_timetable_index = index
+        self.current_alternative_index = 0
+
     def next_page(self):
         if self.current_page < self.total_pages:
             self.current_page += 1
@@ -0,0 +1,87 @@
+# pareto.py
+# 다목적(Pareto) 비교를 위한 지배 관계, skyline 계산, 탐색용 archive를 제공합니다.
+#
+# 모든 벡터는 "작을수록 좋은" 형태로 다룹니다.
+# 시간표 속성 (fit_good, fit_bad, break_time, prefer)은 to_objective_vector로 변환합니다.
+from config import Config
+
+
+def to_objective_vector(properties):
+    """(fit_good, fit_bad, break_time, prefer) 속성을 최소화 기준 벡터로 변환합니다."""
+    fit_good, fit_bad, break_time, prefer = properties
+    return (-fit_good, fit_bad, break_time, -prefer)
+
+
+def dominates(a, b):
+    """a가 b를 지배하면 True: 모든 항목에서 a <= b이고, 적어도 하나는 a < b."""
+    strictly_better = False
+    for x, y in zip(a, b):
+        if x > y:
+            return False
+        if x < y:
+            strictly_better = True
+    return strictly_better
+
+
+def skyline(vectors):
+    """
+    지배되지 않는 벡터들의 인덱스 리스트를 반환합니다. (Sort-Filter-Skyline)
+
+    1. 같은 벡터는 한 번만 비교하도록 묶습니다. (시간표는 같은 속성 값을 공유하는 경우가 많음)
+    2. 항목 합 기준으로 정렬하면, 어떤 벡터를 지배할 수 있는 벡터는 반드시 앞쪽에 옵니다.
+    3. 따라서 앞에서부터 훑으며 지금까지의 skyline window와만 비교하면 됩니다.
+    비용은 O(n log n + u * s) 입니다. (u: 서로 다른 벡터 수, s: skyline 크기)
+    """
+    groups = {}
+    for index, vector in enumerate(vectors):
+        groups.setdefault(tuple(vector), []).append(index)
+
+    window = []
+    for vector in sorted(groups, key=lambda v: (sum(v), v)):
+        if not any(all(w <= x for w, x in zip(front, vector)) for front in window):
+            window.append(vector)
+
+    return sorted(index for vector in window for index in groups[vector])
+
+
+class ParetoArchive:
+    """
+    탐색 중에 찾은 완전한 시간표들의 Pareto front.
+    찾은 시간표는 버퍼에 모았다가 Config.PARETO_SKYLINE_BATCH개마다 지금까지의 front와 함께 skyline()으로 걸러 내므로,
+    시간표를 하나 찾을 때마다 front 전체를 훑지 않습니다. 같은 벡터를 가진 항목들은 함께 보관합니다. (서로 지배하지 않음)
+    front는 부분 해의 낙관적 경계(bound)가 지배되는지 검사하는 가지치기에 쓰입니다. 버퍼에 남은 시간표가 반영되기 전이라도
+    front의 벡터는 모두 실제로 찾은 시간표이므로 가지치기는 정확하며, items()는 버퍼까지 걸러 낸 최종 front를 반환합니다.
+    """
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or Config.PARETO_SKYLINE_BATCH
+        self.front = {} # vector -> [item, ...]
+        self._pending = [] # (vector, item) 아직 skyline으로 거르지 않은 시간표
+
+    def is_dominated(self, vector):
+        """front의 어떤 벡터가 vector를 (엄격히) 지배하면 True."""
+        return any(dominates(front, vector) for front in self.front)
+
+    def add(self, vector, item):
+        """시간표를 버퍼에 넣고, 버퍼가 차면 (또는 front가 아직 비어 있으면) front를 다시 계산합니다."""
+        self._pending.append((tuple(vector), item))
+        if len(self._pending) >= self.batch_size or not self.front:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        entries = [(vector, item) for vector, items in self.front.items() for item in items] + self._pending
+        self._pending = []
+        front = {}
+        for index in skyline([vector for vector, _ in entries]):
+            vector, item = entries[index]
+            front.setdefault(vector, []).append(item)
+        self.front = front
+
+    def items(self):
+        self._flush()
+        return [item for items in self.front.values() for item in items]
+
+    def __len__(self):
+        self._flush()
+        return sum(len(items) for items in self.front.values())
@@ -1,105 +1,447 @@
+
 import pandas as pd
 import json
 import datetime # datetime 모듈 import
 import openpyxl
+import argparse
+import hashlib
+import os
 from pathlib import Path # pathlib 모듈 import
+from config import Config
+
+# 9:00 AM은 자정으로부터 540분입니다. (30분 슬롯 격자. 강의 시간 자체는 분 단위로 함께 저장합니다)
+DAY_START_MINUTES = Config.GRID_START_MINUTES
+SLOT_MINUTES = Config.GRID_SLOT_MINUTES
+PERIOD_PREFIXES = ("p1", "p2")
+SOURCE_COLUMNS = ("section", "name", "prof.", "p1.day", "p1.start", "p1.end", "p2.day", "p2.start", "p2.end")
 
 def time_to_minutes(time_val):
     """시간 값(문자열 또는 datetime.time)을 자정부터의 분으로 변환합니다."""
-    if pd.isna(time_val):
+    if time_val is None or pd.isna(time_val):
         return None
+    # openpyxl 스트리밍 모드에서는 datetime.datetime으로 읽히는 경우도 있습니다.
+    if isinstance(time_val, datetime.datetime):
+        return time_val.hour * 60 + time_val.minute
     # Excel에서 시간을 읽을 때 datetime.time 객체로 읽어오는 경우가 많습니다.
     if isinstance(time_val, datetime.time):
         return time_val.hour * 60 + time_val.minute
     if isinstance(time_val, str):
         try:
             # HH:MM 형식의 문자열 처리
-            hours, minutes = map(int, time_val.split(':'))
+            hours, minutes = map(int, time_val.split(':')[:2])
             return hours * 60 + minutes
         except ValueError:
             return None
     return None
 
 def minutes_to_time_index(minutes):
-    """분을 9시부터 시작하는 30분 단위 인덱스로 변환합니다."""
+    """
+    분을 9시부터 시작하는 30분 단위 인덱스로 변환합니다.
+    9:00 이전은 0 이하의 인덱스가 되며, 이 부분은 격자(선호 시간, 속성)에서만 빠지고 분 단위 시간에는 남습니다.
+    """
     if minutes is None:
         return None
-    # 9:00 AM은 자정으로부터 540분입니다.
     # 인덱스 1은 9:00 AM (540분)에 해당합니다.
-    if minutes >= 540:
-        # 9시(540분)부터의 경과 시간을 30분으로 나누어 인덱스 계산
-        return (minutes - 540) // 30 + 1
-    return None # 9:00 AM 이전 시간은 유효하지 않은 것으로 처리합니다.
+    return (minutes - DAY_START_MINUTES) // SLOT_MINUTES + 1
 
-def preprocess_excel(excel_path, json_output_path):
-    """Excel 파일을 읽어 전처리한 후 JSON 파일로 저장합니다."""
-    df = pd.read_excel(excel_path)
+class PreprocessStats:
+    """전처리 중 발생한 검증 통계 (버려진 행, 9시 이전 슬롯 등)를 집계합니다."""
+    FIELDS = {
+        "rows_read": "읽은 행",
+        "lectures_written": "저장된 강의",
+        "dropped_rows": "버려진 행 (과목명 없음)",
+        "slots_written": "저장된 시간 슬롯",
+        "pre_9_slots": "9:00 이전에 시작하는 슬롯 (분 단위로 유지)",
+        "invalid_time_slots": "시간 형식 오류 슬롯 (제외됨)",
+        "lectures_without_slots": "시간 정보가 없는 강의",
+        "rows_reused": "재사용된 행 (변경 없음)",
+        "lectures_added": "추가된 강의",
+        "lectures_updated": "변경된 강의",
+        "lectures_removed": "삭제된 강의",
+    }
 
-    lectures_data = []
-    for idx, row in df.iterrows():
-        lecture_id = idx + 1 # 로드 순서에 기반한 고유 ID
+    def __init__(self):
+        self.counts = {key: 0 for key in self.FIELDS}
+        self.catalog_version = 0
+
+    def add(self, key, amount=1):
+        self.counts[key] += int(amount)
+
+    def report(self):
+        """검증 통계를 사람이 읽을 수 있는 문자열로 반환합니다."""
+        return "\n".join(f"  {label}: {self.counts[key]}" for key, label in self.FIELDS.items())
+
+    def add_reused(self, lecture):
+        """변경이 없어 이전 빌드 결과를 그대로 쓴 강의를 집계합니다."""
+        self.add("rows_read")
+        self.add("rows_reused")
+        self.add("lectures_written")
+        self.add("slots_written", len(lecture["time_slots"]))
+        if not lecture["time_slots"]:
+            self.add("lectures_without_slots")
+
+def _minutes_column(series):
+    """시간 컬럼 전체를 한 번에 '자정부터의 분' 컬럼(float, 결측은 NaN)으로 변환합니다."""
+    if series is None:
+        return None
+    # datetime.time은 'HH:MM:SS', 문자열은 'HH:MM' 형태가 되므로 앞의 HH:MM만 추출합니다.
+    parts = series.astype("string").str.extract(r'(\d{1,2}):(\d{2})')
+    hours = pd.to_numeric(parts[0], errors="coerce")
+    minutes = pd.to_numeric(parts[1], errors="coerce")
+    return hours * 60 + minutes
+
+def _time_index_column(minutes):
+    """'분' 컬럼을 30분 단위 인덱스 컬럼으로 변환합니다. 9:00 이전은 0 이하가 됩니다."""
+    return (minutes - DAY_START_MINUTES) // SLOT_MINUTES + 1
+
+def _convert_period_columns(df, prefix, stats):
+    """p1/p2 요일·시작·종료 컬럼을 컬럼 단위로 변환하여 행별 슬롯(dict 또는 None) 리스트를 반환합니다."""
+    day_col = f"{prefix}.day"
+    if day_col not in df.columns:
+        return [None] * len(df)
+
+    days = df[day_col]
+    start_minutes = _minutes_column(df.get(f"{prefix}.start"))
+    end_minutes = _minutes_column(df.get(f"{prefix}.end"))
+    if start_minutes is None or end_minutes is None:
+        stats.add("invalid_time_slots", days.notna().sum())
+        return [None] * len(df)
+
+    start_index = _time_index_column(start_minutes)
+    end_index = _time_index_column(end_minutes - 1)
+
+    has_day = days.notna()
+    has_times = start_minutes.notna() & end_minutes.notna() & (end_minutes > start_minutes)
+    valid = has_day & has_times
 
-        p1_start_minutes = time_to_minutes(row.get('p1.start'))
-        p1_end_minutes = time_to_minutes(row.get('p1.end'))
-        p2_start_minutes = time_to_minutes(row.get('p2.start'))
-        p2_end_minutes = time_to_minutes(row.get('p2.end'))
+    stats.add("pre_9_slots", (valid & (start_minutes < DAY_START_MINUTES)).sum())
+    stats.add("invalid_time_slots", (has_day & ~has_times).sum())
+    stats.add("slots_written", valid.sum())
 
-        lecture = {
+    return [
+        {"day": day, "start_index": int(start), "end_index": int(end),
+         "start_minute": int(start_minute), "end_minute": int(end_minute)} if ok else None
+        for day, start, end, start_minute, end_minute, ok in zip(
+            days.tolist(), start_index.tolist(), end_index.tolist(),
+            start_minutes.tolist(), end_minutes.tolist(), valid.tolist())
+    ]
+
+def _native(value):
+    """pandas/numpy 스칼라와 NaN을 JSON으로 저장 가능한 파이썬 값으로 변환합니다."""
+    if value is None or pd.isna(value):
+        return None
+    value = value.item() if hasattr(value, "item") else value
+    # 결측값이 섞인 정수 컬럼은 float로 읽히므로 분반 번호 등을 다시 정수로 돌려놓습니다.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def convert_dataframe(df, stats=None, ids=None):
+    """
+    DataFrame 전체를 컬럼 단위(벡터화)로 변환하여 강의 딕셔너리 리스트를 반환합니다.
+    강의 ID는 ids(행과 같은 순서의 ID 리스트)를 따르며, 없으면 원본 행 순서(idx + 1)를 사용합니다.
+    """
+    stats = stats if stats is not None else PreprocessStats()
+    stats.add("rows_read", len(df))
+
+    period_slots = [_convert_period_columns(df, prefix, stats) for prefix in PERIOD_PREFIXES]
+
+    names = df["name"] if "name" in df.columns else pd.Series([None] * len(df), index=df.index)
+    has_name = names.notna().tolist()
+    sections = df["section"].tolist() if "section" in df.columns else [None] * len(df)
+    profs = df["prof."].tolist() if "prof." in df.columns else [None] * len(df)
+
+    if ids is None:
+        ids = [int(idx) + 1 for idx in df.index] # 로드 순서에 기반한 고유 ID
+
+    lectures_data = []
+    for row_pos, (lecture_id, name, section, prof) in enumerate(zip(ids, names.tolist(), sections, profs)):
+        if not has_name[row_pos]:
+            stats.add("dropped_rows")
+            continue
+        time_slots = [slots[row_pos] for slots in period_slots if slots[row_pos] is not None]
+        if not time_slots:
+            stats.add("lectures_without_slots")
+        lectures_data.append({
             "id": lecture_id,
-            "section": row.get('section'),
-            "name": row.get('name'),
-            "prof": row.get('prof.'),
-            "time_slots": []
-        }
-
-        # p1.day, p1.start, p1.end 처리
-        if pd.notna(row.get('p1.day')):
-            p1_start_index = minutes_to_time_index(p1_start_minutes)
-            p1_end_index = minutes_to_time_index(p1_end_minutes - 1 if p1_end_minutes is not None else None)
-
-            if p1_start_index is not None and p1_end_index is not None:
-                lecture["time_slots"].append({
-                    "day": row['p1.day'],
-                    "start_index": p1_start_index,
-                    "end_index": p1_end_index
-                })
-        
-        # p2.day, p2.start, p2.end 처리 (존재하는 경우)
-        if pd.notna(row.get('p2.day')):
-            p2_start_index = minutes_to_time_index(p2_start_minutes)
-            p2_end_index = minutes_to_time_index(p2_end_minutes - 1 if p2_end_minutes is not None else None)
-
-            if p2_start_index is not None and p2_end_index is not None:
-                lecture["time_slots"].append({
-                    "day": row['p2.day'],
-                    "start_index": p2_start_index,
-                    "end_index": p2_end_index
-                })
-        
-        lectures_data.append(lecture)
+            "section": _native(section),
+            "name": name,
+            "prof": _native(prof),
+            "time_slots": time_slots
+        })
+    stats.add("lectures_written", len(lectures_data))
+    return lectures_data
+
+def _iter_sheet_rows_streaming(excel_path):
+    """
+    openpyxl read-only 모드로 워크시트의 행을 하나씩 {컬럼명: 값} 딕셔너리로 생성(yield)합니다.
+    워크북 전체를 메모리에 올리지 않으므로 매우 큰 파일에 사용합니다.
+    """
+    workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [(str(col).strip(), pos) for pos, col in enumerate(header) if col is not None]
+        for values in rows:
+            yield {key: values[pos] if pos < len(values) else None for key, pos in columns}
+    finally:
+        workbook.close()
+
+def convert_row(row, lecture_id, stats):
+    """행 딕셔너리 하나를 강의 딕셔너리로 변환합니다. 과목명이 없는 행은 None을 반환합니다."""
+    stats.add("rows_read")
+    name = _native(row.get("name"))
+    if name is None:
+        stats.add("dropped_rows")
+        return None
+
+    time_slots = []
+    for prefix in PERIOD_PREFIXES:
+        day = _native(row.get(f"{prefix}.day"))
+        if day is None:
+            continue
+        start_minutes = time_to_minutes(row.get(f"{prefix}.start"))
+        end_minutes = time_to_minutes(row.get(f"{prefix}.end"))
+        if start_minutes is None or end_minutes is None or end_minutes <= start_minutes:
+            stats.add("invalid_time_slots")
+            continue
+        if start_minutes < DAY_START_MINUTES:
+            stats.add("pre_9_slots")
+        stats.add("slots_written")
+        time_slots.append({"day": day, "start_index": minutes_to_time_index(start_minutes),
+                           "end_index": minutes_to_time_index(end_minutes - 1),
+                           "start_minute": start_minutes, "end_minute": end_minutes})
 
+    if not time_slots:
+        stats.add("lectures_without_slots")
+    stats.add("lectures_written")
+    return {
+        "id": lecture_id,
+        "section": _native(row.get("section")),
+        "name": name,
+        "prof": _native(row.get("prof.")),
+        "time_slots": time_slots
+    }
+
+def _write_json_stream(lectures, json_output_path, indent=None):
+    """강의를 하나씩 직렬화하여 JSON 배열로 기록합니다. (전체 리스트를 메모리에 두지 않음)"""
+    separator = ",\n" if indent is not None else ", "
     with open(json_output_path, 'w', encoding='utf-8') as f:
-        json.dump(lectures_data, f, ensure_ascii=False, indent=4)
+        f.write("[")
+        for count, lecture in enumerate(lectures):
+            if count:
+                f.write(separator)
+            f.write(json.dumps(lecture, ensure_ascii=False, indent=indent))
+        f.write("]")
+
+def row_hash(row):
+    """원본 행의 내용을 정규화하여 해시합니다. 같은 내용이면 pandas/openpyxl 어느 쪽으로 읽어도 같은 값이 나옵니다."""
+    canonical = [str(_native(row.get(col))) for col in SOURCE_COLUMNS]
+    return hashlib.sha1(json.dumps(canonical, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def lecture_key(name, section, prof):
+    """강의 ID를 고정하는 키 (name, section, prof)를 문자열로 만듭니다."""
+    return json.dumps([name, section, prof], ensure_ascii=False)
+
+def load_manifest(manifest_path):
+    """이전 빌드의 매니페스트를 읽습니다. 없으면 빈 매니페스트를 반환합니다."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return {"version": manifest.get("version", 0), "next_id": manifest.get("next_id", 1),
+                "rows": manifest.get("rows", {})}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": 0, "next_id": 1, "rows": {}}
+
+def _load_previous_lectures(json_output_path):
+    try:
+        with open(json_output_path, 'r', encoding='utf-8') as f:
+            return {lecture["id"]: lecture for lecture in json.load(f)}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+class CatalogBuilder:
+    """
+    이전 빌드의 매니페스트(행 키 -> ID, 원본 행 해시)를 이용해 변경된 행만 다시 처리하는 증분 빌더.
+    강의 ID는 (name, section, prof) 키에 고정되므로 행이 추가/삭제되어도 기존 ID가 바뀌지 않습니다.
+    full=True이면 이전 상태를 무시하고 행 순서대로 ID를 새로 부여합니다.
+    """
+    def __init__(self, json_output_path, manifest_path, full=False):
+        manifest = load_manifest(manifest_path)
+        self.manifest_path = manifest_path
+        self.full = full
+        self.previous_version = manifest["version"]
+        self.previous_rows = {} if full else manifest["rows"]
+        self.next_id = 1 if full else manifest["next_id"]
+        self.previous_lectures = {} if full else _load_previous_lectures(json_output_path)
+        if not full and not self.previous_rows and self.previous_lectures:
+            self._bootstrap_from_previous_lectures()
+        self.rows = {}
+        self.key_counts = {}
+        self.added = []
+        self.updated = []
+
+    def _bootstrap_from_previous_lectures(self):
+        """매니페스트 없이 만들어진 기존 lectures.json의 ID를 그대로 이어받습니다."""
+        for lecture in self.previous_lectures.values():
+            key = lecture_key(lecture.get("name"), lecture.get("section"), lecture.get("prof"))
+            self.previous_rows.setdefault(key, {"id": lecture["id"], "hash": None})
+        self.next_id = max(self.previous_lectures) + 1
+
+    def plan(self, row):
+        """
+        행의 (키, 강의 ID, 재사용할 이전 강의 또는 None)을 결정합니다.
+        과목명이 없는 행은 None을 반환합니다.
+        """
+        name = _native(row.get("name"))
+        if name is None:
+            return None
+        base_key = lecture_key(name, _native(row.get("section")), _native(row.get("prof.")))
+        occurrence = self.key_counts.get(base_key, 0)
+        self.key_counts[base_key] = occurrence + 1
+        key = base_key if occurrence == 0 else f"{base_key}#{occurrence}"
+
+        digest = row_hash(row)
+        previous = self.previous_rows.get(key)
+        reused = None
+        if previous is not None:
+            lecture_id = previous["id"]
+            if previous["hash"] == digest:
+                reused = self.previous_lectures.get(lecture_id)
+        else:
+            lecture_id = self.next_id
+            self.next_id += 1
+        self.rows[key] = {"id": lecture_id, "hash": digest}
+        return key, lecture_id, reused
+
+    def record(self, key, lecture, reused):
+        """변환된 강의를 delta(추가/변경)에 반영합니다."""
+        if reused is not None:
+            return
+        if key in self.previous_rows:
+            self.updated.append(lecture)
+        else:
+            self.added.append(lecture)
+
+    def finish(self, delta_path, stats):
+        """매니페스트와 delta 파일을 저장하고 새 카탈로그 버전을 반환합니다."""
+        removed = [row["id"] for key, row in self.previous_rows.items() if key not in self.rows]
+        stats.add("lectures_added", len(self.added))
+        stats.add("lectures_updated", len(self.updated))
+        stats.add("lectures_removed", len(removed))
+
+        changed = bool(self.added or self.updated or removed)
+        version = self.previous_version + 1 if (changed or self.full) else self.previous_version
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": version, "next_id": self.next_id, "rows": self.rows}, f, ensure_ascii=False)
+
+        if self.full:
+            # 전체 재빌드는 ID가 바뀔 수 있으므로 delta 대신 전체 다시 읽기가 필요합니다.
+            if os.path.exists(delta_path):
+                os.remove(delta_path)
+        elif changed:
+            delta = {"from_version": self.previous_version, "version": version,
+                     "added": self.added, "updated": self.updated, "removed": removed}
+            with open(delta_path, 'w', encoding='utf-8') as f:
+                json.dump(delta, f, ensure_ascii=False)
+        return version
+
+def _build_dataframe(excel_path, builder, stats):
+    """pandas로 전체 시트를 읽되, 변경된 행만 모아 한 번에 벡터화 변환합니다."""
+    df = pd.read_excel(excel_path)
+    plans = [builder.plan(row) for row in df.to_dict("records")]
+    changed_pos = [pos for pos, plan in enumerate(plans) if plan is not None and plan[2] is None]
+    converted = convert_dataframe(df.iloc[changed_pos], stats, ids=[plans[pos][1] for pos in changed_pos])
+    converted_by_pos = dict(zip(changed_pos, converted))
+
+    lectures_data = []
+    for pos, plan in enumerate(plans):
+        if plan is None:
+            stats.add("rows_read")
+            stats.add("dropped_rows")
+            continue
+        key, _, reused = plan
+        if reused is not None:
+            stats.add_reused(reused)
+            lecture = reused
+        else:
+            lecture = converted_by_pos[pos]
+        builder.record(key, lecture, reused)
+        lectures_data.append(lecture)
+    return lectures_data
+
+def _iter_build_streaming(excel_path, builder, stats):
+    """스트리밍 모드로 행을 하나씩 읽어, 변경된 행만 변환하고 나머지는 이전 결과를 재사용합니다."""
+    for row in _iter_sheet_rows_streaming(excel_path):
+        plan = builder.plan(row)
+        if plan is None:
+            stats.add("rows_read")
+            stats.add("dropped_rows")
+            continue
+        key, lecture_id, reused = plan
+        if reused is not None:
+            stats.add_reused(reused)
+            lecture = reused
+        else:
+            lecture = convert_row(row, lecture_id, stats)
+        builder.record(key, lecture, reused)
+        yield lecture
+
+def preprocess_excel(excel_path, json_output_path, streaming=False, indent=None, full=False):
+    """
+    Excel 파일을 읽어 전처리한 후 JSON 파일로 저장하고, 검증 통계(PreprocessStats)를 반환합니다.
+    streaming=True이면 openpyxl read-only 모드로 행 단위 처리하여 메모리 사용을 줄입니다.
+
+    기본 동작은 증분 빌드입니다. 출력 파일 옆의 매니페스트(Config.CATALOG_MANIFEST_FILE)로
+    변경된 행만 다시 처리하고, 실행 중인 앱이 적용할 수 있는 delta(Config.CATALOG_DELTA_FILE)를 남깁니다.
+    """
+    json_output_path = Path(json_output_path)
+    manifest_path = json_output_path.with_name(Config.CATALOG_MANIFEST_FILE)
+    delta_path = json_output_path.with_name(Config.CATALOG_DELTA_FILE)
+
+    stats = PreprocessStats()
+    builder = CatalogBuilder(json_output_path, manifest_path, full=full)
+    if streaming:
+        _write_json_stream(_iter_build_streaming(excel_path, builder, stats), json_output_path, indent)
+    else:
+        lectures_data = _build_dataframe(excel_path, builder, stats)
+        with open(json_output_path, 'w', encoding='utf-8') as f:
+            json.dump(lectures_data, f, ensure_ascii=False, indent=indent)
+    stats.catalog_version = builder.finish(delta_path, stats)
+    return stats
 
 if __name__ == "__main__":
     # **개선점**: 스크립트 파일의 위치를 기준으로 파일 경로를 동적으로 생성합니다.
     # 이렇게 하면 다른 컴퓨터에서도 경로 문제 없이 스크립트를 쉽게 실행할 수 있습니다.
+    # 현재 스크립트 파일이 있는 디렉토리의 절대 경로를 가져옵니다.
+    script_dir = Path(__file__).resolve().parent
+
+    parser = argparse.ArgumentParser(description="수강편람 Excel 파일을 lectures.json으로 변환합니다.")
+    # 스크립트와 같은 폴더에 'Lectures0.xlsx' 파일이 있다고 가정합니다.
+    parser.add_argument("excel", nargs="?", default=str(script_dir / "Lectures0.xlsx"), help="입력 Excel 파일")
+    parser.add_argument("output", nargs="?", default=str(script_dir / "lectures.json"), help="출력 JSON 파일")
+    parser.add_argument("--streaming", action="store_true", help="openpyxl read-only 스트리밍 모드 (대용량 파일용)")
+    parser.add_argument("--pretty", action="store_true", help="들여쓰기된 JSON으로 저장")
+    parser.add_argument("--full", action="store_true", help="증분 빌드 대신 전체 재빌드 (강의 ID가 행 순서로 다시 부여됨)")
+    args = parser.parse_args()
+
     try:
-        # 현재 스크립트 파일이 있는 디렉토리의 절대 경로를 가져옵니다.
-        script_dir = Path(__file__).resolve().parent
-        
         # 입력 파일과 출력 파일의 경로를 설정합니다.
-        # 스크립트와 같은 폴더에 'Lectures.xlsx' 파일이 있다고 가정합니다.
-        excel_file_path = script_dir / "Lectures0.xlsx"
-        json_file_path = script_dir / "lectures.json"
+        excel_file_path = Path(args.excel)
+        json_file_path = Path(args.output)
 
         # 입력 파일(Excel)이 실제로 존재하는지 확인합니다.
         if not excel_file_path.is_file():
             raise FileNotFoundError(f"'{excel_file_path}' 파일을 찾을 수 없습니다. 스크립트와 동일한 폴더에 파일이 있는지 확인해주세요.")
 
-        preprocess_excel(excel_file_path, json_file_path)
-        print(f"성공적으로 '{excel_file_path.name}' 파일을 처리하여 '{json_file_path.name}' 파일로 저장했습니다.")
-    
+        stats = preprocess_excel(excel_file_path, json_file_path,
+                                 streaming=args.streaming, indent=4 if args.pretty else None, full=args.full)
+        print(f"성공적으로 '{excel_file_path.name}' 파일을 처리하여 '{json_file_path.name}' 파일로 저장했습니다. (카탈로그 버전 {stats.catalog_version})")
+        print("검증 통계:")
+        print(stats.report())
+
     except FileNotFoundError as e:
         print(f"파일 오류: {e}")
     except Exception as e:
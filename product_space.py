@@ -0,0 +1,163 @@
+# product_space.py
+# 분반 조합 공간(과목별 분반 선택의 곱집합)을 혼합 기수(mixed-radix) 정수로 다룹니다.
+#
+# 조합 번호의 k번째 자리는 과목 k에서 고른 분반의 위치이며, 선택 과목은 마지막 자리 값이 "빼기"입니다.
+# 마지막 과목의 자리가 가장 빨리 바뀌므로 번호 순서는 itertools.product / Scheduler._dfs의 조합 순서와 같습니다.
+# 번호 구간 하나(chunk)를 NumPy로 한꺼번에 자리 배열로 풀고, 과목별 분반 week_mask 배열의 AND로 충돌을 검사하므로
+# 파이썬 반복 없이 조합을 걸러내며 메모리 사용량은 chunk 크기에 비례합니다. 조합 번호 하나의 강의 목록은
+# 앞의 조합을 나열하지 않고 바로 계산할 수 있습니다. (combination)
+import copy
+import math
+
+import numpy as np
+
+from config import Config
+from constraints import credit_for_name
+
+
+class ProductSpace:
+    """
+    Scheduler의 분반 조합 공간.
+    - radices: 과목별 자리 수 (분반 수, 선택 과목은 +1)
+    - masks: 과목별 (자리 수, word 수) uint64 배열. 분 단위 강의 시간의 week_mask를 64비트씩 나눈 값이며 "빼기" 자리는 0
+    """
+    def __init__(self, scheduler):
+        sections = scheduler._section_table()
+        words = scheduler._timeline.words([0])
+        n_words = len(words[0])
+        self.clusters = scheduler.lecture_clusters
+        self.section_counts = [len(options) for options in sections]
+        self.radices = [n + 1 if optional else n for n, optional in zip(self.section_counts, scheduler.optional_flags)]
+        self.size = math.prod(self.radices) if self.radices else 0
+        self.strides = [math.prod(self.radices[k + 1:]) for k in range(len(self.radices))]
+        self.masks = []
+        self.credits = []
+        for options, radix, cluster in zip(sections, self.radices, self.clusters):
+            rows = scheduler._timeline.words([week_mask for _, week_mask, _ in options]) + words * (radix - len(options))
+            self.masks.append(np.array(rows, dtype=np.uint64).reshape(radix, n_words))
+            credit = credit_for_name(cluster[0].name)
+            self.credits.append(np.array([credit] * len(options) + [0] * (radix - len(options)), dtype=np.int64))
+        self.min_credits = scheduler.constraints.min_credits
+        self.max_credits = scheduler.constraints.max_credits
+        self.has_optional = any(scheduler.optional_flags)
+
+    def subspace(self, courses):
+        """
+        과목 courses(번호 목록, 오름차순)만으로 이루어진 ProductSpace. 조합 순서는 courses 순서를 따릅니다.
+        선택 과목 여부와 학점 범위는 그대로 가져오므로, 두 조건이 없을 때 과목을 나누어 탐색하는 데 사용합니다. (components.py)
+        """
+        space = copy.copy(self)
+        space.clusters = [self.clusters[k] for k in courses]
+        space.section_counts = [self.section_counts[k] for k in courses]
+        space.radices = [self.radices[k] for k in courses]
+        space.masks = [self.masks[k] for k in courses]
+        space.credits = [self.credits[k] for k in courses]
+        space.size = math.prod(space.radices) if space.radices else 0
+        space.strides = [math.prod(space.radices[k + 1:]) for k in range(len(space.radices))]
+        return space
+
+    def digits(self, indices, lo=0, hi=None):
+        """
+        조합 번호 배열 (n,)을 자리 배열 (n, hi - lo)로 풉니다.
+        lo/hi를 주면 과목 lo..hi-1만으로 이루어진 부분 공간의 번호로 봅니다.
+        """
+        hi = len(self.radices) if hi is None else hi
+        rest = np.asarray(indices, dtype=np.int64).copy()
+        digits = np.empty((len(rest), hi - lo), dtype=np.int64)
+        for k in range(hi - 1, lo - 1, -1):
+            digits[:, k - lo] = rest % self.radices[k]
+            rest //= self.radices[k]
+        return digits
+
+    def choices(self, digits):
+        """자리 배열을 FeasibleSet.choices 형식(뺀 선택 과목은 -1)으로 바꿉니다."""
+        return np.where(digits < np.array(self.section_counts), digits, -1)
+
+    def combination(self, index):
+        """조합 번호 하나의 강의 목록 (뺀 선택 과목 제외). 앞의 조합을 나열하지 않고 바로 계산합니다."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"조합 번호가 범위를 벗어났습니다: {index} (전체 {self.size}개)")
+        lectures = []
+        for cluster, stride, radix in zip(self.clusters, self.strides, self.radices):
+            i = index // stride % radix
+            if i < len(cluster):
+                lectures.append(cluster[i])
+        return lectures
+
+    def _split(self):
+        """앞쪽/뒤쪽 부분 공간의 크기가 가장 비슷해지는 나눔 위치 (앞쪽 과목 수)"""
+        best, best_size = 0, self.size
+        for split in range(len(self.radices) + 1):
+            size = max(math.prod(self.radices[:split]), math.prod(self.radices[split:]))
+            if size < best_size:
+                best, best_size = split, size
+        return best
+
+    def _partial(self, lo, hi, indices):
+        """
+        과목 lo..hi-1의 부분 조합 번호 indices 중 충돌 없는 것만 남겨
+        (자리 배열, 점유 배열, 학점 합, 고른 과목이 있는지)를 반환합니다.
+        """
+        digits = self.digits(indices, lo, hi)
+        n = len(digits)
+        occupancy = np.zeros((n, self.masks[0].shape[1]), dtype=np.uint64)
+        collided = np.zeros(n, dtype=bool)
+        credit_sum = np.zeros(n, dtype=np.int64)
+        chosen = np.zeros(n, dtype=bool)
+        for k in range(lo, hi):
+            section_masks = self.masks[k][digits[:, k - lo]]
+            collided |= np.any(occupancy & section_masks, axis=1)
+            occupancy |= section_masks
+            credit_sum += self.credits[k][digits[:, k - lo]]
+            chosen |= digits[:, k - lo] < self.section_counts[k]
+        keep = ~collided
+        return digits[keep], occupancy[keep], credit_sum[keep], chosen[keep]
+
+    def feasible_choices(self, chunk_size=None, profile=None):
+        """
+        조건(충돌 없음, 학점 범위, 과목 하나 이상)을 만족하는 모든 조합의 choices 배열을 조합 순서대로 반환합니다.
+
+        과목을 앞쪽/뒤쪽 두 부분으로 나누어 각 부분 공간의 번호를 자리 배열로 풀고 충돌하는 부분 조합을 먼저 버린 뒤,
+        남은 앞쪽 부분 조합 한 묶음과 뒤쪽 부분 조합 전체를 브로드캐스트 AND로 한꺼번에 검사합니다.
+        한 번에 검사하는 쌍은 chunk_size개 정도이고, 결과는 (앞쪽 번호, 뒤쪽 번호) 순서 = 전체 조합 번호 순서입니다.
+        profile(RunProfile)이 있으면 combinations_visited(검사한 쌍) / collisions를 기록합니다.
+        """
+        chunk_size = chunk_size or Config.MIXED_RADIX_CHUNK_SIZE
+        n_courses = len(self.radices)
+        empty = np.zeros((0, n_courses), dtype=np.int32)
+        if not self.size:
+            return empty
+        split = self._split()
+        prefix_size = math.prod(self.radices[:split])
+        suffix_digits, suffix_occupancy, suffix_credits, suffix_chosen = self._partial(
+            split, n_courses, np.arange(math.prod(self.radices[split:]), dtype=np.int64))
+        if not len(suffix_digits):
+            return empty
+
+        step = max(1, chunk_size // len(suffix_digits))
+        chunks = []
+        visited = collisions = 0
+        for start in range(0, prefix_size, step):
+            prefix_digits, prefix_occupancy, prefix_credits, prefix_chosen = self._partial(
+                0, split, np.arange(start, min(start + step, prefix_size), dtype=np.int64))
+            if not len(prefix_digits):
+                continue
+            collided = np.any(prefix_occupancy[:, None, :] & suffix_occupancy[None, :, :], axis=2)
+            feasible = ~collided
+            if self.has_optional:
+                feasible &= prefix_chosen[:, None] | suffix_chosen[None, :]
+            if self.min_credits is not None or self.max_credits is not None:
+                credit_sum = prefix_credits[:, None] + suffix_credits[None, :]
+                if self.min_credits is not None:
+                    feasible &= credit_sum >= self.min_credits
+                if self.max_credits is not None:
+                    feasible &= credit_sum <= self.max_credits
+            visited += collided.size
+            collisions += int(collided.sum())
+            rows, columns = np.nonzero(feasible)
+            digits = np.hstack([prefix_digits[rows], suffix_digits[columns]])
+            chunks.append(self.choices(digits).astype(np.int32))
+        if profile is not None:
+            profile.count("combinations_visited", visited)
+            profile.count("collisions", collisions)
+        return np.concatenate(chunks) if chunks else empty
@@ -0,0 +1,133 @@
+# profiler.py
+# 시간표 생성 과정의 단계별 소요 시간과 핫패스 카운터를 기록합니다.
+import io
+import json
+import time
+from contextlib import contextmanager
+
+
+class RunProfile:
+    """
+    Scheduler.run 한 번의 실행에 대한 계측 정보를 담는 클래스.
+    단계별 타이머(phase_times)와 카운터(counters)를 기록하고,
+    선택적으로 cProfile / tracemalloc 캡처 결과를 함께 보관합니다.
+    """
+    PHASES = ["clustering", "enumeration", "collision", "scoring", "sorting", "result"]
+    COUNTERS = ["combinations_visited", "collisions", "pruned_branches", "cache_hits"]
+    CAPTURE_MODES = (None, "cprofile", "tracemalloc")
+
+    def __init__(self, capture=None):
+        if capture not in self.CAPTURE_MODES:
+            raise ValueError(f"지원하지 않는 캡처 모드입니다: {capture}")
+        self.phase_times = {phase: 0.0 for phase in self.PHASES}
+        self.counters = {name: 0 for name in self.COUNTERS}
+        self.capture = capture
+        self.capture_report = None
+        self.elapsed_time = 0.0
+        self.extra = {}
+        self._profiler = None
+
+    @contextmanager
+    def phase(self, name):
+        """with 블록 안에서 소요된 시간을 해당 단계에 누적합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_capture(self):
+        """설정된 캡처 모드(cProfile / tracemalloc)를 시작합니다."""
+        if self.capture == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.capture == "tracemalloc":
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop_capture(self, top=15):
+        """캡처를 종료하고 사람이 읽을 수 있는 보고서를 capture_report에 저장합니다."""
+        if self.capture == "cprofile" and self._profiler is not None:
+            import pstats
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            self.capture_report = stream.getvalue()
+            self._profiler = None
+        elif self.capture == "tracemalloc":
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                lines = [f"current={current / 1024:.1f} KiB, peak={peak / 1024:.1f} KiB"]
+                for stat in snapshot.statistics("lineno")[:top]:
+                    lines.append(str(stat))
+                self.capture_report = "\n".join(lines)
+
+    def to_dict(self):
+        """JSON으로 직렬화 가능한 실행 기록을 반환합니다."""
+        record = {
+            "timestamp": time.time(),
+            "elapsed_time": self.elapsed_time,
+            "phases": dict(self.phase_times),
+            "counters": dict(self.counters),
+        }
+        if self.extra:
+            record["extra"] = dict(self.extra)
+        if self.capture:
+            record["capture"] = self.capture
+            record["capture_report"] = self.capture_report
+        return record
+
+    def summary_text(self):
+        """P6에 표시할 한 줄 요약 문자열을 생성합니다."""
+        phases = " / ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.phase_times.items())
+        counters = ", ".join(f"{name}={value}" for name, value in self.counters.items())
+        return f"{phases}\n{counters}"
+
+
+class StartupProfile:
+    """
+    앱 시작 과정의 계측 정보.
+    - marks: 프로세스 시작(main.py 첫 줄) 기준으로 각 시점까지 걸린 시간 (imports, window, first_paint, ready)
+    - phase_times: 백그라운드 강의 목록 로드의 단계별 소요 시간 (import, catalog_load)
+    """
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = {}
+        self.phase_times = {}
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.start
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def to_dict(self):
+        return {"timestamp": time.time(), "startup": dict(self.marks), "phases": dict(self.phase_times)}
+
+    def summary_text(self):
+        marks = " / ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.marks.items())
+        phases = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phase_times.items())
+        return f"{marks} (백그라운드: {phases})"
+
+
+def jsonl_hook(filepath):
+    """실행마다 JSON 레코드 한 줄을 filepath에 추가하는 hook을 생성합니다."""
+    def hook(record):
+        try:
+            with open(filepath, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except IOError as e:
+            print(f"[ERROR] Could not write profile record: {e}")
+    return hook
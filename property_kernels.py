@@ -0,0 +1,139 @@
+# property_kernels.py
+# 기본 네 속성(선호/비선호 시간, 공강 시간, 선호 과목) 외에 추가로 Loss에 더할 수 있는 시간표 속성들.
+#
+# 각 속성(kernel)은 시간표 여러 개의 요일별 점유 비트마스크 배열 (시간표 수, 요일 수)을 받아
+# 요일별 값 배열 (시간표 수, 요일 수)을 반환하는 벡터 함수입니다. 요일별 값은 기본 속성과 같이
+# 합산하거나(RSS가 켜져 있으면 제곱합의 제곱근) 가중치를 곱해 Loss에 더합니다. 값이 클수록 나쁜 속성입니다.
+# 가중치는 Model.loss_weights의 기본 네 항목 뒤에 PROPERTY_KERNELS 순서로 이어지며, 기본값 0이면 계산하지 않습니다.
+import numpy as np
+
+from config import Config
+
+BASE_PROPERTY_COUNT = 4 # Model.loss_weights 앞쪽의 기본 속성 수 (Config.PAGE5_ATTRIBUTES)
+
+
+def _slots_mask(slots):
+    mask = 0
+    for slot in slots:
+        mask |= 1 << slot
+    return mask
+
+
+def _max_bits(occupancy):
+    return int(occupancy.max()).bit_length() if occupancy.size else 0
+
+
+def popcount_array(occupancy):
+    """배열 원소마다 1인 비트 수"""
+    if hasattr(np, "bitwise_count"): # NumPy 2.0+
+        return np.bitwise_count(occupancy).astype(np.int64)
+    counts = np.zeros(occupancy.shape, dtype=np.int64)
+    for bit in range(_max_bits(occupancy)):
+        counts += ((occupancy >> np.uint64(bit)) & np.uint64(1)).astype(np.int64)
+    return counts
+
+
+def first_slot(occupancy):
+    """요일별 첫 수업 슬롯 (수업이 없으면 -1)"""
+    first = np.full(occupancy.shape, -1, dtype=np.int64)
+    for bit in range(_max_bits(occupancy) - 1, -1, -1):
+        first = np.where((occupancy >> np.uint64(bit)) & np.uint64(1), bit, first)
+    return first
+
+
+def last_slot(occupancy):
+    """요일별 마지막 수업 슬롯 (수업이 없으면 -1)"""
+    last = np.full(occupancy.shape, -1, dtype=np.int64)
+    for bit in range(_max_bits(occupancy)):
+        last = np.where((occupancy >> np.uint64(bit)) & np.uint64(1), bit, last)
+    return last
+
+
+def lunch_overlap(occupancy):
+    """점심시간(Config.LUNCH_SLOTS)에 수업이 있는 슬롯 수"""
+    return popcount_array(occupancy & np.uint64(_slots_mask(Config.LUNCH_SLOTS)))
+
+
+def campus_days(occupancy):
+    """수업이 있는 요일이면 1"""
+    return (occupancy != 0).astype(np.int64)
+
+
+def early_start(occupancy):
+    """첫 수업이 Config.MORNING_START_SLOT보다 몇 슬롯 이른지 (수업이 없거나 늦으면 0)"""
+    first = first_slot(occupancy)
+    return np.where(first >= 0, np.maximum(0, Config.MORNING_START_SLOT - first), 0)
+
+
+def late_finish(occupancy):
+    """마지막 수업이 Config.EVENING_END_SLOT보다 몇 슬롯 늦게 끝나는지 (수업이 없거나 이르면 0)"""
+    last = last_slot(occupancy)
+    return np.where(last >= 0, np.maximum(0, last + 1 - Config.EVENING_END_SLOT), 0)
+
+
+def longest_block(occupancy):
+    """쉬는 시간 없이 이어지는 가장 긴 수업 슬롯 수. (m & (m >> 1))을 반복할 때마다 연속 구간이 한 칸씩 줄어듭니다."""
+    length = np.zeros(occupancy.shape, dtype=np.int64)
+    remaining = occupancy.copy()
+    while remaining.any():
+        length += remaining != 0
+        remaining &= remaining >> np.uint64(1)
+    return length
+
+
+class PropertyKernel:
+    """추가 속성 하나: P5에 표시할 이름과 요일별 값을 계산하는 벡터 함수"""
+    def __init__(self, name, daily):
+        self.name = name
+        self.daily = daily
+
+
+PROPERTY_KERNELS = [
+    PropertyKernel("Lunch time", lunch_overlap),
+    PropertyKernel("Campus days", campus_days),
+    PropertyKernel("Early start", early_start),
+    PropertyKernel("Late finish", late_finish),
+    PropertyKernel("Longest block", longest_block),
+]
+
+
+def active_kernels(weights):
+    """가중치가 0이 아닌 (kernel, 가중치 dict) 목록. 가중치 목록에 없는 속성은 0으로 봅니다."""
+    active = []
+    for j, kernel in enumerate(PROPERTY_KERNELS):
+        index = BASE_PROPERTY_COUNT + j
+        if index < len(weights) and weights[index]['weight']:
+            active.append((kernel, weights[index]))
+    return active
+
+
+def kernel_values(occupancy, weights):
+    """활성화된 속성마다 시간표별 값 배열 (요일별 값을 합산 또는 RSS)을 [(kernel, 가중치 dict, 값)]으로 반환합니다."""
+    values = []
+    for kernel, weight in active_kernels(weights):
+        daily = kernel.daily(occupancy)
+        if weight['rss']:
+            total = np.sqrt((daily * daily).sum(axis=1))
+        else:
+            total = daily.sum(axis=1)
+        values.append((kernel, weight, total))
+    return values
+
+
+def extra_loss(occupancy, weights):
+    """
+    추가 속성의 Loss 배열 (시간표 수,). occupancy는 요일별 점유 비트마스크 (시간표 수, 요일 수) uint64 배열입니다.
+    활성화된 속성이 없으면 None을 반환합니다.
+    """
+    values = kernel_values(occupancy, weights)
+    if not values:
+        return None
+    loss = 0
+    for _, weight, total in values:
+        loss = loss + total * weight['weight']
+    return loss
+
+
+def occupancy_array(day_masks_rows):
+    """요일별 비트마스크 리스트들을 occupancy 배열로 변환합니다."""
+    return np.array(day_masks_rows, dtype=np.uint64).reshape(len(day_masks_rows), -1)
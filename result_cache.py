@@ -0,0 +1,116 @@
+# result_cache.py
+# 생성된 시간표 결과를 디스크에 캐시하여, 입력이 같으면 Scheduler.run을 다시 실행하지 않도록 합니다.
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from config import Config
+from intervals import slot_minutes
+
+
+def result_cache_key(selected_lectures, good_slots, bad_slots, weights, catalog_version, extra=None):
+    """
+    스케줄링 입력 전체를 정규화(canonical JSON)한 뒤 해시하여 캐시 키를 만듭니다.
+    선택한 강의의 시간 정보도 포함하므로 카탈로그 내용이 바뀌면 키도 달라집니다.
+    """
+    lectures = sorted(selected_lectures, key=lambda lec: lec.id)
+    canonical = {
+        "lectures": [[lec.id, lec.name, lec.preference,
+                      [[slot['day'], slot['start_index'], slot['end_index'], *slot_minutes(slot)] for slot in lec.time_slots]]
+                     for lec in lectures],
+        "good_slots": {day: sorted(slots) for day, slots in sorted(good_slots.items())},
+        "bad_slots": {day: sorted(slots) for day, slots in sorted(bad_slots.items())},
+        "weights": [[w['weight'], bool(w['rss'])] for w in weights],
+        "catalog_version": catalog_version,
+        "extra": extra,
+    }
+    encoded = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    캐시 항목 하나를 gzip으로 압축한 JSON 파일 하나로 저장하는 디스크 캐시.
+    결과는 (강의 ID 목록, 점수, 속성 값)만 저장하며, 항목 수와 전체 바이트 수를 넘으면
+    가장 오래 사용하지 않은 항목(파일 수정 시각 기준)부터 삭제합니다.
+    """
+    def __init__(self, directory=None, max_entries=None, max_bytes=None):
+        self.directory = directory or Config.RESULT_CACHE_DIR
+        self.max_entries = max_entries if max_entries is not None else Config.RESULT_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else Config.RESULT_CACHE_MAX_BYTES
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def load(self, key, lectures_by_id):
+        """
+        캐시된 결과를 Timetable 리스트로 복원하여 (results, elapsed_time, engine)을 반환합니다.
+        캐시가 없거나 복원할 수 없으면 None을 반환합니다.
+        """
+        from model import Timetable
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            properties = entry.get('properties') or [None] * len(entry['scores'])
+            results = [Timetable([lectures_by_id[lecture_id] for lecture_id in ids], score,
+                                 tuple(props) if props is not None else None)
+                       for ids, score, props in zip(entry['lecture_ids'], entry['scores'], properties)]
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, KeyError) as e:
+            print(f"[ERROR] Could not read result cache entry, ignoring it: {e}")
+            return None
+        os.utime(path) # LRU: 최근 사용 시각 갱신
+        return results, entry.get('elapsed_time', 0.0), entry.get('engine')
+
+    def store(self, key, results, elapsed_time, engine=None):
+        """결과를 캐시에 저장하고 크기 제한을 넘는 오래된 항목을 정리합니다. engine은 근사 탐색 결과인지 구분합니다."""
+        entry = {
+            "created": time.time(),
+            "elapsed_time": elapsed_time,
+            "engine": engine,
+            "lecture_ids": [[lec.id for lec in tt.lectures] for tt in results],
+            "scores": [tt.score for tt in results],
+            "properties": [tt.properties for tt in results],
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with gzip.open(self._path(key), 'wt', encoding='utf-8') as f:
+                json.dump(entry, f, separators=(',', ':'))
+        except OSError as e:
+            print(f"[ERROR] Could not write result cache entry: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """항목 수(max_entries)와 전체 크기(max_bytes) 제한을 넘으면 오래된 항목부터 삭제합니다."""
+        try:
+            entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                       if name.endswith('.json.gz')]
+            entries = sorted(((os.stat(path).st_mtime, os.stat(path).st_size, path) for path in entries), reverse=True)
+        except OSError:
+            return
+        total_bytes = 0
+        for count, (_, size, path) in enumerate(entries, start=1):
+            total_bytes += size
+            if count > self.max_entries or total_bytes > self.max_bytes:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """캐시 디렉토리의 모든 항목을 삭제합니다."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.json.gz'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,63 @@
+# result_groups.py
+# 요일별 점유(어느 요일 어느 슬롯에 수업이 있는지)와 점수가 같은 결과들을 하나의 그룹으로 묶습니다.
+# 같은 시간에 열리는 다른 분반(다른 교수)을 고른 시간표들은 시간표 그림과 점수가 모두 같으므로,
+# P6에서는 그룹 하나를 결과 하나로 보여주고 그룹 안의 분반 대안은 펼쳐서 고를 수 있게 합니다.
+# 결과 목록 자체(Model.generated_timetables)는 그대로 두고, 결과 번호를 그룹별로 나눈 표만 만듭니다.
+import numpy as np
+
+from property_kernels import occupancy_array
+
+
+def occupancy_group_ids(occupancy, scores):
+    """
+    결과마다 그룹 번호 배열을 반환합니다. occupancy는 (결과 수, 요일 수) uint64 배열, scores는 (결과 수,) 배열이며
+    두 값이 모두 같은 결과는 같은 번호가 됩니다. (번호 자체의 순서는 의미 없음)
+    """
+    if len(scores) == 0:
+        return np.zeros(0, dtype=np.int64)
+    score_bits = np.ascontiguousarray(scores, dtype=np.float64).view(np.uint64).reshape(-1, 1)
+    keys = np.hstack([np.asarray(occupancy, dtype=np.uint64).reshape(len(score_bits), -1), score_bits])
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    return inverse.reshape(-1)
+
+
+def group_timetables(timetables, scheduler):
+    """Timetable 목록의 ResultGroups. 요일별 점유는 scheduler의 비트마스크로 계산합니다. (FeasibleSet을 거치지 않은 결과용)"""
+    occupancy = occupancy_array([scheduler._day_masks_of(tt.lectures) for tt in timetables])
+    return ResultGroups(occupancy_group_ids(occupancy, np.array([tt.score for tt in timetables], dtype=np.float64)))
+
+
+class ResultGroups:
+    """
+    결과 번호를 그룹으로 나눈 표.
+    그룹 순서는 그룹의 첫 결과 번호 순서(점수 순 결과에서는 점수 순)이고, 그룹 안의 결과 번호는 오름차순입니다.
+    """
+    def __init__(self, group_ids):
+        group_ids = np.asarray(group_ids, dtype=np.int64)
+        self.size = len(group_ids)
+        if self.size:
+            # 그룹 번호를 첫 등장 순서로 다시 매깁니다.
+            _, first, inverse = np.unique(group_ids, return_index=True, return_inverse=True)
+            rank = np.empty(len(first), dtype=np.int64)
+            rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+            self.group_of = rank[inverse.reshape(-1)]
+            counts = np.bincount(self.group_of)
+        else:
+            self.group_of = group_ids
+            counts = np.zeros(0, dtype=np.int64)
+        self._positions = np.argsort(self.group_of, kind='stable')
+        self._starts = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def group_size(self, index):
+        return int(self._starts[index + 1] - self._starts[index])
+
+    def members(self, index):
+        """그룹 index에 속한 결과 번호 리스트 (첫 번호가 대표 결과)"""
+        return self._positions[self._starts[index]:self._starts[index + 1]].tolist()
+
+    def restrict(self, positions):
+        """결과 번호 positions(오름차순)만 남긴 ResultGroups. 새 표의 결과 번호는 positions 안의 위치입니다."""
+        return ResultGroups(self.group_of[np.asarray(positions, dtype=np.int64)])
@@ -0,0 +1,98 @@
+# result_index.py
+# 생성된 시간표 목록에 대한 역색인(inverted index).
+# 분반 ID / 교수 / 공강 요일마다 해당하는 결과 번호를 비트셋(int, bit i = i번째 결과)으로 저장하여,
+# P6의 필터("이 분반 포함", "금요일 공강", "이 교수 제외")를 비트 연산만으로 바로 계산합니다.
+from collections import defaultdict
+
+import numpy as np
+
+
+def _positions_to_bits(positions, size):
+    """결과 번호 리스트를 비트셋 정수로 변환합니다."""
+    flags = np.zeros(size, dtype=bool)
+    flags[positions] = True
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+
+def bits_to_positions(bits, size):
+    """비트셋 정수를 오름차순 결과 번호 리스트로 변환합니다."""
+    if not bits:
+        return []
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder='little')[:size]).tolist()
+
+
+class ResultSubset:
+    """결과 목록 중 일부 번호만 보여주는 읽기 전용 목록. (SQLite 저장소 결과도 필요한 항목만 읽습니다)"""
+    def __init__(self, timetables, positions):
+        self.timetables = timetables
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        return self.timetables[self.positions[index]]
+
+
+class ResultIndex:
+    """
+    시간표 결과 목록의 역색인.
+    - by_lecture: 분반 ID -> 그 분반을 포함하는 결과
+    - by_prof: 교수 -> 그 교수의 강의를 포함하는 결과
+    - by_free_day: 요일 -> 그 요일에 수업이 없는 결과
+    - free_patterns: 공강 요일 조합(정렬된 튜플) -> 결과 수
+    """
+    def __init__(self, timetables, days=("Mon", "Tue", "Wed", "Thu", "Fri")):
+        self.size = len(timetables)
+        self.days = tuple(days)
+        lecture_postings = defaultdict(list)
+        prof_postings = defaultdict(list)
+        day_postings = {day: [] for day in self.days}
+        self.free_patterns = defaultdict(int)
+        self.lectures = {}
+
+        for position, tt in enumerate(timetables):
+            busy_days = set()
+            profs = set()
+            for lec in tt.lectures:
+                lecture_postings[lec.id].append(position)
+                self.lectures[lec.id] = lec
+                profs.add(lec.prof)
+                busy_days.update(slot['day'] for slot in lec.time_slots)
+            for prof in profs:
+                prof_postings[prof].append(position)
+            free = tuple(day for day in self.days if day not in busy_days)
+            for day in free:
+                day_postings[day].append(position)
+            self.free_patterns[free] += 1
+
+        self.by_lecture = {key: _positions_to_bits(p, self.size) for key, p in lecture_postings.items()}
+        self.by_prof = {key: _positions_to_bits(p, self.size) for key, p in prof_postings.items()}
+        self.by_free_day = {key: _positions_to_bits(p, self.size) for key, p in day_postings.items()}
+
+    @property
+    def all_bits(self):
+        return (1 << self.size) - 1
+
+    def query(self, include_ids=(), exclude_ids=(), include_profs=(), exclude_profs=(), free_days=()):
+        """모든 조건을 만족하는 결과의 비트셋을 반환합니다. (조건 사이는 AND)"""
+        bits = self.all_bits
+        for lecture_id in include_ids:
+            bits &= self.by_lecture.get(lecture_id, 0)
+        for prof in include_profs:
+            bits &= self.by_prof.get(prof, 0)
+        for day in free_days:
+            bits &= self.by_free_day.get(day, 0)
+        for lecture_id in exclude_ids:
+            bits &= ~self.by_lecture.get(lecture_id, 0)
+        for prof in exclude_profs:
+            bits &= ~self.by_prof.get(prof, 0)
+        return bits
+
+    def filter_positions(self, **conditions):
+        """query()와 같은 조건으로 걸러낸 결과 번호 리스트(원래 순서)를 반환합니다."""
+        return bits_to_positions(self.query(**conditions), self.size)
+
+    def professors(self):
+        return sorted(self.by_prof, key=str)
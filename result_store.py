@@ -0,0 +1,271 @@
+# result_store.py
+# 충돌 없는 시간표가 너무 많아 메모리에 모두 올리기 어려울 때, 결과를 SQLite 파일에 저장하고
+# 사용자가 보는 페이지만 읽어 오는 저장소입니다.
+#
+# 결과는 생성 순서(seq)대로 executemany로 한 번에 여러 행씩 기록하고,
+# (run_id, 점수/속성, seq) 인덱스로 원하는 기준의 정렬 순서를 바로 읽습니다.
+# 점수가 같으면 seq 순서이므로, 점수로 정렬한 결과는 Scheduler.run()의 안정 정렬 결과와 같습니다.
+import sqlite3
+import time
+from collections import OrderedDict
+
+from config import Config
+
+SORT_COLUMNS = ("score", "fit_good", "fit_bad", "break_time", "prefer")
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        created REAL,
+        count INTEGER,
+        elapsed_time REAL,
+        engine TEXT,
+        score_sum REAL,
+        score_square_sum REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS results (
+        run_id TEXT,
+        seq INTEGER,
+        score REAL,
+        fit_good REAL,
+        fit_bad REAL,
+        break_time REAL,
+        prefer REAL,
+        lecture_ids TEXT,
+        PRIMARY KEY (run_id, seq)
+    ) WITHOUT ROWID""",
+] + [f"CREATE INDEX IF NOT EXISTS results_{column} ON results (run_id, {column}, seq)" for column in SORT_COLUMNS]
+
+
+class ResultStore:
+    """
+    SQLite 파일 하나에 여러 실행(run)의 결과를 저장합니다. run_id로는 결과 캐시 키를 사용하므로,
+    입력이 같으면 저장된 결과를 다시 생성하지 않고 읽을 수 있습니다.
+    저장된 실행이 max_runs개를 넘으면 가장 오래된 실행부터 삭제합니다.
+    """
+    def __init__(self, path=None, max_runs=None):
+        self.path = path or Config.RESULT_STORE_FILE
+        self.max_runs = max_runs if max_runs is not None else Config.RESULT_STORE_MAX_RUNS
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self._connection.commit()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def has_run(self, run_id):
+        try:
+            row = self.connection.execute("SELECT count FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"[ERROR] Could not read result store: {e}")
+            return False
+        return row is not None
+
+    def run_info(self, run_id):
+        """(count, elapsed_time, engine, mean, std)를 반환합니다. 실행이 없으면 None."""
+        row = self.connection.execute(
+            "SELECT count, elapsed_time, engine, score_sum, score_square_sum FROM runs WHERE run_id = ?",
+            (run_id,)).fetchone()
+        if row is None:
+            return None
+        count, elapsed_time, engine, score_sum, square_sum = row
+        mean = score_sum / count if count else 0.0
+        variance = max(0.0, square_sum / count - mean * mean) if count else 0.0
+        return count, elapsed_time, engine, mean, variance ** 0.5
+
+    def writer(self, run_id, batch_size=None):
+        """run_id의 이전 결과를 지우고 새 결과를 기록할 ResultWriter를 반환합니다."""
+        self.delete_run(run_id)
+        return ResultWriter(self, run_id, batch_size)
+
+    def delete_run(self, run_id):
+        connection = self.connection
+        connection.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+        connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        connection.commit()
+
+    def evict(self):
+        """오래된 실행을 삭제하여 저장된 실행 수를 max_runs 이하로 유지합니다."""
+        old_runs = self.connection.execute(
+            "SELECT run_id FROM runs ORDER BY created DESC LIMIT -1 OFFSET ?", (self.max_runs,)).fetchall()
+        for (run_id,) in old_runs:
+            self.delete_run(run_id)
+
+    def count_scores(self, run_id, scores):
+        """점수별 같은 점수를 가진 결과 수 {점수: 개수}. 점수 인덱스로 한 번에 묶어 셉니다."""
+        scores = sorted(set(scores))
+        counts = {}
+        for start in range(0, len(scores), 500): # SQLite 매개변수 수 제한
+            chunk = scores[start:start + 500]
+            counts.update(self.connection.execute(
+                f"SELECT score, COUNT(*) FROM results WHERE run_id = ? AND score IN ({','.join('?' * len(chunk))}) "
+                f"GROUP BY score", (run_id, *chunk)).fetchall())
+        return counts
+
+    def _select(self, columns, run_id, limit, order_by, descending, after):
+        """
+        order_by 기준으로 정렬한 결과 중 after = (order_by 값, seq) 다음 limit개 행을 읽습니다. (after가 None이면 처음부터)
+        (run_id, order_by, seq) 인덱스에서 바로 이어 읽도록, 오름차순은 행 값 비교 하나로, 내림차순(seq는 오름차순)은
+        "정렬 값이 같은 뒤쪽 행"과 "정렬 값이 작은 행" 두 구간으로 나누어 읽습니다.
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"정렬할 수 없는 열입니다: {order_by}")
+        if after is None:
+            ranges = [("", (), "DESC" if descending else "ASC")]
+        elif not descending:
+            ranges = [(f" AND ({order_by}, seq) > (?, ?)", tuple(after), "ASC")]
+        else:
+            value, seq = after
+            ranges = [(f" AND {order_by} = ? AND seq > ?", (value, seq), "DESC"),
+                      (f" AND {order_by} < ?", (value,), "DESC")]
+        rows = []
+        for condition, params, direction in ranges:
+            rows.extend(self.connection.execute(
+                f"SELECT {columns} FROM results WHERE run_id = ?{condition} ORDER BY {order_by} {direction}, seq LIMIT ?",
+                (run_id, *params, limit - len(rows))).fetchall())
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def fetch(self, run_id, limit, order_by="score", descending=False, after=None):
+        """
+        order_by 기준으로 정렬한 결과 중 after 다음 limit개 행을 읽습니다. OFFSET으로 앞의 행을 건너뛰지 않고
+        인덱스에서 바로 이어 읽으며, 각 행의 끝에 다음 페이지를 읽을 키 (order_by 값, seq)가 붙습니다.
+        """
+        return self._select(f"score, fit_good, fit_bad, break_time, prefer, lecture_ids, {order_by}, seq",
+                            run_id, limit, order_by, descending, after)
+
+    def page_end(self, run_id, limit, order_by="score", descending=False, after=None):
+        """after 다음 limit번째 행의 키 (order_by 값, seq). 결과 행 대신 인덱스의 키만 읽어 다음 페이지의 시작 위치를 찾습니다."""
+        keys = self._select(f"{order_by}, seq", run_id, limit, order_by, descending, after)
+        return keys[-1] if keys else None
+
+    def results(self, run_id, lectures_by_id, order_by="score", descending=False):
+        """저장된 실행을 필요한 페이지만 읽어 오는 StoredResults로 반환합니다."""
+        return StoredResults(self, run_id, lectures_by_id, order_by, descending)
+
+
+class ResultWriter:
+    """결과를 batch_size개씩 모아 executemany로 기록합니다. finish()를 호출해야 실행이 등록됩니다."""
+    def __init__(self, store, run_id, batch_size=None):
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size or Config.RESULT_STORE_BATCH_SIZE
+        self.count = 0
+        self.score_sum = 0.0
+        self.score_square_sum = 0.0
+        self._rows = []
+
+    def add(self, lectures, score, properties):
+        self._rows.append((self.run_id, self.count, score, *properties,
+                           ",".join(str(lec.id) for lec in lectures)))
+        self.count += 1
+        self.score_sum += score
+        self.score_square_sum += score * score
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self.store.connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._rows)
+            self._rows = []
+
+    def finish(self, elapsed_time, engine="exact"):
+        self._flush()
+        connection = self.store.connection
+        connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (self.run_id, time.time(), self.count, elapsed_time, engine,
+                            self.score_sum, self.score_square_sum))
+        connection.commit()
+        self.store.evict()
+        return self.count
+
+
+class StoredResults:
+    """
+    SQLite에 저장된 결과 목록. 리스트처럼 len()과 인덱스로 접근할 수 있지만,
+    실제로는 page_size개 단위로 필요한 페이지만 읽고 최근 페이지 몇 개만 메모리에 둡니다.
+    페이지는 앞 페이지의 마지막 키 (정렬 값, seq) 다음부터 읽고(keyset), 한 번 찾은 페이지 시작 키는 기억합니다.
+    Z-Score는 저장된 합계로, 같은 점수 개수는 페이지마다 묶음 질의 한 번으로 계산하여 읽을 때 채웁니다.
+    """
+    def __init__(self, store, run_id, lectures_by_id, order_by="score", descending=False, page_size=None):
+        self.store = store
+        self.run_id = run_id
+        self.lectures_by_id = lectures_by_id
+        self.order_by = order_by
+        self.descending = descending
+        self.page_size = page_size or Config.RESULT_STORE_PAGE_SIZE
+        self._count, self.elapsed_time, self.engine, self.mean, self.std = store.run_info(run_id)
+        self._pages = OrderedDict()
+        self._page_starts = {0: None} # 페이지 번호 -> 앞 페이지의 마지막 키
+        self._same_score_counts = {} # 점수 -> 같은 점수를 가진 결과 수 (읽은 페이지의 점수만)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("result index out of range")
+        page_number, offset = divmod(index, self.page_size)
+        return self._page(page_number)[offset]
+
+    def __iter__(self):
+        after = None
+        for page_number in range((self._count + self.page_size - 1) // self.page_size):
+            rows = self.store.fetch(self.run_id, self.page_size, self.order_by, self.descending, after)
+            if not rows:
+                return
+            after = rows[-1][-2:]
+            yield from self._timetables(rows)
+
+    def _page(self, page_number):
+        if page_number in self._pages:
+            self._pages.move_to_end(page_number)
+            return self._pages[page_number]
+        page = self._load_page(page_number)
+        self._pages[page_number] = page
+        if len(self._pages) > Config.RESULT_STORE_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def _page_start(self, page_number):
+        """page_number 페이지의 시작 키. 모르면 가장 가까운 앞 페이지부터 키만 읽으며 건너갑니다."""
+        known = max(p for p in self._page_starts if p <= page_number)
+        after = self._page_starts[known]
+        for p in range(known, page_number):
+            after = self.store.page_end(self.run_id, self.page_size, self.order_by, self.descending, after)
+            self._page_starts[p + 1] = after
+        return after
+
+    def _load_page(self, page_number):
+        rows = self.store.fetch(self.run_id, self.page_size, self.order_by, self.descending,
+                                self._page_start(page_number))
+        if rows:
+            self._page_starts[page_number + 1] = rows[-1][-2:]
+        return self._timetables(rows)
+
+    def _timetables(self, rows):
+        from model import Timetable
+        same_score_counts = self._same_score_counts
+        missing = {row[0] for row in rows} - same_score_counts.keys()
+        if missing:
+            same_score_counts.update(self.store.count_scores(self.run_id, missing))
+        page = []
+        for score, fit_good, fit_bad, break_time, prefer, lecture_ids, _, _ in rows:
+            tt = Timetable([self.lectures_by_id[int(i)] for i in lecture_ids.split(",")], score,
+                           (fit_good, fit_bad, break_time, prefer))
+            tt.z_score = (score - self.mean) / self.std if self.std != 0 else 0.0
+            tt.same_score_count = same_score_counts.get(score, 0)
+            page.append(tt)
+        return page
@@ -0,0 +1,107 @@
+# sampler.py
+# 충돌 없는 시간표 전체를 만들지 않고 표본으로 점수 분포(평균, 표준편차, 같은 점수 비율)를 추정합니다.
+# P6의 Z-Score와 Same Score Candidates를 근사 탐색 결과에도 신뢰 구간과 함께 표시하기 위해 사용합니다.
+import math
+import random
+from collections import defaultdict
+
+from config import Config
+from estimator import FeasibleCounter
+
+Z_95 = 1.96 # 95% 신뢰 구간
+
+
+class PopulationStats:
+    """
+    충돌 없는 시간표 전체(모집단)의 점수 통계.
+    - population: 모집단 크기 (정확히 셀 수 없으면 추정값)
+    - uniform: True이면 균등 표본, False이면 무작위 경로 표본을 가중치로 보정한 추정
+    - effective_samples: 가중치를 고려한 유효 표본 수 (균등 표본이면 표본 수와 같음)
+    """
+    def __init__(self, population, uniform, mean, std, effective_samples, score_weights, total_weight):
+        self.population = population
+        self.uniform = uniform
+        self.mean = mean
+        self.std = std
+        self.effective_samples = effective_samples
+        self._score_weights = score_weights
+        self._total_weight = total_weight
+
+    def mean_interval(self):
+        """평균의 95% 신뢰 구간 반폭"""
+        return Z_95 * self.std / math.sqrt(self.effective_samples) if self.effective_samples else 0.0
+
+    def z_score(self, score):
+        """(z, 95% 신뢰 구간 반폭). 반폭은 평균/표준편차 추정 오차를 델타 방법으로 합친 값입니다."""
+        if not self.std or not self.effective_samples:
+            return 0.0, 0.0
+        z = (score - self.mean) / self.std
+        return z, Z_95 * math.sqrt((1 + z * z / 2) / self.effective_samples)
+
+    def same_score_count(self, score):
+        """
+        모집단에서 score와 같은 점수를 가진 시간표 수의 (추정값, 95% 신뢰 구간 (하한, 상한)). Wilson 구간을 사용합니다.
+        score는 실제 시간표의 점수이므로 추정값과 구간은 1 이상입니다.
+        """
+        n = self.effective_samples
+        if not n or not self._total_weight:
+            return 1, (1, 1)
+        p = self._score_weights.get(score, 0.0) / self._total_weight
+        denominator = 1 + Z_95 ** 2 / n
+        center = (p + Z_95 ** 2 / (2 * n)) / denominator
+        half = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denominator
+        low = max(1, (center - half) * self.population)
+        high = max(1, (center + half) * self.population)
+        return max(1, p * self.population), (low, high)
+
+    def to_dict(self):
+        return {
+            "population": self.population,
+            "uniform": self.uniform,
+            "mean": self.mean,
+            "std": self.std,
+            "effective_samples": self.effective_samples,
+        }
+
+
+def sample_population_stats(scheduler, samples=None, seed=None):
+    """
+    충돌 없는 시간표 samples개를 뽑아 PopulationStats를 반환합니다. 시간표가 없으면 None을 반환합니다.
+    모집단을 셀 수 있으면(FeasibleCounter) 정확히 균등하게 뽑고, 셀 수 없으면 무작위 경로로 뽑은 뒤
+    뽑힐 확률의 역수를 가중치로 사용하여 치우침을 보정합니다. (self-normalized importance sampling)
+    """
+    samples = samples if samples is not None else Config.POPULATION_SAMPLES
+    rng = random.Random(seed)
+    counter = FeasibleCounter(scheduler)
+    population = counter.count()
+    uniform = population is not None
+    if uniform and population == 0:
+        return None
+
+    sections = scheduler._section_table()
+    drawn = [] # (score, weight)
+    path_weights = []
+    for _ in range(samples):
+        if uniform:
+            choices, weight = counter.uniform_path(rng), 1
+        else:
+            choices, weight = counter.random_path(rng)
+            path_weights.append(weight)
+            if not weight:
+                continue
+        lectures = [sections[k][index][0] for k, index in enumerate(choices) if index != -1]
+        drawn.append((scheduler._calculate_loss(lectures), weight))
+    if not drawn:
+        return None
+    if not uniform:
+        population = sum(path_weights) / len(path_weights)
+
+    total_weight = sum(weight for _, weight in drawn)
+    mean = sum(score * weight for score, weight in drawn) / total_weight
+    variance = sum(weight * (score - mean) ** 2 for score, weight in drawn) / total_weight
+    effective_samples = total_weight ** 2 / sum(weight * weight for _, weight in drawn)
+    score_weights = defaultdict(float)
+    for score, weight in drawn:
+        score_weights[score] += weight
+    return PopulationStats(population, uniform, mean, math.sqrt(variance), effective_samples,
+                           dict(score_weights), total_weight)
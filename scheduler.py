@@ -5,6 +5,28 @@ import itertools
 import math
 import time # Import the time module
 from collections import defaultdict
+from config import Config
+from profiler import RunProfile
+from pareto import ParetoArchive, to_objective_vector
+from constraints import HardConstraints, credit_for_name
+from property_kernels import active_kernels, extra_loss, occupancy_array
+from intervals import MeetingTimeline, lecture_meetings, slot_minutes
+
+if hasattr(int, "bit_count"): # Python 3.10+
+    popcount = int.bit_count
+else:
+    def popcount(value):
+        """정수의 1인 비트 수를 셉니다."""
+        return bin(value).count("1")
+
+def slots_to_mask(slots):
+    """슬롯 인덱스 집합을 비트마스크로 변환합니다. (bit i = 슬롯 i)"""
+    mask = 0
+    for i in slots:
+        if i >= 0:
+            mask |= 1 << i
+    return mask
+
 def create_bar(value, min_val, max_val, bar_length=60, fill_char='■', empty_char='□'):
     """
     주어진 값에 대해 터미널용 가로 막대 그래프 문자열을 생성합니다.
@@ -48,17 +70,60 @@ def create_bar(value, min_val, max_val, bar_length=60, fill_char='■', empty_ch
 
     return "".join(bar_chars)
 
+def _lecture_inputs(lec):
+    """점수 계산에 쓰이는 강의 정보 (과목명, 선호도, 시간)"""
+    return (lec.name, lec.preference, tuple((slot['day'], slot['start_index'], slot['end_index']) + slot_minutes(slot)
+                                            for slot in lec.time_slots))
+
+
+class SolveState:
+    """
+    직전 run()의 탐색 상태. 선택한 분반이 조금 바뀌었을 때 Scheduler.run_incremental()이 재사용합니다.
+    - signature: 선택한 강의를 제외한 입력(선호 시간, 가중치, 제약 조건 등)의 키. 다르면 재사용하지 않습니다.
+    - clusters: 과목별 분반 ID 목록 (제약 조건을 반영한 뒤, 탐색 순서)
+    - lecture_inputs: 강의 ID -> 실행 당시의 (과목명, 선호도, 시간)
+    - results: 점수 순으로 정렬된 Timetable 목록 (각 결과의 강의는 clusters 순서)
+    """
+    def __init__(self, signature, clusters, lecture_inputs, results):
+        self.signature = signature
+        self.clusters = clusters
+        self.lecture_inputs = lecture_inputs
+        self.results = results
+
+
 class Scheduler:
     """
     사용자 입력을 기반으로 유효한 시간표를 생성하고 평가하는 클래스.
     """
-    def __init__(self, selected_lectures, good_slots, bad_slots, weights):
+    def __init__(self, selected_lectures, good_slots, bad_slots, weights, profile=None, profile_hook=None,
+                 constraints=None, mask_cache=None, timeline=None):
         self.selected_lectures = selected_lectures
         self.good_slots = good_slots
         self.bad_slots = bad_slots
         self.weights = weights
-        self.lecture_clusters = self._cluster_lectures()
+        self.debug_output = Config.SCHEDULER_DEBUG_OUTPUT
+        # profile: 단계별 타이머/카운터, profile_hook: 실행마다 JSON 레코드(dict)를 받는 콜백
+        self.profile = profile if profile is not None else RunProfile()
+        self.profile_hook = profile_hook
+        # constraints: 하드 제약 조건. 위반하는 분반/조합은 점수 계산 전에 탐색에서 제외됩니다.
+        self.constraints = constraints if constraints is not None else HardConstraints()
+        self.infeasible_reason = None # 제약 조건 때문에 시간표가 하나도 없을 때 그 이유
+        self.optional_flags = [] # 클러스터별로 빼도 되는 과목인지 여부 (lecture_clusters와 같은 순서)
+        self.result_groups = None # run_cached()가 결과와 함께 계산한 result_groups.ResultGroups (점유와 점수가 같은 결과 묶음)
         self.days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+        with self.profile.phase("clustering"):
+            self.lecture_clusters = self._apply_constraints(self._cluster_lectures())
+
+        # 요일별 30분 슬롯 비트마스크 (속성 계산에 사용)와 분 단위 강의 시간의 비트마스크 (충돌 검사에 사용)
+        self._day_positions = {day: i for i, day in enumerate(self.days)}
+        # 강의 ID -> (week_mask, day_masks). 같은 카탈로그를 쓰는 여러 Scheduler가 공유할 수 있습니다. (batch.py)
+        # mask_cache를 공유할 때는 week_mask를 만든 시간축(timeline)도 함께 넘겨야 합니다.
+        self._mask_cache = mask_cache if mask_cache is not None else {}
+        self._timeline = timeline if timeline is not None else MeetingTimeline(selected_lectures)
+        self.good_masks = [slots_to_mask(good_slots.get(day, ())) for day in self.days]
+        self.bad_masks = [slots_to_mask(bad_slots.get(day, ())) for day in self.days]
+        # 가중치가 0이 아닌 추가 속성 (property_kernels.PROPERTY_KERNELS)
+        self._active_kernels = active_kernels(weights)
 
     def _cluster_lectures(self):
         """선택된 강의를 과목명(name) 기준으로 클러스터링합니다."""
@@ -67,50 +132,145 @@ class Scheduler:
             clusters[lec.name].append(lec)
         return list(clusters.values())
 
+    def _apply_constraints(self, clusters):
+        """
+        하드 제약 조건을 탐색 공간에 미리 반영합니다.
+        필수/금지 분반, 공강 요일, 시작/종료 시간 제한은 분반 단위로 판정되므로 각 과목의 후보 분반에서 제거하고,
+        학점 범위는 가능한 최소/최대 학점으로 바로 검사합니다. (선택 과목이 있으면 탐색 중에도 검사)
+        만족하는 시간표가 있을 수 없으면 infeasible_reason을 기록하고 빈 리스트를 반환합니다.
+        """
+        if self.constraints.is_empty():
+            self.optional_flags = [False] * len(clusters)
+            return clusters
+        filtered = []
+        optional_flags = []
+        for cluster in clusters:
+            allowed = self.constraints.filter_cluster(cluster)
+            optional = self.constraints.is_optional(cluster)
+            self.profile.count("constraint_filtered", len(cluster) - len(allowed))
+            if not allowed:
+                if optional:
+                    continue # 선택 과목은 후보 분반이 없으면 빼고 탐색합니다.
+                return self._mark_infeasible(f"'{cluster[0].name}' 과목의 모든 분반이 제약 조건에 걸립니다.")
+            filtered.append(allowed)
+            optional_flags.append(optional)
+
+        credits = [credit_for_name(cluster[0].name) for cluster in filtered]
+        min_total = sum(c for c, optional in zip(credits, optional_flags) if not optional)
+        max_total = sum(credits)
+        c = self.constraints
+        if (c.max_credits is not None and min_total > c.max_credits) or \
+                (c.min_credits is not None and max_total < c.min_credits):
+            if min_total == max_total:
+                return self._mark_infeasible(f"총 학점 {min_total}학점이 학점 제약 범위를 벗어납니다.")
+            return self._mark_infeasible(f"가능한 총 학점 {min_total}~{max_total}학점이 학점 제약 범위를 벗어납니다.")
+        self.optional_flags = optional_flags
+        return filtered
+
+    def _mark_infeasible(self, reason):
+        """시간표가 있을 수 없는 이유를 기록하고 빈 클러스터 목록을 반환합니다."""
+        self.infeasible_reason = reason
+        self.profile.extra["infeasible_reason"] = reason
+        return []
+
+    def _lecture_masks(self, lec):
+        """
+        강의의 (week_mask, day_masks)를 반환합니다.
+        day_masks는 월~금 요일별 30분 슬롯 비트마스크(9:00 이전은 제외)이고, week_mask는 분 단위 강의 시간을
+        시간축(intervals.MeetingTimeline)의 비트로 나타낸 정수입니다. week_mask에는 월~금 이외의 요일과
+        9:00 이전 시간도 포함되고 분 단위로 정확하므로 충돌 검사는 week_mask로 합니다.
+        """
+        masks = self._mask_cache.get(lec.id)
+        if masks is not None:
+            return masks
+        day_masks = [0] * len(self.days)
+        for slot in lec.time_slots:
+            start = max(slot['start_index'], 0)
+            if slot['end_index'] < start:
+                continue
+            position = self._day_positions.get(slot['day'])
+            if position is not None:
+                day_masks[position] |= ((1 << (slot['end_index'] - start + 1)) - 1) << start
+        masks = (self._timeline.mask(lecture_meetings(lec)), tuple(day_masks))
+        self._mask_cache[lec.id] = masks
+        return masks
+
     def _check_collision(self, timetable_lectures):
         """주어진 강의 목록(시간표) 내에서 시간 충돌이 있는지 확인합니다."""
-        occupied_slots = defaultdict(set)
+        occupied = 0
         for lec in timetable_lectures:
-            for slot in lec.time_slots:
-                day = slot['day']
-                for i in range(slot['start_index'], slot['end_index'] + 1):
-                    if i in occupied_slots[day]:
-                        return True
-                    occupied_slots[day].add(i)
+            week_mask = self._lecture_masks(lec)[0]
+            if occupied & week_mask:
+                return True
+            occupied |= week_mask
         return False
 
-    def _calculate_loss(self, timetable_lectures):
-        """주어진 시간표의 상세 점수(Loss)를 계산합니다."""
-        
-        # 1. 시간표의 모든 수업 시간 슬롯을 요일별로 정리
-        timetable_slots = defaultdict(set)
+    def _day_masks_of(self, timetable_lectures):
+        """시간표의 요일별 점유 비트마스크"""
+        day_masks = [0] * len(self.days)
         for lec in timetable_lectures:
-            for slot in lec.time_slots:
-                day = slot['day']
-                for i in range(slot['start_index'], slot['end_index'] + 1):
-                    timetable_slots[day].add(i)
-
-        # 2. 각 속성(property)별 점수 계산
-        
-        # [Fit Good range] 계산
-        fit_good_prop = self._calculate_fit_property(timetable_slots, self.good_slots, self.weights[0]['rss'])
-        
-        # [Fit Bad range] 계산
-        fit_bad_prop = self._calculate_fit_property(timetable_slots, self.bad_slots, self.weights[1]['rss'])
-
-        # [Break time] 계산
-        break_time_prop = self._calculate_break_time_property(timetable_slots, self.weights[2]['rss'])
-
-        # [Prefer lectures] 계산
+            for d, mask in enumerate(self._lecture_masks(lec)[1]):
+                day_masks[d] |= mask
+        return day_masks
+
+    def _calculate_properties(self, timetable_lectures):
+        """시간표의 속성 (fit_good, fit_bad, break_time, prefer)을 계산합니다."""
+        day_masks = self._day_masks_of(timetable_lectures)
         prefer_prop = sum(lec.preference for lec in timetable_lectures)
+        return self._properties_from_masks(day_masks, prefer_prop)
+
+    def _extra_loss(self, day_masks):
+        """가중치가 0이 아닌 추가 속성(property_kernels)의 Loss. 추가 속성이 없으면 0입니다."""
+        if not self._active_kernels:
+            return 0
+        return float(extra_loss(occupancy_array([day_masks]), self.weights)[0])
+
+    def _properties_from_masks(self, day_masks, prefer_prop):
+        """요일별 점유 비트마스크로부터 속성 값을 계산합니다."""
+        # [Fit Good range] / [Fit Bad range]: 요일별로 겹치는 슬롯 수
+        good_daily = [popcount(m & g) for m, g in zip(day_masks, self.good_masks)]
+        bad_daily = [popcount(m & b) for m, b in zip(day_masks, self.bad_masks)]
+        # [Break time]: 첫 수업 ~ 마지막 수업 사이에서 비어 있는 슬롯 수
+        break_daily = [m.bit_length() - (m & -m).bit_length() + 1 - popcount(m) if m else 0 for m in day_masks]
+        return (
+            self._aggregate(good_daily, self.weights[0]['rss']),
+            self._aggregate(bad_daily, self.weights[1]['rss']),
+            self._aggregate(break_daily, self.weights[2]['rss']),
+            prefer_prop,
+        )
+
+    @staticmethod
+    def _aggregate(daily_scores, rss_enabled):
+        """요일별 점수를 합산합니다. RSS가 켜져 있으면 제곱합의 제곱근을 사용합니다."""
+        if rss_enabled:
+            return math.sqrt(sum(score ** 2 for score in daily_scores))
+        return sum(daily_scores)
 
-        # 3. 최종 Loss 계산 (가중치 적용)
+    def _loss_from_properties(self, properties):
+        """속성 값에 가중치를 적용하여 최종 Loss를 계산합니다."""
+        fit_good_prop, fit_bad_prop, break_time_prop, prefer_prop = properties
         loss = 0
         loss += fit_good_prop * self.weights[0]['weight'] * -1 # Good range는 점수가 높을수록 좋으므로 -1 곱함
         loss += fit_bad_prop * self.weights[1]['weight']
-        loss += break_time_prop * self.weights[2]['weight'] 
+        loss += break_time_prop * self.weights[2]['weight']
         loss += prefer_prop * self.weights[3]['weight'] * -1 # 선호도도 높을수록 좋으므로 -1 곱함
-        
+        return loss
+
+    def _calculate_loss(self, timetable_lectures, properties=None):
+        """주어진 시간표의 상세 점수(Loss)를 계산합니다."""
+        if properties is None:
+            properties = self._calculate_properties(timetable_lectures)
+        loss = self._loss_from_properties(properties)
+        if self._active_kernels:
+            loss = float(loss + self._extra_loss(self._day_masks_of(timetable_lectures)))
+
+        if self.debug_output:
+            self._print_loss_breakdown(*properties, loss)
+
+        return loss
+
+    def _print_loss_breakdown(self, fit_good_prop, fit_bad_prop, break_time_prop, prefer_prop, loss):
+        """디버깅용: 속성별 점수를 터미널 막대 그래프로 출력합니다."""
         print([fit_good_prop,fit_bad_prop,break_time_prop,prefer_prop])
         min_limit = -50
         max_limit = 150
@@ -127,97 +287,455 @@ class Scheduler:
         print(f"Total loss: {loss}")
 
         print("-" * 30)
-                
-        return loss
 
-    def _calculate_fit_property(self, timetable_slots, user_slots, rss_enabled):
-        """Fit Good/Bad range 속성 값을 계산합니다."""
-        daily_scores = []
-        
-        # print(f"\n=== Fit Property 계산 디버깅 ===")
-        
-        for day in self.days:
-            # 겹치는 시간의 수
-            timetable_set = timetable_slots[day]
-            user_set = user_slots[day]
-            
-            overlap_count = len(timetable_set.intersection(user_set))
-            daily_scores.append(overlap_count)
-            
-            # 디버깅 출력
-            # print(f"{day}:")
-            # print(f"  시간표 슬롯: {sorted(list(timetable_set)) if timetable_set else '없음'}")
-            # print(f"  사용자 슬롯: {sorted(list(user_set)) if user_set else '없음'}")
-            # print(f"  교집합: {sorted(list(timetable_set.intersection(user_set))) if timetable_set.intersection(user_set) else '없음'}")
-            # print(f"  교집합 개수: {overlap_count}")
-        
-        # print(f"일별 점수: {daily_scores}")
-        
-        if rss_enabled:
-            result = math.sqrt(sum(score ** 2 for score in daily_scores))
+    def run(self):
+        """시간표 생성 및 평가의 전체 프로세스를 실행합니다."""
+        start_time = time.time() # Start timing
+        profile = self.profile
+        profile.start_capture()
+
+        try:
+            if not self.lecture_clusters:
+                return [], 0 # Return empty list and 0 elapsed time
+
+            if any(self.optional_flags):
+                # 선택 과목이 있으면 과목 조합까지 함께 탐색해야 하므로 깊이 우선 탐색을 사용합니다.
+                found, scores = self._run_dfs_ranked()
+                valid_timetables = [lectures for lectures, _ in found]
+                properties = [props for _, props in found]
+            else:
+                valid_timetables, properties, scores = self._enumerate_product(self.lecture_clusters)
+
+            from model import Timetable
+            with profile.phase("result"):
+                results = [Timetable(lectures, score, props)
+                           for lectures, score, props in zip(valid_timetables, scores, properties)]
+
+            # Loss가 낮은 순서대로 (더 좋은 시간표 순서대로) 정렬
+            with profile.phase("sorting"):
+                results.sort(key=lambda x: x.score)
+
+            end_time = time.time() # End timing
+            elapsed_time = end_time - start_time
+
+            return results, elapsed_time # Return results and elapsed time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
+
+    def _enumerate_product(self, clusters):
+        """
+        clusters의 모든 분반 조합 중 충돌 없는 것을 골라 (시간표 목록, 속성 목록, 점수 목록)을 반환합니다.
+        clusters가 전체 과목이고 수업 요일이 겹치지 않는 과목 묶음으로 나뉘면 묶음별로 찾은 부분 조합을 곱해 만듭니다. (components.py)
+        """
+        from components import factorizable_components, factorized_choices
+        profile = self.profile
+        components = factorizable_components(self) if clusters is self.lecture_clusters else None
+        if components is not None:
+            profile.extra["components"] = [len(courses) for courses in components]
+            with profile.phase("enumeration"):
+                choices = factorized_choices(self, components, profile).tolist()
+            valid_timetables = [[cluster[i] for cluster, i in zip(clusters, row)] for row in choices]
         else:
-            result = sum(daily_scores)
-        
-        # print(f"최종 결과 (RSS={rss_enabled}): {result}")
-        # print("=" * 35)
-        
-        return result
-
-    def _calculate_break_time_property(self, timetable_slots, rss_enabled):
-        """Break time 속성 값을 계산합니다."""
-        daily_scores = []
-        for day in self.days:
-            if not timetable_slots[day]:
-                daily_scores.append(0)
-                continue
+            with profile.phase("enumeration"):
+                all_combinations = list(itertools.product(*clusters))
+            profile.count("combinations_visited", len(all_combinations))
 
-            sorted_slots = sorted(list(timetable_slots[day]))
-            
-            # 수업 블록 찾기
-            if not sorted_slots:
-                daily_scores.append(0)
-                continue
+            with profile.phase("collision"):
+                valid_timetables = [list(combo) for combo in all_combinations if not self._check_collision(combo)]
+            profile.count("collisions", len(all_combinations) - len(valid_timetables))
+
+        with profile.phase("scoring"):
+            properties = [self._calculate_properties(lectures) for lectures in valid_timetables]
+            scores = [self._calculate_loss(lectures, props) for lectures, props in zip(valid_timetables, properties)]
+        return valid_timetables, properties, scores
 
-            blocks = []
-            current_block = [sorted_slots[0]]
-            for i in range(1, len(sorted_slots)):
-                if sorted_slots[i] == sorted_slots[i-1] + 1:
-                    current_block.append(sorted_slots[i])
+    def feasible_key(self):
+        """이 Scheduler의 충돌 없는 조합 목록(feasible_set.FeasibleSet)을 찾을 키"""
+        from feasible_set import feasible_set_key
+        return feasible_set_key(self)
+
+    def run_cached(self, feasible_cache, parts=None):
+        """
+        run()과 같은 결과를 반환합니다. 충돌 없는 조합 목록은 feasible_cache(feasible_set.FeasibleSetCache)에
+        있으면 재사용하고 없으면 만들어 저장하며, 점수는 조합 목록 전체에 대해 벡터 연산으로 계산합니다.
+        선호/비선호 시간, 선호도, 가중치만 바뀐 경우에는 조합을 다시 만들지 않습니다.
+        parts는 이미 찾은 묶음별 부분 조합(components.component_choices)으로, 조합 목록을 만들 때 그대로 사용합니다.
+        """
+        from feasible_set import build_feasible_set
+        start_time = time.time()
+        profile = self.profile
+        profile.start_capture()
+
+        try:
+            if not self.lecture_clusters:
+                return [], 0
+            key = self.feasible_key()
+            feasible = feasible_cache.get(key)
+            if feasible is not None:
+                profile.count("cache_hits")
+            else:
+                with profile.phase("enumeration"):
+                    feasible = build_feasible_set(self, parts)
+                feasible_cache.put(feasible)
+            profile.extra["feasible_set_size"] = len(feasible)
+            with profile.phase("scoring"):
+                results = feasible.rank(self)
+            if self.result_groups is not None:
+                profile.extra["result_groups"] = len(self.result_groups)
+            return results, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
+
+    def run_factorized(self, components, parts=None):
+        """
+        수업 요일이 겹치지 않는 과목 묶음(components.factorizable_components)별로 충돌 없는 부분 조합을 찾고 (parts가 있으면 그대로 사용),
+        곱집합을 나열하지 않고 점수 순으로 필요한 만큼만 만드는 components.FactorizedResults를 반환합니다.
+        순서와 점수는 run()과 같으며, Loss가 묶음별 기여의 합일 때(components.additive_loss)만 사용할 수 있습니다.
+        """
+        from components import FactorizedResults, component_tables
+        start_time = time.time()
+        profile = self.profile
+        profile.start_capture()
+
+        try:
+            profile.extra["engine"] = "factorized"
+            profile.extra["components"] = [len(courses) for courses in components]
+            with profile.phase("enumeration"):
+                tables = component_tables(self, components, profile, parts)
+            with profile.phase("result"):
+                results = FactorizedResults(self, tables)
+            profile.extra["component_results"] = [len(table) for table in tables]
+            profile.extra["feasible_set_size"] = len(results)
+            return results, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
+
+    def solve_state(self, signature, results):
+        """run() 결과를 다음 실행에서 run_incremental()로 재사용할 수 있도록 SolveState로 묶습니다."""
+        return SolveState(signature, [[lec.id for lec in cluster] for cluster in self.lecture_clusters],
+                          {lec.id: _lecture_inputs(lec) for lec in self.selected_lectures}, results)
+
+    def run_incremental(self, state):
+        """
+        직전 실행(state)과 비교하여 한 과목의 분반만 추가/제거되었으면 이전 결과를 재사용해 run()과 같은 결과를 만듭니다.
+        - 분반 추가: 새 분반을 고정하고 나머지 과목의 조합만 검사하여 이전 결과에 더합니다.
+        - 분반 제거: 이전 결과에서 그 분반을 포함한 시간표만 걸러냅니다.
+        정렬은 (점수, 분반 조합 순서)로 하므로 전체 조합을 안정 정렬한 run()의 순서와 같습니다.
+        재사용할 수 없으면(과목 추가/제거, 여러 과목 변경, 선택 과목, 강의 정보 변경) None을 반환합니다.
+        """
+        if not self.lecture_clusters or any(self.optional_flags):
+            return None
+        clusters = [[lec.id for lec in cluster] for cluster in self.lecture_clusters]
+        if len(clusters) != len(state.clusters):
+            return None
+        changed = [k for k, (ids, old_ids) in enumerate(zip(clusters, state.clusters)) if ids != old_ids]
+        if len(changed) > 1:
+            return None
+        for lec in self.selected_lectures:
+            if lec.id in state.lecture_inputs and state.lecture_inputs[lec.id] != _lecture_inputs(lec):
+                return None # 선호도나 시간이 바뀌면 이전 점수를 쓸 수 없습니다.
+
+        start_time = time.time()
+        profile = self.profile
+        profile.start_capture()
+        try:
+            profile.extra["incremental"] = True
+            results = list(state.results)
+            if changed:
+                k = changed[0]
+                new_ids, old_ids = set(clusters[k]), set(state.clusters[k])
+                if state.lecture_inputs.get(state.clusters[k][0], (None,))[0] != self.lecture_clusters[k][0].name:
+                    return None # 같은 위치에 다른 과목이 온 경우
+                if new_ids > old_ids:
+                    added = [lec for lec in self.lecture_clusters[k] if lec.id not in old_ids]
+                    fixed = self.lecture_clusters[:k] + [added] + self.lecture_clusters[k + 1:]
+                    valid_timetables, properties, scores = self._enumerate_product(fixed)
+                    from model import Timetable
+                    with profile.phase("result"):
+                        results.extend(Timetable(lectures, score, props)
+                                       for lectures, score, props in zip(valid_timetables, scores, properties))
+                elif new_ids < old_ids:
+                    removed = old_ids - new_ids
+                    with profile.phase("result"):
+                        results = [tt for tt in results if tt.lectures[k].id not in removed]
+                    profile.count("incremental_removed", len(state.results) - len(results))
                 else:
-                    blocks.append(current_block)
-                    current_block = [sorted_slots[i]]
-            blocks.append(current_block)
-
-            # 공강 시간 계산
-            break_time = 0
-            if len(blocks) > 1:
-                for i in range(len(blocks) - 1):
-                    break_time += blocks[i+1][0] - blocks[i][-1] - 1
-            
-            daily_scores.append(break_time)
+                    return None
 
-        if rss_enabled:
-            return math.sqrt(sum(score ** 2 for score in daily_scores))
-        else:
-            return sum(daily_scores)
+            # 분반 조합 순서: 각 과목 안에서 분반의 위치를 차례로 나열한 튜플 (itertools.product의 순서)
+            positions = {lec.id: i for cluster in self.lecture_clusters for i, lec in enumerate(cluster)}
+            with profile.phase("sorting"):
+                results.sort(key=lambda tt: (tt.score, [positions[lec.id] for lec in tt.lectures]))
+            return results, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
 
-    def run(self):
-        """시간표 생성 및 평가의 전체 프로세스를 실행합니다."""
-        start_time = time.time() # Start timing
+    def run_to_store(self, store, run_id):
+        """
+        run()과 같은 결과를 메모리에 모으지 않고 result_store.ResultStore에 바로 기록합니다.
+        분반 조합을 하나씩 만들어 검사하고 결과를 일정 개수씩 묶어 저장하므로, 결과 수와 관계없이
+        메모리 사용량이 일정합니다. 정렬은 저장소의 점수 인덱스가 대신합니다. (결과 수, 소요 시간)을 반환합니다.
+        """
+        start_time = time.time()
+        profile = self.profile
+        profile.start_capture()
 
+        try:
+            writer = store.writer(run_id)
+            if self.lecture_clusters:
+                with profile.phase("enumeration"):
+                    if any(self.optional_flags):
+                        def on_leaf(lectures, day_masks, prefer_prop):
+                            properties = self._properties_from_masks(day_masks, prefer_prop)
+                            writer.add(lectures, self._calculate_loss(lectures, properties), properties)
+
+                        self._dfs(on_leaf)
+                    else:
+                        visited = 0
+                        for combo in itertools.product(*self.lecture_clusters):
+                            visited += 1
+                            if self._check_collision(combo):
+                                continue
+                            properties = self._calculate_properties(combo)
+                            writer.add(combo, self._calculate_loss(combo, properties), properties)
+                        profile.count("combinations_visited", visited)
+                        profile.count("collisions", visited - writer.count)
+            with profile.phase("result"):
+                count = writer.finish(time.time() - start_time)
+            return count, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
+
+    def search_space_size(self):
+        """분반 조합의 전체 개수(선택 과목은 빼는 경우 포함)를 반환합니다. 충돌 여부는 고려하지 않습니다."""
         if not self.lecture_clusters:
-            return [], 0 # Return empty list and 0 elapsed time
-
-        all_combinations = list(itertools.product(*self.lecture_clusters))
-        valid_timetables = [list(combo) for combo in all_combinations if not self._check_collision(combo)]
-
-        from model import Timetable
-        results = [Timetable(lectures, self._calculate_loss(lectures)) for lectures in valid_timetables]
-        
-        # Loss가 낮은 순서대로 (더 좋은 시간표 순서대로) 정렬
-        results.sort(key=lambda x: x.score)
-        
-        end_time = time.time() # End timing
-        elapsed_time = end_time - start_time
-        
-        return results, elapsed_time # Return results and elapsed time
\ No newline at end of file
+            return 0
+        return math.prod(len(cluster) + (1 if optional else 0)
+                         for cluster, optional in zip(self.lecture_clusters, self.optional_flags))
+
+    def run_local_search(self, time_budget=None, max_iterations=None, result_count=None, seed=None):
+        """
+        전체 조합 대신 근사 탐색(local_search.LocalSearch)으로 좋은 시간표들을 찾습니다.
+        탐색 공간이 너무 커서 run()이 끝나지 않을 때 사용하며, 반환 형식은 run()과 같습니다.
+        """
+        from local_search import LocalSearch
+        return LocalSearch(self, time_budget, max_iterations, result_count, seed).run()
+
+    def _section_table(self):
+        """클러스터별로 (강의, week_mask, day_masks) 목록을 만듭니다."""
+        return [[(lec,) + self._lecture_masks(lec) for lec in cluster] for cluster in self.lecture_clusters]
+
+    def _suffix_bounds(self, sections):
+        """
+        k번째 클러스터부터 끝까지 남은 과목들로 더할 수 있는 값의 한계를 미리 계산합니다.
+        - good_max[k][d]: 요일 d에서 추가로 겹칠 수 있는 선호 시간 슬롯 수의 최댓값
+        - prefer_max[k]: 추가로 얻을 수 있는 선호도 합의 최댓값
+        - cover[k][d]: 남은 과목들이 요일 d에서 차지할 수 있는 슬롯 전체 (OR)
+        """
+        n_days = len(self.days)
+        good_max = [[0] * n_days for _ in range(len(sections) + 1)]
+        prefer_max = [0] * (len(sections) + 1)
+        cover = [[0] * n_days for _ in range(len(sections) + 1)]
+        for k in range(len(sections) - 1, -1, -1):
+            # 선택 과목은 빼는 경우(선호도 0)도 고려합니다.
+            skip = [0] if self.optional_flags[k] else []
+            prefer_max[k] = prefer_max[k + 1] + max([lec.preference for lec, _, _ in sections[k]] + skip)
+            for d in range(n_days):
+                good_max[k][d] = good_max[k + 1][d] + max(popcount(day_masks[d] & self.good_masks[d])
+                                                          for _, _, day_masks in sections[k])
+                cover[k][d] = cover[k + 1][d]
+                for _, _, day_masks in sections[k]:
+                    cover[k][d] |= day_masks[d]
+        return good_max, prefer_max, cover
+
+    def _optimistic_vector(self, day_masks, prefer_prop, good_max, prefer_max, cover):
+        """
+        부분 시간표를 어떻게 완성하더라도 이보다 좋아질 수 없는 목표 벡터(낙관적 경계)를 계산합니다.
+        - fit_good, prefer: 현재 값 + 남은 과목의 최댓값 (상한)
+        - fit_bad: 과목을 더하면 줄어들 수 없으므로 현재 값 (하한)
+        - break_time: 현재 첫/마지막 수업 사이의 빈 슬롯 중 남은 과목으로도 채울 수 없는 슬롯 수 (하한)
+        """
+        good_daily = [popcount(m & g) + extra for m, g, extra in zip(day_masks, self.good_masks, good_max)]
+        bad_daily = [popcount(m & b) for m, b in zip(day_masks, self.bad_masks)]
+        break_daily = []
+        for m, coverable in zip(day_masks, cover):
+            if not m:
+                break_daily.append(0)
+                continue
+            span = ((1 << m.bit_length()) - 1) & ~((m & -m) - 1)
+            break_daily.append(popcount(span & ~m & ~coverable))
+        return to_objective_vector((
+            self._aggregate(good_daily, self.weights[0]['rss']),
+            self._aggregate(bad_daily, self.weights[1]['rss']),
+            self._aggregate(break_daily, self.weights[2]['rss']),
+            prefer_prop + prefer_max,
+        ))
+
+    def _dfs(self, on_leaf, prune=None, prefix=()):
+        """
+        과목을 하나씩 배치하는 깊이 우선 탐색으로 충돌 없는 모든 시간표를 찾아 on_leaf(lectures, day_masks, prefer)를 호출합니다.
+
+        - 충돌하는 분반은 배치하는 순간 가지째 제외합니다.
+        - 선택 과목(optional_flags)은 "빼기"도 하나의 선택지로 탐색하며, 남은 과목으로 채울 수 있는
+          최소/최대 학점이 학점 범위를 벗어나면 가지를 잘라냅니다.
+        - (k, 점유 비트마스크, 학점) 상태에서 완성 가능한 시간표가 없다고 밝혀지면 기억해 두고,
+          다른 경로로 같은 상태에 오면 다시 탐색하지 않습니다. (cache_hits)
+        - prune(k, day_masks, prefer)가 True를 반환하면 그 가지를 탐색하지 않습니다. (pruned_branches)
+        - prefix(앞쪽 과목부터 고른 분반 위치, 선택 과목을 뺀 경우 len(cluster))가 있으면 그 과목들은 고정하고
+          나머지 과목만 탐색합니다. 탐색 공간을 나누어 여러 작업자가 탐색할 때 사용합니다. (distributed.py)
+        """
+        sections = self._section_table()
+        optional = self.optional_flags
+        credits = [credit_for_name(cluster[0].name) for cluster in self.lecture_clusters]
+        n_clusters = len(sections)
+        n_days = len(self.days)
+        min_credits = self.constraints.min_credits
+        max_credits = self.constraints.max_credits
+
+        # 남은 과목으로 더할 수 있는 최소(필수 과목만) / 최대(전부) 학점
+        min_rest = [0] * (n_clusters + 1)
+        max_rest = [0] * (n_clusters + 1)
+        for k in range(n_clusters - 1, -1, -1):
+            min_rest[k] = min_rest[k + 1] + (0 if optional[k] else credits[k])
+            max_rest[k] = max_rest[k + 1] + credits[k]
+
+        dead_states = set()
+        counters = {"combinations_visited": 0, "collisions": 0, "pruned_branches": 0, "cache_hits": 0}
+
+        def search(k, occupied, day_masks, prefer_prop, credit_sum, chosen):
+            """반환값: True = 시간표를 찾음, False = 완성 불가능, None = prune으로 일부만 탐색함"""
+            if (max_credits is not None and credit_sum + min_rest[k] > max_credits) or \
+                    (min_credits is not None and credit_sum + max_rest[k] < min_credits):
+                counters["pruned_branches"] += 1
+                return False
+            if k == n_clusters:
+                if not chosen:
+                    return False
+                counters["combinations_visited"] += 1
+                on_leaf(chosen, day_masks, prefer_prop)
+                return True
+            if prune is not None and prune(k, day_masks, prefer_prop):
+                counters["pruned_branches"] += 1
+                return None
+            state = (k, occupied, credit_sum)
+            if state in dead_states:
+                counters["cache_hits"] += 1
+                return False
+
+            found = False
+            exhaustive = True
+            for lec, week_mask, lec_day_masks in sections[k]:
+                if occupied & week_mask:
+                    counters["collisions"] += 1
+                    continue
+                chosen.append(lec)
+                outcome = search(k + 1, occupied | week_mask,
+                                 [day_masks[d] | lec_day_masks[d] for d in range(n_days)],
+                                 prefer_prop + lec.preference, credit_sum + credits[k], chosen)
+                chosen.pop()
+                found = found or bool(outcome)
+                exhaustive = exhaustive and outcome is not None
+            if optional[k]:
+                outcome = search(k + 1, occupied, day_masks, prefer_prop, credit_sum, chosen)
+                found = found or bool(outcome)
+                exhaustive = exhaustive and outcome is not None
+
+            if found:
+                return True
+            if exhaustive:
+                dead_states.add(state)
+                return False
+            return None
+
+        occupied, day_masks, prefer_prop, credit_sum, chosen = 0, [0] * n_days, 0, 0, []
+        for k, i in enumerate(prefix):
+            if i == len(sections[k]):
+                continue # 뺀 선택 과목
+            lec, week_mask, lec_day_masks = sections[k][i]
+            if occupied & week_mask:
+                counters["collisions"] += 1
+                break
+            occupied |= week_mask
+            day_masks = [day_masks[d] | lec_day_masks[d] for d in range(n_days)]
+            prefer_prop += lec.preference
+            credit_sum += credits[k]
+            chosen.append(lec)
+        else:
+            search(len(prefix), occupied, day_masks, prefer_prop, credit_sum, chosen)
+        for name, value in counters.items():
+            self.profile.count(name, value)
+
+    def _run_dfs_ranked(self):
+        """선택 과목이 있을 때의 run(): 과목 조합과 분반을 함께 깊이 우선 탐색합니다."""
+        found = []
+
+        def on_leaf(lectures, day_masks, prefer_prop):
+            found.append((list(lectures), self._properties_from_masks(day_masks, prefer_prop)))
+
+        with self.profile.phase("enumeration"):
+            self._dfs(on_leaf)
+        with self.profile.phase("scoring"):
+            scores = [self._calculate_loss(lectures, properties) for lectures, properties in found]
+        return found, scores
+
+    def run_pareto(self):
+        """
+        (fit_good, fit_bad, break_time, prefer) 기준으로 서로 지배되지 않는 시간표(Pareto front)만 찾습니다.
+        가중치를 추측할 필요 없이, 어떤 가중치로도 더 나은 대안이 없는 시간표들을 보여줍니다.
+
+        깊이 우선 탐색(_dfs)으로 과목을 하나씩 배치하면서, 남은 과목으로 얻을 수 있는 최선의 값(낙관적 경계)조차
+        이미 찾은 시간표에 지배되면 그 가지 전체를 탐색하지 않습니다. 결과는 가중치 Loss 순으로 정렬됩니다.
+        """
+        start_time = time.time()
+        profile = self.profile
+        profile.start_capture()
+
+        try:
+            if not self.lecture_clusters:
+                return [], 0
+
+            good_max, prefer_max, cover = self._suffix_bounds(self._section_table())
+            archive = ParetoArchive()
+
+            def on_leaf(lectures, day_masks, prefer_prop):
+                properties = self._properties_from_masks(day_masks, prefer_prop)
+                archive.add(to_objective_vector(properties), (list(lectures), properties))
+
+            def prune(k, day_masks, prefer_prop):
+                if not archive.front:
+                    return False
+                bound = self._optimistic_vector(day_masks, prefer_prop, good_max[k], prefer_max[k], cover[k])
+                return archive.is_dominated(bound)
+
+            with profile.phase("enumeration"):
+                self._dfs(on_leaf, prune)
+
+            from model import Timetable
+            with profile.phase("result"):
+                results = [Timetable(lectures, self._calculate_loss(lectures, properties), properties)
+                           for lectures, properties in archive.items()]
+
+            with profile.phase("sorting"):
+                results.sort(key=lambda x: x.score)
+
+            return results, time.time() - start_time
+        finally:
+            profile.stop_capture()
+            profile.elapsed_time = time.time() - start_time
+            if self.profile_hook is not None:
+                self.profile_hook(profile.to_dict())
@@ -0,0 +1,239 @@
+# sensitivity.py
+# 가중치 민감도 분석: P5의 가중치를 바꾸면 어떤 시간표가 1등(또는 k등 안)이 될 수 있는지,
+# 지금 1등인 시간표가 가중치를 얼마나 바꿔도 1등으로 남는지를 계산합니다.
+#
+# Loss는 가중치에 대해 선형입니다: loss = -good*w0 + bad*w1 + break*w2 - prefer*w3.
+# 따라서 시간표마다 계수 벡터 c = (-good, bad, break, -prefer)가 있고, 어떤 가중치에서의 1등은
+# 계수 벡터들의 하한 포락선(lower envelope) min_i c_i·w 를 이루는 시간표입니다.
+#
+# - 속성 값이 같은 시간표는 항상 같은 점수이므로 하나의 그룹으로 묶습니다.
+# - 가중치가 0인 항목은 순위에 영향을 주지 않으므로, 0이 아닌 가중치의 조합(support)마다
+#   그 항목들만으로 본 벡터에서 k-skyband(자신을 지배하는 시간표가 k개 미만인 벡터)만 남깁니다.
+#   support 안의 가중치가 모두 양수이면 지배하는 시간표는 항상 점수가 더 낮으므로, 나머지는 k등 안에 들 수 없습니다.
+# - 남은 후보에 대해서만 P5 슬라이더로 고를 수 있는 모든 가중치 조합의 점수를 행렬 연산으로 계산합니다.
+# - 현재 1등의 안정성은 가중치 하나만 연속적으로 바꿀 때 1등으로 남는 구간(1차원 하한 포락선)으로 계산합니다.
+# - 추가 속성(property_kernels)의 가중치는 고정된 것으로 보고, 그 Loss는 시간표마다 더해지는 상수(가중치 1인 열)로 다룹니다.
+import itertools
+
+import numpy as np
+
+from config import Config
+
+
+BASE_WEIGHTS = 4 # 분석하는 가중치 수 (Config.PAGE5_ATTRIBUTES)
+SCORE_DECIMALS = 9 # 이 자릿수까지 같은 점수는 같은 순위로 봅니다.
+
+
+def _coefficients(properties):
+    """(fit_good, fit_bad, break_time, prefer) -> 가중치에 곱해지는 계수 (-good, bad, break, -prefer)"""
+    fit_good, fit_bad, break_time, prefer = properties
+    return (-fit_good, fit_bad, break_time, -prefer)
+
+
+def _base_loss(properties, weights):
+    """Scheduler._loss_from_properties와 같은 기본 속성의 Loss"""
+    fit_good, fit_bad, break_time, prefer = properties
+    loss = 0
+    loss += fit_good * weights[0]['weight'] * -1
+    loss += fit_bad * weights[1]['weight']
+    loss += break_time * weights[2]['weight']
+    loss += prefer * weights[3]['weight'] * -1
+    return loss
+
+
+def _loss_rows(vectors, weights):
+    """Scheduler._loss_from_properties와 같은 순서로 (가중치 수, 벡터 수) 점수 행렬을 계산합니다."""
+    loss = 0
+    for d in range(vectors.shape[1]):
+        loss = loss + weights[:, d:d + 1] * vectors[:, d][None, :]
+    return loss
+
+
+def _k_skyband(vectors, counts, k):
+    """자신을 (엄격히) 지배하는 시간표가 k개 미만인 벡터의 인덱스"""
+    band = []
+    for i, vector in enumerate(vectors):
+        dominators = np.all(vectors <= vector, axis=1) & np.any(vectors < vector, axis=1)
+        if counts[dominators].sum() < k:
+            band.append(i)
+    return np.array(band, dtype=np.int64)
+
+
+class CandidateGroup:
+    """
+    가중치에 따라 1등(또는 k등 안)이 될 수 있는, 속성 값이 같은 시간표 묶음.
+    - positions: 결과 목록에서의 위치 (오름차순)
+    - top1_share / topk_share: 슬라이더 조합 중 1등 / k등 안에 드는 조합의 비율
+    - example_weights: 1등이 되는 조합 중 현재 가중치에서 가장 가까운(슬라이더 이동 합이 가장 작은) 조합
+    """
+    def __init__(self, properties, positions):
+        self.properties = properties
+        self.positions = positions
+        self.top1_settings = 0
+        self.topk_settings = 0
+        self.top1_share = 0.0
+        self.topk_share = 0.0
+        self.example_weights = None
+        self._example_distance = None
+
+    def _record_top1(self, weights, distance):
+        self.top1_settings += 1
+        if self._example_distance is None or distance < self._example_distance:
+            self._example_distance = distance
+            self.example_weights = weights
+
+
+class SensitivityReport:
+    """
+    가중치 민감도 분석 결과.
+    - settings: 분석한 슬라이더 조합 수 (모든 가중치가 0인 경우 제외)
+    - top1: 어떤 조합에서 1등이 되는 CandidateGroup 목록 (1등이 되는 조합이 많은 순)
+    - topk: 어떤 조합에서 k등 안에 드는 CandidateGroup 목록
+    - winner: 현재 1등 시간표의 그룹, winner_share: 현재 1등이 1등으로 남는 조합의 비율
+    - winner_ranges: 가중치 하나만 바꿀 때 현재 1등이 1등으로 남는 (최소, 최대) 구간 (항목 순서)
+    - winner_margin: 현재 가중치에서 2등 그룹과의 점수 차 (속성이 같은 시간표 제외)
+    - nearest_change: 1등이 바뀌는 가장 가까운 슬라이더 조합 (없으면 None)
+    """
+    def __init__(self, k, settings, top1, topk, winner, winner_share, winner_ranges, winner_margin, nearest_change):
+        self.k = k
+        self.settings = settings
+        self.top1 = top1
+        self.topk = topk
+        self.winner = winner
+        self.winner_share = winner_share
+        self.winner_ranges = winner_ranges
+        self.winner_margin = winner_margin
+        self.nearest_change = nearest_change
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "settings": self.settings,
+            "top1": [{"positions": g.positions[:10], "size": len(g.positions), "share": g.top1_share,
+                      "example_weights": g.example_weights} for g in self.top1],
+            "topk_groups": len(self.topk),
+            "topk_timetables": sum(len(g.positions) for g in self.topk),
+            "winner_share": self.winner_share,
+            "winner_ranges": self.winner_ranges,
+            "winner_margin": self.winner_margin,
+            "nearest_change": self.nearest_change,
+        }
+
+    def summary_text(self, attribute_names):
+        """P6에 표시할 요약 문자열을 생성합니다."""
+        lines = [f"슬라이더 조합 {self.settings:,}개 중 1등이 될 수 있는 시간표 {len(self.top1)}종류, "
+                 f"{self.k}등 안에 들 수 있는 시간표 {sum(len(g.positions) for g in self.topk):,}개"]
+        lines.append(f"현재 1등 (#{self.winner.positions[0] + 1}): 전체 조합의 {self.winner_share:.0%}에서 1등, "
+                     f"2등과의 점수 차 {self.winner_margin:.2f}")
+        for name, (low, high) in zip(attribute_names, self.winner_ranges):
+            lines.append(f"  {name}: {low:.1f} ~ {high:.1f} 사이에서는 1등 유지")
+        if self.nearest_change is not None:
+            lines.append(f"가장 가까운 1등이 바뀌는 가중치: {list(self.nearest_change)}")
+        lines.append("1등이 될 수 있는 시간표:")
+        for group in self.top1[:Config.SENSITIVITY_MAX_LISTED]:
+            lines.append(f"  #{group.positions[0] + 1} ({len(group.positions)}개): 조합의 {group.top1_share:.0%}, "
+                         f"예: 가중치 {list(group.example_weights)}")
+        if len(self.top1) > Config.SENSITIVITY_MAX_LISTED:
+            lines.append(f"  ... 외 {len(self.top1) - Config.SENSITIVITY_MAX_LISTED}종류")
+        return "\n".join(lines)
+
+
+def _winner_ranges(vectors, winner, weights, max_weight):
+    """
+    가중치 하나(d)만 [0, max_weight]에서 연속적으로 바꿀 때 winner 그룹이 1등으로 남는 구간.
+    다른 그룹 j에 대해 loss_j(t) - loss_winner(t) = a_j + b_j * t >= 0 인 t의 교집합입니다.
+    """
+    ranges = []
+    diff = vectors - vectors[winner]
+    for d in range(BASE_WEIGHTS):
+        others = np.delete(np.arange(vectors.shape[1]), d)
+        a = diff[:, others] @ weights[others]
+        b = diff[:, d]
+        low, high = 0.0, float(max_weight)
+        positive = b > 0
+        negative = b < 0
+        if positive.any():
+            low = max(low, float(np.max(-a[positive] / b[positive])))
+        if negative.any():
+            high = min(high, float(np.min(-a[negative] / b[negative])))
+        if np.any((b == 0) & (a < 0)) or low > high:
+            low = high = float(weights[d])
+        ranges.append((low, high))
+    return ranges
+
+
+def analyze_weight_sensitivity(timetables, weights, k=None, max_weight=None):
+    """
+    점수 순으로 정렬된 시간표 목록(timetables)과 현재 가중치(Model.loss_weights)로 SensitivityReport를 만듭니다.
+    RSS 여부는 속성 값에 이미 반영되어 있으므로 고정된 것으로 봅니다. 결과가 없으면 None을 반환합니다.
+    """
+    k = k if k is not None else Config.SENSITIVITY_TOP_K
+    max_weight = max_weight if max_weight is not None else Config.SENSITIVITY_MAX_WEIGHT
+    if not len(timetables):
+        return None
+
+    # 그룹 키: 기본 속성 + 추가 속성의 Loss (추가 속성이 없으면 0)
+    groups = {}
+    for position, tt in enumerate(timetables):
+        # 뺄셈의 반올림 오차로 같은 점수가 갈리지 않도록 반올림합니다.
+        offset = round(tt.score - _base_loss(tt.properties, weights), SCORE_DECIMALS)
+        groups.setdefault(tuple(tt.properties) + (offset,), []).append(position)
+    keys = list(groups)
+    vectors = np.array([_coefficients(key[:BASE_WEIGHTS]) + (key[BASE_WEIGHTS],) for key in keys], dtype=float)
+    counts = np.array([len(groups[key]) for key in keys], dtype=np.int64)
+    candidates = [CandidateGroup(key[:BASE_WEIGHTS], groups[key]) for key in keys]
+    current = np.array([w['weight'] for w in weights[:BASE_WEIGHTS]] + [1], dtype=float)
+    winner = next(g for g, key in enumerate(keys) if 0 in groups[key])
+    n_dims = BASE_WEIGHTS
+
+    settings = 0
+    winner_top1 = 0
+    nearest_change, nearest_distance = None, None
+    for size in range(1, n_dims + 1):
+        for support in itertools.combinations(range(n_dims), size):
+            support = list(support) + [n_dims] # 추가 속성 Loss 열은 항상 가중치 1
+            # support 항목만으로 본 벡터가 같은 그룹은 이 support에서 항상 같은 점수입니다.
+            projected, inverse = np.unique(vectors[:, support], axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            projected_counts = np.bincount(inverse, weights=counts).astype(np.int64)
+            band = _k_skyband(projected, projected_counts, k)
+            members = [np.flatnonzero(inverse == b) for b in band]
+
+            grid = np.array([values + (1,) for values in itertools.product(range(1, max_weight + 1), repeat=size)],
+                            dtype=float)
+            full = np.zeros((len(grid), n_dims + 1))
+            full[:, support] = grid
+            scores = np.round(_loss_rows(projected[band], grid), SCORE_DECIMALS)
+            band_counts = projected_counts[band]
+            distances = np.abs(full - current)[:, :n_dims].sum(axis=1)
+            for row, setting, distance in zip(scores, full, distances):
+                order = np.argsort(row, kind='stable')
+                sorted_scores = row[order]
+                ahead = np.concatenate(([0], np.cumsum(band_counts[order])))
+                # 자신보다 점수가 엄격히 낮은 시간표 수 (같은 점수는 같은 순위)
+                better = ahead[np.searchsorted(sorted_scores, row, side='left')]
+                setting = tuple(int(w) for w in setting[:n_dims])
+                winner_here = False
+                for b in np.flatnonzero(better < k):
+                    for g in members[b]:
+                        candidates[g].topk_settings += 1
+                        if better[b] == 0:
+                            candidates[g]._record_top1(setting, distance)
+                            winner_here = winner_here or g == winner
+                settings += 1
+                if winner_here:
+                    winner_top1 += 1
+                elif nearest_distance is None or distance < nearest_distance:
+                    nearest_change, nearest_distance = setting, distance
+
+    for group in candidates:
+        group.top1_share = group.top1_settings / settings
+        group.topk_share = group.topk_settings / settings
+    top1 = sorted((g for g in candidates if g.top1_settings), key=lambda g: (-g.top1_settings, g.positions[0]))
+    topk = sorted((g for g in candidates if g.topk_settings), key=lambda g: g.positions[0])
+
+    scores_now = vectors @ current
+    others = np.delete(scores_now, winner)
+    margin = float(others.min() - scores_now[winner]) if len(others) else 0.0
+    return SensitivityReport(k, settings, top1, topk, candidates[winner], winner_top1 / settings,
+                             _winner_ranges(vectors, winner, current, max_weight), margin, nearest_change)
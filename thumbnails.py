@@ -0,0 +1,122 @@
+# thumbnails.py
+# P6 "한눈에 보기": 상위 결과들의 작은 시간표 그림(썸네일)을 화면 밖에서 그려 둡니다.
+#
+# 썸네일은 View가 계산한 강의 블록(열, 시작 행, 끝 행, 색)만으로 PIL 이미지에 그리므로 Tk 없이 백그라운드 스레드에서
+# 만들 수 있습니다. Tk의 PhotoImage는 메인 스레드에서만 만들 수 있으므로, 작업 스레드는 그린 PIL 이미지를 완료 큐에 넣고
+# View가 after()로 큐를 비우면서 PhotoImage로 바꿔 붙입니다.
+# 그린 이미지는 시간표의 강의 ID 목록과 크기를 키로 최근에 사용한 순서대로 보관하므로, 창을 다시 열거나
+# 같은 시간표가 다음 실행 결과에 다시 나와도 다시 그리지 않습니다.
+import queue
+import threading
+from collections import OrderedDict
+
+from config import Config
+
+GRID_ROWS = 19 # 헤더 1행 + 9:00~18:00 30분 슬롯 18행 (View.display_timetable과 같은 격자)
+GRID_COLUMNS = 6 # 시간 열 1개 + 월~금
+
+
+def thumbnail_key(lectures, size):
+    """썸네일 캐시 키. 강의 순서에 따라 색이 정해지므로 순서를 그대로 둡니다."""
+    return tuple(lec.id for lec in lectures), tuple(size)
+
+
+def render_thumbnail(blocks, size):
+    """
+    강의 블록 [(열, 시작 행, 끝 행, 색), ...]을 size (너비, 높이) 크기의 PIL 이미지로 그립니다.
+    행/열 번호는 View._create_lecture_spans의 start_row/end_row/col과 같습니다.
+    """
+    from PIL import Image, ImageDraw
+    width, height = size
+    cell_width = width / GRID_COLUMNS
+    cell_height = height / GRID_ROWS
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width - 1, cell_height], fill="lightgray")
+    draw.rectangle([0, cell_height, cell_width, height - 1], fill="lightblue")
+    # 정시마다 가로선 (30분 선은 썸네일에서는 생략)
+    for row in range(1, GRID_ROWS, 2):
+        draw.line([0, row * cell_height, width, row * cell_height], fill="#c0c0c0")
+    for col in range(1, GRID_COLUMNS):
+        draw.line([col * cell_width, 0, col * cell_width, height], fill="#c0c0c0")
+    for col, start_row, end_row, color in blocks:
+        draw.rectangle([col * cell_width + 1, start_row * cell_height + 1,
+                        (col + 1) * cell_width - 1, (end_row + 1) * cell_height - 1], fill=color, outline="black")
+    draw.rectangle([0, 0, width - 1, height - 1], outline="black")
+    return image
+
+
+class ThumbnailRenderer:
+    """
+    썸네일을 그리는 백그라운드 작업 스레드와 그린 이미지(PIL)의 캐시.
+    - request(key, blocks, size): 캐시에 있으면 바로, 없으면 작업 스레드가 그린 뒤 완료 큐에 (key, image)를 넣습니다.
+    - completed(): (메인 스레드) 완료 큐에 쌓인 (key, image) 목록을 꺼냅니다.
+    - cancel(): 아직 그리지 않은 요청을 버립니다. (창을 닫거나 새 결과로 바꿀 때)
+    """
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else Config.THUMBNAIL_CACHE_SIZE
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._worker = None
+        self.rendered = 0
+        self.cache_hits = 0
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def _put(self, key, image):
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+
+    def request(self, key, blocks, size):
+        image = self.get(key)
+        if image is not None:
+            self.cache_hits += 1
+            self._done.put((key, image))
+            return
+        self._jobs.put((key, blocks, size))
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def cancel(self):
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                return
+
+    def completed(self):
+        items = []
+        while True:
+            try:
+                items.append(self._done.get_nowait())
+            except queue.Empty:
+                return items
+
+    def pending(self):
+        """아직 그리지 않은 요청 수 (대략적인 값)"""
+        return self._jobs.qsize()
+
+    def _run(self):
+        while True:
+            key, blocks, size = self._jobs.get()
+            image = self.get(key) # 같은 시간표가 여러 번 요청된 경우
+            if image is None:
+                try:
+                    image = render_thumbnail(blocks, size)
+                except Exception as e:
+                    print(f"[ERROR] 썸네일을 그리지 못했습니다: {e}")
+                    continue
+                self._put(key, image)
+                self.rendered += 1
+            self._done.put((key, image))
@@ -0,0 +1,194 @@
+# ui_monitor.py
+# Tk 이벤트 루프의 응답성을 계측합니다. (Config.UI_MONITOR_ENABLED = True일 때만 설치)
+#
+# Tk는 버튼 command, bind 핸들러, after() 콜백을 모두 Misc._register로 Tcl 명령에 등록하므로,
+# 설치하면 등록 함수를 감싸 모든 콜백의 실행 시간을 핸들러 이름별로 기록합니다.
+# 주의: tkinter.Misc._register는 공개 API가 아닌 내부 메서드입니다. Python 버전에 따라 이름이나 인자가 바뀔 수 있으므로
+# 없으면 설치하지 않고 경고만 출력하며, 모니터를 켠 경우에만 바꿔 끼우고 제거할 때 원래 함수로 되돌립니다.
+# - 콜백 소요 시간: 그동안 화면이 멈춘 시간입니다. Config.UI_MONITOR_FRAME_MS를 넘으면 멈춤(stall)으로 셉니다.
+# - after() 지연: 예약한 시각보다 얼마나 늦게 실행되었는지. 주기적인 탐침(probe) 콜백으로도 측정합니다.
+# 핸들러마다 최근 Config.UI_MONITOR_WINDOW개의 기록으로 히스토그램을 만들고, 종료할 때 콘솔과
+# (설정되어 있으면) PROFILE_LOG_FILE에 요약을 남깁니다. 콜백 안에서 다른 콜백이 실행되면(update 등) 바깥 콜백 시간에 포함됩니다.
+import atexit
+import time
+from collections import deque
+
+from config import Config
+
+PROBE_NAME = "(event loop lag)"
+
+
+def handler_name(func):
+    """콜백의 이름: 메서드는 "클래스.메서드", 중첩 함수는 "클래스.메서드.함수" """
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    return name.replace('.<locals>', '')
+
+
+class StallHistogram:
+    """핸들러 하나의 소요 시간 기록 (최근 window개는 히스토그램용, 횟수/합계/최댓값은 전체 기간)"""
+    def __init__(self, window=None):
+        self.samples = deque(maxlen=window or Config.UI_MONITOR_WINDOW)
+        self.count = 0
+        self.stalls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.stalls += ms > Config.UI_MONITOR_FRAME_MS
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def buckets(self):
+        """최근 기록의 구간별 개수 {"<16": n, "16-33": n, ..., ">=2000": n} (Config.UI_MONITOR_BUCKETS_MS 기준)"""
+        edges = Config.UI_MONITOR_BUCKETS_MS
+        labels = [f"<{edges[0]}"] + [f"{lo}-{hi}" for lo, hi in zip(edges, edges[1:])] + [f">={edges[-1]}"]
+        counts = [0] * len(labels)
+        for ms in self.samples:
+            counts[sum(ms >= edge for edge in edges)] += 1
+        return dict(zip(labels, counts))
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        return {"count": self.count, "stalls": self.stalls, "total_ms": round(self.total_ms, 3),
+                "max_ms": round(self.max_ms, 3), "p95_ms": round(self.percentile(0.95), 3), "histogram": self.buckets()}
+
+
+class UIMonitor:
+    """
+    Tk 콜백 소요 시간과 after() 지연을 핸들러 이름별 StallHistogram으로 기록합니다.
+    - durations: 콜백 이름 -> 소요 시간 기록
+    - lags: after() 콜백 이름 -> 예약 시각 대비 지연 기록 (탐침은 PROBE_NAME)
+    """
+    def __init__(self):
+        self.durations = {}
+        self.lags = {}
+        self.start = time.perf_counter()
+        self._root = None
+        self._originals = None
+        self._dumped = False
+
+    def record(self, table, name, ms):
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = StallHistogram()
+        histogram.add(ms)
+
+    def wrap(self, func, name=None):
+        """func를 실행 시간을 기록하는 함수로 감쌉니다."""
+        name = name or handler_name(func)
+
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.record(self.durations, name, (time.perf_counter() - start) * 1000)
+        return timed
+
+    @classmethod
+    def install(cls, root):
+        """
+        tkinter의 콜백 등록을 감싸는 모니터를 설치하고 탐침을 시작합니다. 이후에 만든 위젯의 콜백부터 기록됩니다.
+        Config.UI_MONITOR_ENABLED가 False이거나 tkinter.Misc._register가 없으면 설치하지 않고 None을 반환합니다.
+        """
+        import tkinter
+        if not Config.UI_MONITOR_ENABLED:
+            return None
+        if not callable(getattr(tkinter.Misc, '_register', None)):
+            print("[WARNING] 이 Python의 tkinter에는 Misc._register가 없어 UI 모니터를 설치하지 않습니다.")
+            return None
+        monitor = cls()
+        monitor._root = root
+        original_register = tkinter.Misc._register
+        original_after = tkinter.Misc.after
+        monitor._originals = (tkinter.Misc, original_register, original_after)
+
+        def register(widget, func, subst=None, needcleanup=1):
+            # after()의 callit은 이미 아래 after에서 감쌌습니다.
+            if getattr(func, '__qualname__', '') != 'Misc.after.<locals>.callit':
+                func = monitor.wrap(func)
+            return original_register(widget, func, subst, needcleanup)
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return original_after(widget, ms)
+            name = handler_name(func)
+            due = time.perf_counter() + (ms / 1000 if isinstance(ms, (int, float)) else 0)
+
+            def scheduled(*call_args):
+                monitor.record(monitor.lags, name, max(0.0, (time.perf_counter() - due) * 1000))
+                return func(*call_args)
+            return original_after(widget, ms, monitor.wrap(scheduled, name), *args)
+
+        tkinter.Misc._register = register
+        try:
+            tkinter.Misc.after = after
+            atexit.register(monitor.dump)
+            monitor._probe(original_after)
+        except Exception:
+            monitor.uninstall()
+            raise
+        return monitor
+
+    def uninstall(self):
+        """감싼 Misc._register와 Misc.after를 원래 함수로 되돌립니다. 한쪽을 되돌리다 실패해도 _register는 항상 되돌립니다."""
+        if self._originals is None:
+            return
+        misc, original_register, original_after = self._originals
+        self._originals = None
+        try:
+            misc.after = original_after
+        finally:
+            misc._register = original_register
+
+    def _probe(self, original_after):
+        """Config.UI_MONITOR_PROBE_MS마다 예약한 콜백이 얼마나 늦게 실행되는지 기록합니다. (이벤트 루프 지연)"""
+        interval = Config.UI_MONITOR_PROBE_MS
+        due = time.perf_counter() + interval / 1000
+
+        def tick():
+            if self._originals is None:
+                return # 모니터를 제거함
+            self.record(self.lags, PROBE_NAME, max(0.0, (time.perf_counter() - due) * 1000))
+            self._probe(original_after)
+        try:
+            original_after(self._root, interval, tick)
+        except Exception:
+            pass # 창이 이미 닫힘
+
+    def to_dict(self):
+        return {"timestamp": time.time(), "session_seconds": round(time.perf_counter() - self.start, 3),
+                "ui_durations": {name: h.to_dict() for name, h in self.durations.items()},
+                "ui_lags": {name: h.to_dict() for name, h in self.lags.items()}}
+
+    def summary_text(self, top=None):
+        """멈춘 시간 합계가 큰 핸들러부터 top개와 이벤트 루프 지연 요약"""
+        top = top or Config.UI_MONITOR_REPORT_TOP
+        lines = [f"{'handler':<48} {'count':>6} {'stalls':>6} {'max ms':>8} {'p95 ms':>8} {'total ms':>9}  histogram"]
+        ranked = sorted(self.durations.items(), key=lambda item: -item[1].total_ms)[:top]
+        probe = self.lags.get(PROBE_NAME)
+        rows = ranked + ([(PROBE_NAME, probe)] if probe is not None else [])
+        for name, h in rows:
+            histogram = " ".join(f"{label}:{n}" for label, n in h.buckets().items() if n)
+            lines.append(f"{name[-48:]:<48} {h.count:>6} {h.stalls:>6} {h.max_ms:>8.1f} {h.percentile(0.95):>8.1f} "
+                         f"{h.total_ms:>9.1f}  {histogram}")
+        return "\n".join(lines)
+
+    def dump(self):
+        """요약을 콘솔과 (설정되어 있으면) 프로파일 로그 파일에 한 번 기록하고 모니터를 제거합니다."""
+        if self._dumped:
+            return
+        self._dumped = True
+        self.uninstall()
+        print(f"[UI] Tk 콜백 소요 시간 (멈춤 기준 {Config.UI_MONITOR_FRAME_MS}ms)\n{self.summary_text()}")
+        if Config.PROFILE_LOG_FILE:
+            from profiler import jsonl_hook
+            jsonl_hook(Config.PROFILE_LOG_FILE)(self.to_dict())
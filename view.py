@@ -3,13 +3,17 @@
 import sys
 import io
 import os # resource_path 함수를 위해 os 모듈을 임포트합니다.
+import importlib.util
 
 import tkinter as tk
 from tkinter import ttk
 import random
 import colorsys
 from config import Config
-from PIL import Image, ImageTk # Pillow 라이브러리 임포트
+from thumbnails import ThumbnailRenderer, thumbnail_key
+# Pillow(PIL)는 이미지를 표시하는 페이지를 만들 때 가져옵니다. (시작 시간 단축)
+# 설치 여부만 가져오지 않고 미리 확인해 둡니다.
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
 
 def resource_path(relative_path):
     """
@@ -34,6 +38,11 @@ class View:
         self.slider_labels = {} # Added for page 5 slider value display
         self.p1_tree_scroll_pos = 0.0 # Added for page 1 scroll position
         self.image_references = [] # 이미지 객체 참조를 저장할 리스트 (가비지 컬렉션 방지)
+        self.thumbnail_renderer = None # P6 한눈에 보기의 썸네일 작업 스레드와 캐시 (창을 처음 열 때 생성)
+        self.p6_overview_window = None
+        self.p6_overview_cells = {} # 썸네일 키 -> 그 썸네일을 붙일 Canvas 이미지 항목 목록
+        self.p6_thumbnail_photos = {} # 썸네일 키 -> PhotoImage (창에 보이는 썸네일만 유지)
+        self.p6_overview_current = 0 # P6에 표시 중인 항목 번호 (한눈에 보기에서 강조)
         self._setup_window()
         self._create_main_container()
 
@@ -62,7 +71,7 @@ class View:
         frame = self.frames.get(page_num)
         if frame:
             # Save scroll position if leaving page 1
-            if self.controller.model.current_page == 1 and page_num != 1:
+            if self.controller is not None and self.controller.model.current_page == 1 and page_num != 1:
                 current_page_frame = self.frames.get(1)
                 if current_page_frame:
                     # Find the Treeview widget in the current page 1 frame
@@ -105,8 +114,21 @@ class View:
         next_button_frame.pack(side="bottom", fill="x", padx=20, pady=20)
         next_button_frame.grid_columnconfigure(0, weight=1) # Allow column to expand
 
-        next_button = ttk.Button(next_button_frame, text="Next", command=self.controller.next_page)
-        next_button.grid(row=0, column=0, sticky="se") # Stick to south-east (bottom-right)
+        # 강의 목록을 불러오는 동안(controller가 아직 없을 때)은 버튼을 비활성화합니다. (on_catalog_loaded에서 활성화)
+        self.p0_next_button = ttk.Button(next_button_frame, text="Next")
+        if self.controller is not None:
+            self.p0_next_button.config(command=self.controller.next_page)
+        else:
+            self.p0_next_button.config(text="Loading...", state='disabled')
+        self.p0_next_button.grid(row=0, column=0, sticky="se") # Stick to south-east (bottom-right)
+
+    def on_catalog_loaded(self, controller):
+        """백그라운드에서 강의 목록을 다 불러오면 controller를 연결하고 첫 페이지의 Next 버튼을 활성화합니다."""
+        self.controller = controller
+        self.p0_next_button.config(text="Next", state='normal', command=controller.next_page)
+
+    def on_catalog_load_failed(self, error):
+        self.p0_next_button.config(text="강의 목록을 불러오지 못했습니다")
 
     def _create_disclaimer_page(self, parent_frame):
         # Disclaimer Frame
@@ -196,6 +218,22 @@ class View:
             current_values[3] = new_preference
             tree.item(lecture_id, values=tuple(current_values))
 
+    def update_p2_lecture_rule_display(self, tree, lecture_id, rule):
+        """P2 Treeview에서 특정 강의의 필수/제외 규칙 표시를 업데이트합니다."""
+        if tree.exists(lecture_id):
+            current_values = list(tree.item(lecture_id, 'values'))
+            current_values[6] = self.config.LECTURE_RULE_LABELS[rule]
+            tree.item(lecture_id, values=tuple(current_values))
+
+    def update_p2_course_optional_display(self, tree, name, is_optional):
+        """P2 Treeview에서 같은 과목명의 모든 분반에 선택 과목 표시를 업데이트합니다."""
+        label = self.config.OPTIONAL_COURSE_LABEL if is_optional else ""
+        for item_id in tree.get_children():
+            current_values = list(tree.item(item_id, 'values'))
+            if current_values[0] == name:
+                current_values[7] = label
+                tree.item(item_id, values=tuple(current_values))
+
     def _create_page2(self, parent_frame):
         content_frame = self._create_page_template(parent_frame, 2)
         headers = self.config.PAGE2_HEADERS
@@ -205,6 +243,8 @@ class View:
             tree.heading(col, text=col)
             if col in ["+", "-"]:
                 tree.column(col, width=40, anchor='center', stretch=tk.NO)
+            elif col in ["Rule", "Optional"]:
+                tree.column(col, width=60, anchor='center', stretch=tk.NO)
             else:
                 tree.column(col, width=120, anchor='center')
         
@@ -212,7 +252,9 @@ class View:
 
         lectures = self.controller.get_selected_lectures()
         for lec in lectures:
-            values = (lec.name, lec.prof, lec.section, lec.preference, '+', '-')
+            rule_label = self.config.LECTURE_RULE_LABELS[self.controller.get_lecture_rule(lec.id)]
+            optional_label = self.config.OPTIONAL_COURSE_LABEL if self.controller.is_course_optional(lec.name) else ""
+            values = (lec.name, lec.prof, lec.section, lec.preference, '+', '-', rule_label, optional_label)
             tree.insert("", "end", iid=lec.id, values=values)
         
         tree.bind("<Button-1>", lambda e: self.controller.on_p2_preference_click(e, tree))
@@ -303,6 +345,7 @@ class View:
             image_path = resource_path("net.gif")
             # =================================================================
             
+            from PIL import Image, ImageTk # Pillow 라이브러리 임포트
             pil_image = Image.open(image_path)
 
             def resize_image(event=None):
@@ -345,7 +388,7 @@ class View:
         sliders_frame = ttk.Frame(content_frame, relief="solid", borderwidth=1)
         sliders_frame.pack(fill='both', expand=True)
 
-        for i, attr in enumerate(self.config.PAGE5_ATTRIBUTES):
+        for i, attr in enumerate(self.controller.get_weight_attributes()):
             attr_frame = ttk.Frame(sliders_frame, padding=(10, 5))
             attr_frame.pack(fill='x', pady=5, padx=20)
             
@@ -364,6 +407,69 @@ class View:
             ttk.Checkbutton(attr_frame, text="RSS", variable=rss_var, 
                             command=lambda index=i: self.controller.on_rss_toggle(index)).pack(side='right', padx=10)
 
+        mode_frame = ttk.Frame(sliders_frame, padding=(10, 5))
+        mode_frame.pack(fill='x', pady=5, padx=20)
+        pareto_var = tk.BooleanVar(value=self.controller.is_pareto_mode())
+        ttk.Checkbutton(mode_frame, text="Pareto front (가중치와 무관하게 서로 지배되지 않는 시간표만 보기)",
+                        variable=pareto_var, command=self.controller.on_pareto_toggle).pack(side='left', padx=10)
+
+        self._create_constraints_frame(sliders_frame)
+        self._create_estimate_frame(sliders_frame)
+
+    def _create_constraints_frame(self, parent_frame):
+        """P5 하단: 하드 제약 조건(공강 요일, 시간 제한, 학점 범위) 입력 영역을 생성합니다."""
+        constraints = self.controller.get_hard_constraints()
+        frame = ttk.Frame(parent_frame, padding=(10, 5))
+        frame.pack(fill='x', pady=5, padx=20)
+
+        ttk.Label(frame, text="공강 요일").pack(side='left', padx=(10, 5))
+        for day in self.config.TIMETABLE_HEADERS[1:]:
+            day_var = tk.BooleanVar(value=day in constraints.free_days)
+            ttk.Checkbutton(frame, text=day, variable=day_var,
+                            command=lambda d=day: self.controller.on_free_day_toggle(d)).pack(side='left')
+
+        time_options = ["-"] + [f"{9 + i // 2:02d}:{'00' if i % 2 == 0 else '30'}" for i in range(31)]
+
+        def slot_to_text(slot, offset):
+            return "-" if slot is None else time_options[slot + offset + 1]
+
+        ttk.Label(frame, text="시작").pack(side='left', padx=(15, 5))
+        earliest = ttk.Combobox(frame, values=time_options, width=6, state='readonly')
+        earliest.set(slot_to_text(constraints.earliest_slot, 0))
+        earliest.bind("<<ComboboxSelected>>",
+                      lambda e: self.controller.on_time_limit_change('earliest_slot', earliest.get()))
+        earliest.pack(side='left')
+
+        ttk.Label(frame, text="종료").pack(side='left', padx=(10, 5))
+        latest = ttk.Combobox(frame, values=time_options, width=6, state='readonly')
+        latest.set(slot_to_text(constraints.latest_slot, 1))
+        latest.bind("<<ComboboxSelected>>",
+                    lambda e: self.controller.on_time_limit_change('latest_slot', latest.get()))
+        latest.pack(side='left')
+
+        ttk.Label(frame, text="학점").pack(side='left', padx=(15, 5))
+        for name in ('min_credits', 'max_credits'):
+            credit_var = tk.StringVar(value="" if getattr(constraints, name) is None else str(getattr(constraints, name)))
+            spinbox = ttk.Spinbox(frame, from_=0, to=40, width=4, textvariable=credit_var,
+                                  command=lambda n=name, v=credit_var: self.controller.on_credit_limit_change(n, v.get()))
+            spinbox.bind("<KeyRelease>", lambda e, n=name, v=credit_var: self.controller.on_credit_limit_change(n, v.get()))
+            spinbox.pack(side='left', padx=2)
+            if name == 'min_credits':
+                ttk.Label(frame, text="~").pack(side='left')
+
+    def _create_estimate_frame(self, parent_frame):
+        """P5 하단: 생성 전에 탐색 공간 크기와 예상 시간을 확인하는 영역을 생성합니다."""
+        frame = ttk.Frame(parent_frame, padding=(10, 5))
+        frame.pack(fill='x', pady=5, padx=20)
+        estimate_label = ttk.Label(frame, text="", font=self.config.FONT_DESCRIPTION, justify='left')
+
+        def show_estimate():
+            text, warn = self.controller.on_estimate_request()
+            estimate_label.config(text=text, foreground="red" if warn else "")
+
+        ttk.Button(frame, text="예상 시간 계산", command=show_estimate).pack(side='left', padx=10)
+        estimate_label.pack(side='left', padx=10)
+
     def _create_page6(self, parent_frame):
         content_frame = self._create_page_template(parent_frame, 6)
         self.feedback_label = ttk.Label(content_frame, text="시간표를 계산 중입니다...", font=self.config.FONT_DESCRIPTION)
@@ -378,6 +484,13 @@ class View:
         self.p6_zscore_label.pack(pady=5)
         self.p6_same_score_count_label = ttk.Label(content_frame, text="Same Score Candidates = N/A")
         self.p6_same_score_count_label.pack(pady=5)
+        self._create_alternatives_frame(content_frame)
+        self.p6_properties_label = ttk.Label(content_frame, text="", font=self.config.FONT_DESCRIPTION)
+        self.p6_properties_label.pack(pady=5)
+        self.p6_profile_label = ttk.Label(content_frame, text="", font=self.config.FONT_DESCRIPTION, justify='center')
+        self.p6_profile_label.pack(pady=5)
+        self._create_result_filter_frame(content_frame)
+        self._create_sensitivity_frame(content_frame)
         lr_frame = ttk.Frame(content_frame)
         lr_frame.pack(pady=5)
         ttk.Button(lr_frame, text="< Prev Result", command=self.controller.show_prev_timetable).pack(side='left', padx=10)
@@ -387,6 +500,207 @@ class View:
         lr_fast_frame.pack(pady=5)
         ttk.Button(lr_fast_frame, text="< Prev Result +10", command=self.controller.show_prev_timetable_fast).pack(side='left', padx=10)
         ttk.Button(lr_fast_frame, text="Next Result +10 >", command=self.controller.show_next_timetable_fast).pack(side='right', padx=10)
+        ttk.Button(content_frame, text=f"한눈에 보기 (상위 {self.config.THUMBNAIL_COUNT}개)",
+                   command=self.open_overview).pack(pady=5)
+
+    def open_overview(self):
+        """P6: 상위 결과들의 썸네일을 모은 창을 엽니다. 이미 열려 있으면 앞으로 가져와 다시 채웁니다."""
+        if not PIL_AVAILABLE: # 썸네일을 PhotoImage로 붙일 때 필요합니다.
+            print("[ERROR] 한눈에 보기에는 Pillow가 필요합니다. (pip install pillow)")
+            return
+        if self.p6_overview_window is not None:
+            self.p6_overview_window.lift()
+            self.update_overview()
+            return
+        if self.thumbnail_renderer is None:
+            self.thumbnail_renderer = ThumbnailRenderer()
+
+        window = tk.Toplevel(self.root)
+        window.title("한눈에 보기")
+        canvas = tk.Canvas(window, bg='white', highlightthickness=0)
+        scrollbar = ttk.Scrollbar(window, orient='vertical', command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        canvas.pack(side='left', expand=True, fill='both')
+        canvas.bind('<MouseWheel>', lambda e: canvas.yview_scroll(int(-e.delta / 120), 'units'))
+
+        def on_closing():
+            self.thumbnail_renderer.cancel()
+            self.p6_overview_window = None
+            self.p6_overview_cells = {}
+            self.p6_thumbnail_photos = {}
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", on_closing)
+        self.p6_overview_window = window
+        self.p6_overview_canvas = canvas
+        self.update_overview()
+        self._poll_thumbnails()
+
+    def update_overview(self):
+        """한눈에 보기 창이 열려 있으면 현재 결과(필터, 그룹 반영)의 상위 항목으로 다시 채웁니다."""
+        if self.p6_overview_window is None:
+            return
+        canvas = self.p6_overview_canvas
+        canvas.delete("all")
+        self.thumbnail_renderer.cancel()
+        self.p6_overview_cells = {}
+        size = self.config.THUMBNAIL_SIZE
+        width, height = size
+        columns = self.config.THUMBNAIL_COLUMNS
+        pad, caption = 10, 18
+
+        items = self.controller.get_overview_items(self.config.THUMBNAIL_COUNT)
+        if not items:
+            canvas.create_text(pad, pad, text="표시할 결과가 없습니다.", anchor='nw', font=self.config.FONT_DESCRIPTION)
+        for number, (index, timetable) in enumerate(items):
+            x = pad + (number % columns) * (width + pad)
+            y = pad + (number // columns) * (height + caption + pad)
+            tag = f"item{index}"
+            key = thumbnail_key(timetable.lectures, size)
+            image_id = canvas.create_image(x, y, anchor='nw', image=self.p6_thumbnail_photos.get(key, ''), tags=(tag,))
+            canvas.create_rectangle(x, y, x + width, y + height, outline='#c0c0c0', tags=(tag,))
+            canvas.create_text(x + width / 2, y + height + caption / 2, text=f"{index + 1}. Score {timetable.score:.2f}",
+                               font=self.config.FONT_DESCRIPTION, tags=(tag,))
+            canvas.tag_bind(tag, '<Button-1>', lambda e, i=index: self.controller.on_overview_select(i))
+            if key not in self.p6_overview_cells and key not in self.p6_thumbnail_photos:
+                # 그리는 것은 작업 스레드에서 하고, 강의 블록 계산(가벼움)만 여기서 합니다.
+                self.thumbnail_renderer.request(key, self._thumbnail_blocks(timetable.lectures), size)
+            self.p6_overview_cells.setdefault(key, []).append(image_id)
+
+        # 창에 없는 시간표의 PhotoImage는 놓아 줍니다. (그린 이미지는 ThumbnailRenderer 캐시에 남습니다)
+        self.p6_thumbnail_photos = {key: photo for key, photo in self.p6_thumbnail_photos.items()
+                                    if key in self.p6_overview_cells}
+        rows = (len(items) + columns - 1) // columns
+        total_width = pad + columns * (width + pad)
+        canvas.configure(width=total_width, height=min(3, max(rows, 1)) * (height + caption + pad) + pad,
+                         scrollregion=(0, 0, total_width, pad + rows * (height + caption + pad)))
+        self._highlight_overview_item()
+
+    def _thumbnail_blocks(self, lectures):
+        """썸네일에 그릴 강의 블록 [(열, 시작 행, 끝 행, 색), ...] (P6 시간표와 같은 span과 색)"""
+        colors = self._generate_distinct_colors(len(lectures))
+        return [(span['col'], span['start_row'], span['end_row'], colors[lec_idx])
+                for lec_idx, spans in self._create_lecture_spans(lectures).items() for span in spans]
+
+    def _poll_thumbnails(self):
+        """작업 스레드가 그린 썸네일을 PhotoImage로 바꿔 붙입니다. 창이 열려 있는 동안 반복합니다."""
+        if self.p6_overview_window is None:
+            return
+        from PIL import ImageTk # open_overview에서 PIL_AVAILABLE을 확인했습니다.
+        for key, image in self.thumbnail_renderer.completed():
+            cells = self.p6_overview_cells.get(key)
+            if not cells:
+                continue # 창을 다시 채우기 전의 요청
+            photo = self.p6_thumbnail_photos.get(key)
+            if photo is None:
+                photo = self.p6_thumbnail_photos[key] = ImageTk.PhotoImage(image)
+            for image_id in cells:
+                self.p6_overview_canvas.itemconfig(image_id, image=photo)
+        self.root.after(self.config.THUMBNAIL_POLL_MS, self._poll_thumbnails)
+
+    def _highlight_overview_item(self):
+        """한눈에 보기에서 P6에 표시 중인 항목에 테두리를 그립니다."""
+        if self.p6_overview_window is None:
+            return
+        canvas = self.p6_overview_canvas
+        canvas.delete("highlight")
+        bbox = canvas.bbox(f"item{self.p6_overview_current}")
+        if bbox:
+            canvas.create_rectangle(bbox[0] - 3, bbox[1] - 3, bbox[2] + 3, bbox[3] + 3, outline='red', width=2,
+                                    tags=("highlight",))
+
+    def _create_alternatives_frame(self, parent_frame):
+        """P6: 시간표 그림과 점수가 같은 그룹의 분반 대안 영역. 펼치면 대안 목록에서 골라 볼 수 있습니다."""
+        frame = ttk.Frame(parent_frame)
+        frame.pack(pady=5)
+        self.p6_alternatives_label = ttk.Label(frame, text="")
+        self.p6_alternatives_label.pack(side='left', padx=10)
+        self.p6_alternatives_expanded = False
+        self.p6_current_alternatives = None # (표시 중인 분반 대안 번호, 그룹의 결과 수)
+        self.p6_alternatives_list = tk.Listbox(parent_frame, height=5, width=80, exportselection=False)
+
+        def toggle():
+            self.p6_alternatives_expanded = not self.p6_alternatives_expanded
+            self._update_alternatives_list()
+
+        def select(event):
+            selection = self.p6_alternatives_list.curselection()
+            if selection:
+                self.controller.on_alternative_select(selection[0])
+
+        self.p6_alternatives_button = ttk.Button(frame, text="대안 펼치기", command=toggle)
+        self.p6_alternatives_list.bind("<<ListboxSelect>>", select)
+
+    def _update_alternatives_list(self):
+        """분반 대안 목록을 펼친 상태면 현재 그룹의 대안으로 채우고, 접은 상태면 숨깁니다."""
+        selected, count = self.p6_current_alternatives or (0, 1)
+        self.p6_alternatives_button.config(text="대안 접기" if self.p6_alternatives_expanded else "대안 펼치기")
+        if not self.p6_alternatives_expanded or count <= 1:
+            self.p6_alternatives_list.pack_forget()
+            return
+        self.p6_alternatives_list.delete(0, tk.END)
+        labels = self.controller.get_alternative_labels()
+        for label in labels:
+            self.p6_alternatives_list.insert(tk.END, label)
+        if count > len(labels):
+            self.p6_alternatives_list.insert(tk.END, f"... 외 {count - len(labels)}개")
+        if selected < len(labels):
+            self.p6_alternatives_list.selection_set(selected)
+            self.p6_alternatives_list.see(selected)
+        self.p6_alternatives_list.pack(after=self.p6_alternatives_label.master, pady=(0, 5))
+
+    def _create_result_filter_frame(self, parent_frame):
+        """P6: 결과 필터(포함할 분반, 제외할 교수, 공강 요일) 입력 영역을 생성합니다. 선택지는 결과가 나온 뒤 채워집니다."""
+        frame = ttk.Frame(parent_frame)
+        frame.pack(pady=5)
+        self.p6_filter_lecture_ids = {}
+
+        ttk.Label(frame, text="포함").pack(side='left', padx=(0, 5))
+        self.p6_include_combo = ttk.Combobox(frame, values=["-"], width=32, state='readonly')
+        self.p6_include_combo.set("-")
+        self.p6_include_combo.bind("<<ComboboxSelected>>", lambda e: self.controller.on_result_filter_change(
+            'include_ids', [self.p6_filter_lecture_ids[self.p6_include_combo.get()]]
+            if self.p6_include_combo.get() in self.p6_filter_lecture_ids else []))
+        self.p6_include_combo.pack(side='left')
+
+        ttk.Label(frame, text="제외 교수").pack(side='left', padx=(10, 5))
+        self.p6_exclude_prof_combo = ttk.Combobox(frame, values=["-"], width=12, state='readonly')
+        self.p6_exclude_prof_combo.set("-")
+        self.p6_exclude_prof_combo.bind("<<ComboboxSelected>>", lambda e: self.controller.on_result_filter_change(
+            'exclude_profs', [] if self.p6_exclude_prof_combo.get() == "-" else [self.p6_exclude_prof_combo.get()]))
+        self.p6_exclude_prof_combo.pack(side='left')
+
+        ttk.Label(frame, text="공강").pack(side='left', padx=(10, 5))
+        self.p6_free_day_vars = {}
+        for day in self.config.TIMETABLE_HEADERS[1:]:
+            day_var = tk.BooleanVar(value=False)
+            self.p6_free_day_vars[day] = day_var
+            ttk.Checkbutton(frame, text=day, variable=day_var, command=lambda: self.controller.on_result_filter_change(
+                'free_days', [d for d, v in self.p6_free_day_vars.items() if v.get()])).pack(side='left')
+
+    def _create_sensitivity_frame(self, parent_frame):
+        """P6: 가중치를 바꾸면 어떤 시간표가 1등이 될 수 있는지 분석하는 영역을 생성합니다."""
+        frame = ttk.Frame(parent_frame)
+        frame.pack(pady=5)
+        sensitivity_label = ttk.Label(frame, text="", font=self.config.FONT_DESCRIPTION, justify='left')
+
+        def show_sensitivity():
+            text, warn = self.controller.on_sensitivity_request()
+            sensitivity_label.config(text=text, foreground="red" if warn else "")
+
+        ttk.Button(frame, text="가중치 민감도 분석", command=show_sensitivity).pack(side='left', padx=10)
+        sensitivity_label.pack(side='left', padx=10)
+
+    def update_result_filter_options(self, lecture_options, professors):
+        """새 결과의 분반/교수 목록으로 P6 필터 선택지를 갱신하고 필터를 초기화합니다."""
+        self.p6_filter_lecture_ids = dict(lecture_options)
+        self.p6_include_combo.config(values=["-"] + [label for label, _ in lecture_options])
+        self.p6_include_combo.set("-")
+        self.p6_exclude_prof_combo.config(values=["-"] + [str(prof) for prof in professors])
+        self.p6_exclude_prof_combo.set("-")
+        for day_var in self.p6_free_day_vars.values():
+            day_var.set(False)
 
     def _generate_distinct_colors(self, n):
         """서로 다른 n개의 색상을 생성합니다."""
@@ -455,7 +769,8 @@ class View:
                 if col_idx is None:
                     continue
                 
-                time_indices = list(range(start_idx, end_idx + 1))
+                # 9:00 이전 부분은 시간표 격자 밖이므로 첫 행부터 그립니다.
+                time_indices = list(range(max(start_idx, 0), end_idx + 1))
                 if day not in day_slots:
                     day_slots[day] = []
                 day_slots[day].extend(time_indices)
@@ -507,14 +822,24 @@ class View:
         
         return spans
 
-    def display_timetable(self, timetable_obj, index, total, elapsed_time=None):
-        """시간표를 화면에 표시합니다 - spanning 적용"""
+    def display_timetable(self, timetable_obj, index, total, elapsed_time=None, result_mode="ranked", filtered_from=None,
+                          alternatives=None):
+        """
+        시간표를 화면에 표시합니다 - spanning 적용
+        alternatives: 결과를 그룹으로 묶었을 때 (표시 중인 분반 대안 번호, 그룹의 결과 수)
+        """
         frame = self.p6_timetable_frame
         
         for widget in frame.winfo_children():
             widget.destroy()
 
         feedback_text = f"Result {index} / {total}"
+        if result_mode == "pareto":
+            feedback_text = f"Pareto front {index} / {total}"
+        elif result_mode == "local_search":
+            feedback_text = f"Result {index} / {total} (근사 탐색)"
+        if filtered_from is not None:
+            feedback_text += f" (필터: 전체 {filtered_from}개 중)"
         if elapsed_time is not None:
             feedback_text += f" (Calculation Time: {elapsed_time:.2f} seconds)"
         self.feedback_label.config(text=feedback_text)
@@ -523,8 +848,24 @@ class View:
         self.p6_credits_label.config(text=f"총 학점: {credits}")
         
         self.p6_score_label.config(text=f"Score = {timetable_obj.score:.2f}")
-        self.p6_zscore_label.config(text=f"Z-Score = {timetable_obj.z_score:.2f}" if timetable_obj.z_score is not None else "Z-Score = N/A")
-        self.p6_same_score_count_label.config(text=f"Same Score Candidates = {timetable_obj.same_score_count}" if timetable_obj.same_score_count is not None else "Same Score Candidates = N/A")
+        z_text = f"Z-Score = {timetable_obj.z_score:.2f}" if timetable_obj.z_score is not None else "Z-Score = N/A"
+        if timetable_obj.z_score_margin is not None:
+            z_text += f" (±{timetable_obj.z_score_margin:.2f}, 표본 추정)"
+        self.p6_zscore_label.config(text=z_text)
+        same_text = f"Same Score Candidates = {timetable_obj.same_score_count}" if timetable_obj.same_score_count is not None else "Same Score Candidates = N/A"
+        if timetable_obj.same_score_interval is not None:
+            low, high = timetable_obj.same_score_interval
+            same_text = f"Same Score Candidates ≈ {timetable_obj.same_score_count} (95% 구간 {low:.0f}~{high:.0f})"
+        self.p6_same_score_count_label.config(text=same_text)
+        self._display_alternatives(alternatives)
+        self.p6_overview_current = index - 1
+        self._highlight_overview_item()
+        if timetable_obj.properties is not None:
+            self.p6_properties_label.config(text=" / ".join(
+                f"{attr} = {value:.2f}" for attr, value in
+                list(zip(self.config.PAGE5_ATTRIBUTES, timetable_obj.properties)) + (timetable_obj.extra_properties or [])))
+        else:
+            self.p6_properties_label.config(text="")
 
         if not timetable_obj or not hasattr(timetable_obj, 'lectures') or not timetable_obj.lectures:
             ttk.Label(frame, text="표시할 시간표 데이터가 없습니다.").pack(pady=20)
@@ -626,11 +967,38 @@ class View:
         canvas.after(100, draw_timetable)
         
         
-    def display_no_result(self):
+    def _display_alternatives(self, alternatives):
+        """같은 시간표 그림과 점수의 분반 대안 수와 펼치기 버튼을 갱신합니다."""
+        if alternatives is None or alternatives[1] <= 1:
+            self.p6_alternatives_label.config(text="")
+            self.p6_alternatives_button.pack_forget()
+        else:
+            selected, count = alternatives
+            self.p6_alternatives_label.config(text=f"같은 시간표의 분반 대안 {selected + 1} / {count}")
+            self.p6_alternatives_button.pack(side='left', padx=10)
+        self.p6_current_alternatives = alternatives
+        self._update_alternatives_list()
+
+    def display_run_profile(self, profile):
+        """마지막 실행의 단계별 소요 시간과 카운터를 P6에 표시합니다."""
+        if profile is None:
+            self.p6_profile_label.config(text="")
+            return
+        text = profile.summary_text()
+        if profile.capture_report:
+            print(profile.capture_report)
+            text += f"\n({profile.capture} 결과는 콘솔에 출력되었습니다)"
+        self.p6_profile_label.config(text=text)
+
+    def display_no_result(self, reason=None):
         """결과가 없을 때 표시하는 함수"""
-        self.feedback_label.config(text="생성 가능한 시간표가 없습니다.")
+        feedback_text = "생성 가능한 시간표가 없습니다."
+        if reason:
+            feedback_text += f" ({reason})"
+        self.feedback_label.config(text=feedback_text)
         self.p6_score_label.config(text="Score = N/A")
         self.p6_credits_label.config(text="총 학점: N/A")
+        self._display_alternatives(None)
         
         for widget in self.p6_timetable_frame.winfo_children():
             widget.destroy()